@@ -0,0 +1,114 @@
+import { COLUMNAR_FRAME_CONTENT_TYPE } from "@/lib/columnar-codec";
+import { fingerprintSeries } from "@/lib/indicator-cache";
+import { FIRST_SNAPSHOT_TIMEOUT_MS, marketData } from "@/lib/market-data";
+import { OHLCVSeries } from "@/lib/ohlcv";
+import {
+  encodeSeriesFrame,
+  missingSeriesFields,
+  parseSeriesQuery,
+  SeriesQuery,
+  SeriesQueryError,
+  seriesQueryKey,
+  selectSeries,
+} from "@/lib/series-query";
+import { createHash } from "node:crypto";
+import { NextRequest } from "next/server";
+
+// Browsers revalidate with the ETag after a minute; shared caches serve for
+// five minutes, then stale while refetching within the ingestion cadence
+const CACHE_CONTROL =
+  "public, max-age=60, s-maxage=300, stale-while-revalidate=900";
+
+// Bump when the response body changes for the same data and query
+const RESPONSE_FORMAT_VERSION = 2;
+
+// Content fingerprints per candle series; snapshots are immutable, so each
+// is hashed once
+const fingerprints = new WeakMap<OHLCVSeries, string>();
+
+/**
+ * Strong ETag of a response: indicators are a pure function of the candles,
+ * so the candle fingerprint and the normalized query identify the body
+ */
+function seriesETag(data: OHLCVSeries, query: SeriesQuery): string {
+  let fingerprint = fingerprints.get(data);
+  if (!fingerprint) {
+    fingerprint = fingerprintSeries(data);
+    fingerprints.set(data, fingerprint);
+  }
+  const digest = createHash("sha256")
+    .update(
+      `${RESPONSE_FORMAT_VERSION}|${fingerprint}|${seriesQueryKey(query)}`
+    )
+    .digest("base64url");
+  return `"${digest.slice(0, 27)}"`;
+}
+
+/**
+ * Whether an If-None-Match header matches `etag` (weak comparison, as
+ * RFC 9110 specifies for If-None-Match)
+ */
+function matchesETag(header: string | null, etag: string): boolean {
+  if (!header) {
+    return false;
+  }
+  return header.split(",").some((candidate) => {
+    const tag = candidate.trim();
+    return tag === "*" || tag.replace(/^W\//, "") === etag;
+  });
+}
+
+/**
+ * Time-sliced, column-projected candles and indicators:
+ * `/api/series?tf=1d&from=2024-01-01&to=1735689600&fields=close,ema21,bb`
+ *
+ * `from`/`to` take epoch seconds (at least 9 digits) or ISO dates (`2024`
+ * is the year) and are inclusive; `fields` takes columns (open, high, low,
+ * close, volume, ema13, ema21, ema50, ema100, bbUpper, bbMiddle, bbLower,
+ * stochK, stochD), groups (ohlc, ohlcv, ema, bb, stoch) and orderBlocks,
+ * defaulting to everything.
+ * `format=binary` answers with a columnar frame (lib/columnar-codec.ts),
+ * optionally with `precision=float32` values.
+ */
+export async function GET(request: NextRequest) {
+  let query: SeriesQuery;
+  try {
+    query = parseSeriesQuery(request.nextUrl.searchParams);
+  } catch (error) {
+    if (error instanceof SeriesQueryError) {
+      return Response.json({ error: error.message }, { status: 400 });
+    }
+    throw error;
+  }
+
+  marketData.start();
+  const bitcoin = await marketData.whenReady(
+    "bitcoin",
+    FIRST_SNAPSHOT_TIMEOUT_MS
+  );
+  const snapshot = bitcoin?.value[query.timeframe];
+  const missing = snapshot ? missingSeriesFields(snapshot, query) : [];
+  if (!snapshot || snapshot.data.time.length === 0 || missing.length > 0) {
+    return Response.json(
+      {
+        error: snapshot
+          ? `Not available yet: ${missing.join(", ") || "candles"}`
+          : `No Bitcoin data for ${query.timeframe} yet`,
+      },
+      { status: 503, headers: { "Cache-Control": "no-store" } }
+    );
+  }
+
+  const etag = seriesETag(snapshot.data, query);
+  const headers = { ETag: etag, "Cache-Control": CACHE_CONTROL };
+  if (matchesETag(request.headers.get("If-None-Match"), etag)) {
+    return new Response(null, { status: 304, headers });
+  }
+
+  if (query.format === "binary") {
+    return new Response(encodeSeriesFrame(snapshot, query), {
+      headers: { ...headers, "Content-Type": COLUMNAR_FRAME_CONTENT_TYPE },
+    });
+  }
+  return Response.json(selectSeries(snapshot, query), { headers });
+}
@@ -0,0 +1,50 @@
+import { COLUMNAR_FRAME_CONTENT_TYPE } from "@/lib/columnar-codec";
+import { Timeframe, TIMEFRAMES } from "@/lib/constants";
+import { loadChartOverlay } from "@/lib/market-data";
+import {
+  CHART_OVERLAYS,
+  ChartOverlay,
+  encodeChartOverlay,
+} from "@/lib/timeframe-payload";
+
+// Regenerated with the page; each overlay is a separate cached response
+export const revalidate = 300;
+export const dynamicParams = false;
+
+export function generateStaticParams() {
+  return TIMEFRAMES.flatMap((timeframe) =>
+    CHART_OVERLAYS.map((overlay) => ({ timeframe, overlay }))
+  );
+}
+
+/**
+ * One overlay (halvings or fearGreed) for a timeframe's chart, fetched
+ * alongside the timeframe's series and drawn once it arrives
+ */
+export async function GET(
+  _request: Request,
+  { params }: RouteContext<"/api/timeframes/[timeframe]/[overlay]">
+) {
+  const { timeframe, overlay } = await params;
+  if (
+    !TIMEFRAMES.includes(timeframe as Timeframe) ||
+    !CHART_OVERLAYS.includes(overlay as ChartOverlay)
+  ) {
+    return Response.json({ error: "Unknown overlay" }, { status: 404 });
+  }
+
+  const value = await loadChartOverlay(
+    overlay as ChartOverlay,
+    timeframe as Timeframe
+  );
+  if (!value) {
+    return Response.json(
+      { error: `No ${overlay} data for ${timeframe} yet` },
+      { status: 503, headers: { "Cache-Control": "no-store" } }
+    );
+  }
+
+  return new Response(encodeChartOverlay(overlay as ChartOverlay, value), {
+    headers: { "Content-Type": COLUMNAR_FRAME_CONTENT_TYPE },
+  });
+}
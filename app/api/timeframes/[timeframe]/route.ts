@@ -0,0 +1,39 @@
+import { COLUMNAR_FRAME_CONTENT_TYPE } from "@/lib/columnar-codec";
+import { Timeframe, TIMEFRAMES } from "@/lib/constants";
+import { loadTimeframeChart } from "@/lib/market-data";
+import { encodeTimeframeChart } from "@/lib/timeframe-payload";
+
+// Regenerated with the page; each timeframe is a separate cached response
+export const revalidate = 300;
+export const dynamicParams = false;
+
+export function generateStaticParams() {
+  return TIMEFRAMES.map((timeframe) => ({ timeframe }));
+}
+
+/**
+ * Chart-ready series for one timeframe, fetched by the page when a tab other
+ * than the default one is opened. Overlays are served separately (see
+ * [overlay]/route.ts), so the candles never wait for their sources.
+ */
+export async function GET(
+  _request: Request,
+  { params }: RouteContext<"/api/timeframes/[timeframe]">
+) {
+  const { timeframe } = await params;
+  if (!TIMEFRAMES.includes(timeframe as Timeframe)) {
+    return Response.json({ error: "Unknown timeframe" }, { status: 404 });
+  }
+
+  const chart = await loadTimeframeChart(timeframe as Timeframe);
+  if (!chart) {
+    return Response.json(
+      { error: `No Bitcoin data for ${timeframe} yet` },
+      { status: 503, headers: { "Cache-Control": "no-store" } }
+    );
+  }
+
+  return new Response(encodeTimeframeChart(chart), {
+    headers: { "Content-Type": COLUMNAR_FRAME_CONTENT_TYPE },
+  });
+}
@@ -9,12 +9,16 @@ import {
 import { Field, FieldLabel } from "@/components/ui/field";
 import { Spinner } from "@/components/ui/spinner";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { TIMEFRAMES, TIMEFRAME_LABELS } from "@/lib/constants";
+import {
+  DEFAULT_TIMEFRAME,
+  TIMEFRAMES,
+  TIMEFRAME_LABELS,
+} from "@/lib/constants";
 
 export default function Loading() {
   return (
     <PageLayout>
-      <Tabs defaultValue="1m" className="w-full">
+      <Tabs defaultValue={DEFAULT_TIMEFRAME} className="w-full">
         <Field>
           <FieldLabel>Timeframe</FieldLabel>
           <TabsList>
@@ -1,16 +1,20 @@
 "use client";
 
+import {
+  ChartOverlayContext,
+  ChartOverlayTarget,
+} from "@/components/ChartOverlays";
 import { Button } from "@/components/ui/button";
+import { ChartSeries } from "@/lib/chart-series";
 import { Timeframe, TIMEFRAME_FOCUS_WINDOWS_DAYS } from "@/lib/constants";
 import { OrderBlockZone } from "@/lib/indicators";
+import { ChartOverlays } from "@/lib/timeframe-payload";
 import {
   BaselineSeries,
-  CandlestickData,
   CandlestickSeries,
   ColorType,
   createChart,
   createSeriesMarkers,
-  HistogramData,
   HistogramSeries,
   IChartApi,
   ISeriesApi,
@@ -20,41 +24,34 @@ import {
   Time,
 } from "lightweight-charts";
 import { LogsIcon } from "lucide-react";
-import { useEffect, useRef, useState } from "react";
+import { ReactNode, useEffect, useRef, useState } from "react";
 
 interface CandlestickChartProps {
-  data: Array<{
-    date: string;
-    dateLabel: string;
-    open: number;
-    high: number;
-    low: number;
-    close: number;
-    volume: number;
-    ema13: number | null;
-    ema21: number | null;
-    ema50: number | null;
-    ema100: number | null;
-    bbUpper: number | null;
-    bbMiddle: number | null;
-    bbLower: number | null;
-    stochasticK?: number | null;
-    stochasticD?: number | null;
-    fearGreedValue?: number | null;
-    fearGreedClassification?: string;
-    // Signal flags
-    isHalving?: boolean;
-    isTopSignal?: boolean;
-    isBottomSignal?: boolean;
-    halvingLabel?: string;
-    topSignalLabel?: string;
-    bottomSignalLabel?: string;
-  }>;
+  /**
+   * Prepared series for every line and histogram apart from the overlays
+   * (see buildChartSeries)
+   */
+  series: ChartSeries;
   orderBlocks?: OrderBlockZone[];
   timeframe: Timeframe;
   chartHeight: number;
   onChartReady?: (chart: IChartApi) => void;
   onSeriesReady?: (series: ISeriesApi<"Candlestick">) => void;
+  /**
+   * Overlays (see ChartOverlayLayer), which draw through ChartOverlayContext
+   * whenever they arrive
+   */
+  children?: ReactNode;
+}
+
+function drawOverlays(
+  { halvings, fearGreed }: Partial<ChartOverlays>,
+  markers: ISeriesMarkersPluginApi<Time> | null,
+  fearGreedSeries: ISeriesApi<"Line"> | null
+) {
+  // Markers arrive sorted by time, as the markers plugin requires
+  markers?.setMarkers(halvings ?? []);
+  fearGreedSeries?.setData(fearGreed ?? []);
 }
 
 /**
@@ -63,12 +60,13 @@ interface CandlestickChartProps {
  */
 
 export default function CandlestickChart({
-  data,
+  series,
   orderBlocks,
   timeframe,
   chartHeight,
   onChartReady,
   onSeriesReady,
+  children,
 }: CandlestickChartProps) {
   const chartContainerRef = useRef<HTMLDivElement>(null);
   const chartRef = useRef<IChartApi | null>(null);
@@ -94,6 +92,18 @@ export default function CandlestickChart({
   const fearGreedExtremeGreedLineRef = useRef<ISeriesApi<"Line"> | null>(null);
   const [isLogarithmic, setIsLogarithmic] = useState(false);
   const orderBlockSeriesRef = useRef<Array<ISeriesApi<"Baseline">>>([]);
+  // Overlays are kept so they can be drawn again when the chart is recreated
+  const overlaysRef = useRef<Partial<ChartOverlays>>({});
+  const [overlayTarget] = useState<ChartOverlayTarget>(() => ({
+    setOverlay(overlay, value) {
+      overlaysRef.current = { ...overlaysRef.current, [overlay]: value };
+      drawOverlays(
+        overlaysRef.current,
+        markersRef.current,
+        fearGreedSeriesRef.current
+      );
+    },
+  }));
 
   // Centralized pane height configuration
   const TOTAL_CHART_HEIGHT = chartHeight;
@@ -520,9 +530,10 @@ export default function CandlestickChart({
     };
   }, [onChartReady, onSeriesReady, isLogarithmic, TOTAL_CHART_HEIGHT]);
 
-  // Update chart data when data prop changes
+  // Update chart data when the prepared series change
   useEffect(() => {
-    if (!data.length || !chartRef.current) return;
+    const candles = series.candlestick;
+    if (!candles.length || !chartRef.current) return;
 
     const applyFocusRange = () => {
       if (!chartRef.current) return false;
@@ -530,14 +541,14 @@ export default function CandlestickChart({
       const windowDays = TIMEFRAME_FOCUS_WINDOWS_DAYS[timeframe];
       if (!windowDays) return false;
 
-      const lastPoint = data[data.length - 1];
+      const lastPoint = candles[candles.length - 1];
       if (!lastPoint) return false;
 
-      const lastDate = new Date(lastPoint.date);
+      const lastDate = new Date((lastPoint.time as number) * 1000);
       const targetStart = new Date(lastDate);
       targetStart.setDate(targetStart.getDate() - windowDays);
 
-      const earliestDate = new Date(data[0].date);
+      const earliestDate = new Date((candles[0].time as number) * 1000);
       const effectiveStart =
         targetStart.getTime() < earliestDate.getTime()
           ? earliestDate
@@ -550,139 +561,36 @@ export default function CandlestickChart({
       return true;
     };
 
-    // Convert data to TradingView format
-    const candlestickData: CandlestickData<Time>[] = [];
-    const ema13Data: LineData<Time>[] = [];
-    const ema21Data: LineData<Time>[] = [];
-    const ema50Data: LineData<Time>[] = [];
-    const ema100Data: LineData<Time>[] = [];
-    const bbUpperData: LineData<Time>[] = [];
-    const bbMiddleData: LineData<Time>[] = [];
-    const bbLowerData: LineData<Time>[] = [];
-    const volumeData: HistogramData<Time>[] = [];
-    const stochasticKData: LineData<Time>[] = [];
-    const stochasticDData: LineData<Time>[] = [];
-    const stochasticOverboughtData: LineData<Time>[] = [];
-    const stochasticOversoldData: LineData<Time>[] = [];
-    const fearGreedData: LineData<Time>[] = [];
-    const fearGreedExtremeFearData: LineData<Time>[] = [];
-    const fearGreedFearData: LineData<Time>[] = [];
-    const fearGreedNeutralData: LineData<Time>[] = [];
-    const fearGreedGreedData: LineData<Time>[] = [];
-    const fearGreedExtremeGreedData: LineData<Time>[] = [];
     const zones = orderBlocks || [];
 
-    // Minimum value for logarithmic scale to avoid log(0) or log(negative) issues
-    const MIN_LOG_VALUE = 0.01;
-
-    data.forEach((point) => {
-      // Convert date string to timestamp (seconds)
-      const timestamp = Math.floor(
-        new Date(point.date).getTime() / 1000
-      ) as Time;
-
-      candlestickData.push({
-        time: timestamp,
-        open: point.open,
-        high: point.high,
-        low: point.low,
-        close: point.close,
-      });
-
-      if (point.ema13 !== null) {
-        ema13Data.push({ time: timestamp, value: point.ema13 });
-      }
-      if (point.ema21 !== null) {
-        ema21Data.push({ time: timestamp, value: point.ema21 });
-      }
-      if (point.ema50 !== null) {
-        ema50Data.push({ time: timestamp, value: point.ema50 });
-      }
-      if (point.ema100 !== null) {
-        ema100Data.push({ time: timestamp, value: point.ema100 });
-      }
-
-      const volumeColor =
-        point.close >= point.open
-          ? "rgba(38, 166, 154, 0.2)"
-          : "rgba(239, 83, 80, 0.2)";
-      volumeData.push({
-        time: timestamp,
-        value: point.volume,
-        color: volumeColor,
-      });
-
-      // For Bollinger Bands: in logarithmic mode, filter out values <= 0
-      // to prevent breaking the logarithmic scale rendering
-      if (isLogarithmic) {
-        if (point.bbUpper !== null && point.bbUpper > MIN_LOG_VALUE) {
-          bbUpperData.push({ time: timestamp, value: point.bbUpper });
-        }
-        if (point.bbMiddle !== null && point.bbMiddle > MIN_LOG_VALUE) {
-          bbMiddleData.push({ time: timestamp, value: point.bbMiddle });
-        }
-        if (point.bbLower !== null && point.bbLower > MIN_LOG_VALUE) {
-          bbLowerData.push({ time: timestamp, value: point.bbLower });
-        }
-      } else {
-        // In linear mode, include all valid Bollinger Band values
-        if (point.bbUpper !== null) {
-          bbUpperData.push({ time: timestamp, value: point.bbUpper });
-        }
-        if (point.bbMiddle !== null) {
-          bbMiddleData.push({ time: timestamp, value: point.bbMiddle });
-        }
-        if (point.bbLower !== null) {
-          bbLowerData.push({ time: timestamp, value: point.bbLower });
-        }
-      }
-
-      // Stochastic oscillator data
-      if (point.stochasticK !== null && point.stochasticK !== undefined) {
-        stochasticKData.push({ time: timestamp, value: point.stochasticK });
-      }
-      if (point.stochasticD !== null && point.stochasticD !== undefined) {
-        stochasticDData.push({ time: timestamp, value: point.stochasticD });
-      }
-
-      // Stochastic reference lines (80 and 20)
-      stochasticOverboughtData.push({ time: timestamp, value: 80 });
-      stochasticOversoldData.push({ time: timestamp, value: 20 });
-
-      // Fear and Greed Index data
-      if (point.fearGreedValue !== null && point.fearGreedValue !== undefined) {
-        fearGreedData.push({ time: timestamp, value: point.fearGreedValue });
-      }
-
-      // Fear and Greed reference lines
-      fearGreedExtremeFearData.push({ time: timestamp, value: 25 });
-      fearGreedFearData.push({ time: timestamp, value: 45 });
-      fearGreedNeutralData.push({ time: timestamp, value: 55 });
-      fearGreedGreedData.push({ time: timestamp, value: 75 });
-      // Use 90 for extreme greed to reflect realistic ceiling
-      fearGreedExtremeGreedData.push({ time: timestamp, value: 90 });
-    });
-
-    // Set data to series
-    candlestickSeriesRef.current?.setData(candlestickData);
-    ema13SeriesRef.current?.setData(ema13Data);
-    ema21SeriesRef.current?.setData(ema21Data);
-    ema50SeriesRef.current?.setData(ema50Data);
-    ema100SeriesRef.current?.setData(ema100Data);
-    bbUpperSeriesRef.current?.setData(bbUpperData);
-    bbMiddleSeriesRef.current?.setData(bbMiddleData);
-    bbLowerSeriesRef.current?.setData(bbLowerData);
-    volumeSeriesRef.current?.setData(volumeData);
-    stochasticKSeriesRef.current?.setData(stochasticKData);
-    stochasticDSeriesRef.current?.setData(stochasticDData);
-    stochasticOverboughtLineRef.current?.setData(stochasticOverboughtData);
-    stochasticOversoldLineRef.current?.setData(stochasticOversoldData);
-    fearGreedSeriesRef.current?.setData(fearGreedData);
-    fearGreedExtremeFearLineRef.current?.setData(fearGreedExtremeFearData);
-    fearGreedFearLineRef.current?.setData(fearGreedFearData);
-    fearGreedNeutralLineRef.current?.setData(fearGreedNeutralData);
-    fearGreedGreedLineRef.current?.setData(fearGreedGreedData);
-    fearGreedExtremeGreedLineRef.current?.setData(fearGreedExtremeGreedData);
+    // Set data to series. Bollinger Bands drop values <= 0 in logarithmic
+    // mode, which would otherwise break the scale rendering
+    candlestickSeriesRef.current?.setData(candles);
+    ema13SeriesRef.current?.setData(series.ema13);
+    ema21SeriesRef.current?.setData(series.ema21);
+    ema50SeriesRef.current?.setData(series.ema50);
+    ema100SeriesRef.current?.setData(series.ema100);
+    bbUpperSeriesRef.current?.setData(
+      isLogarithmic ? series.bbUpperLog : series.bbUpper
+    );
+    bbMiddleSeriesRef.current?.setData(
+      isLogarithmic ? series.bbMiddleLog : series.bbMiddle
+    );
+    bbLowerSeriesRef.current?.setData(
+      isLogarithmic ? series.bbLowerLog : series.bbLower
+    );
+    volumeSeriesRef.current?.setData(series.volume);
+    stochasticKSeriesRef.current?.setData(series.stochasticK);
+    stochasticDSeriesRef.current?.setData(series.stochasticD);
+    stochasticOverboughtLineRef.current?.setData(series.stochasticOverbought);
+    stochasticOversoldLineRef.current?.setData(series.stochasticOversold);
+    fearGreedExtremeFearLineRef.current?.setData(series.fearGreedExtremeFear);
+    fearGreedFearLineRef.current?.setData(series.fearGreedFear);
+    fearGreedNeutralLineRef.current?.setData(series.fearGreedNeutral);
+    fearGreedGreedLineRef.current?.setData(series.fearGreedGreed);
+    fearGreedExtremeGreedLineRef.current?.setData(
+      series.fearGreedExtremeGreed
+    );
 
     // Draw order block zones as shaded baseline series on the price pane
     zones.forEach((zone) => {
@@ -692,14 +600,10 @@ export default function CandlestickChart({
       const basePrice = isBuy ? zone.low : zone.high;
       const drawPrice = isBuy ? zone.high : zone.low;
       const color = isBuy ? "rgba(34, 197, 94, 0.2)" : "rgba(239, 68, 68, 0.2)";
-      const startTime = Math.floor(
-        new Date(zone.startTime).getTime() / 1000
-      ) as Time;
-      const endTime = Math.floor(
-        new Date(zone.endTime).getTime() / 1000
-      ) as Time;
-
-      const series = chartRef.current.addSeries(BaselineSeries, {
+      const startTime = zone.startTime as Time;
+      const endTime = zone.endTime as Time;
+
+      const zoneSeries = chartRef.current.addSeries(BaselineSeries, {
         baseValue: { type: "price", price: basePrice },
         topFillColor1: color,
         topFillColor2: color,
@@ -722,87 +626,21 @@ export default function CandlestickChart({
         { time: endTime, value: drawPrice },
       ];
 
-      series.setData(zoneData);
-      orderBlockSeriesRef.current.push(series);
+      zoneSeries.setData(zoneData);
+      orderBlockSeriesRef.current.push(zoneSeries);
     });
 
-    // Add markers for halving dates and signals
-    type ChartMarker = {
-      time: Time;
-      position: "aboveBar" | "belowBar";
-      color: string;
-      shape: "arrowDown" | "arrowUp" | "circle";
-      size: number;
-      text: string;
-    };
-    const markers: ChartMarker[] = [];
-    data.forEach((point) => {
-      const timestamp = Math.floor(
-        new Date(point.date).getTime() / 1000
-      ) as Time;
-
-      if (point.isHalving) {
-        markers.push({
-          time: timestamp,
-          position: "belowBar",
-          color: "#f59e0b",
-          shape: "circle",
-          size: 2,
-          text: point.halvingLabel || "Halving",
-        });
-      }
-
-      if (point.isTopSignal) {
-        markers.push({
-          time: timestamp,
-          position: "aboveBar",
-          color: "#ef4444",
-          shape: "arrowDown",
-          size: 2,
-          text: point.topSignalLabel || "Top Signal",
-        });
-      }
-
-      if (point.isBottomSignal) {
-        markers.push({
-          time: timestamp,
-          position: "belowBar",
-          color: "#10b981",
-          shape: "arrowUp",
-          size: 2,
-          text: point.bottomSignalLabel || "Bottom Signal",
-        });
-      }
-    });
-
-    // Set markers on candlestick series using the markers instance
-    // Markers must be sorted by time
-    if (markersRef.current) {
-      if (markers.length > 0) {
-        // Sort markers by time to ensure proper rendering
-        markers.sort((a, b) => {
-          const timeA =
-            typeof a.time === "number"
-              ? a.time
-              : new Date(a.time as string).getTime() / 1000;
-          const timeB =
-            typeof b.time === "number"
-              ? b.time
-              : new Date(b.time as string).getTime() / 1000;
-          return timeA - timeB;
-        });
-        markersRef.current.setMarkers(markers);
-      } else {
-        // Clear markers if there are none
-        markersRef.current.setMarkers([]);
-      }
-    }
+    drawOverlays(
+      overlaysRef.current,
+      markersRef.current,
+      fearGreedSeriesRef.current
+    );
 
     const focusApplied = applyFocusRange();
     if (!focusApplied) {
       chartRef.current.timeScale().fitContent();
     }
-  }, [data, isLogarithmic, orderBlocks, timeframe]);
+  }, [series, isLogarithmic, orderBlocks, timeframe]);
 
   // Apply logarithmic scale mode when state changes
   useEffect(() => {
@@ -822,7 +660,10 @@ export default function CandlestickChart({
 
   return (
     <div className="w-full space-y-2">
-      <div className="flex justify-end">
+      <div className="flex items-center justify-end gap-3">
+        <ChartOverlayContext value={overlayTarget}>
+          {children}
+        </ChartOverlayContext>
         <Button
           variant={isLogarithmic ? "default" : "outline"}
           size="sm"
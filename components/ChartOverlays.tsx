@@ -0,0 +1,75 @@
+"use client";
+
+import { Spinner } from "@/components/ui/spinner";
+import { ChartOverlays } from "@/lib/timeframe-payload";
+import { createContext, ReactNode, use, useEffect } from "react";
+
+/**
+ * Where overlays are drawn, provided by CandlestickChart. Values set before
+ * the chart exists, or while it is recreated, are applied once it is.
+ */
+export interface ChartOverlayTarget {
+  setOverlay<K extends keyof ChartOverlays>(
+    overlay: K,
+    value: ChartOverlays[K]
+  ): void;
+}
+
+export const ChartOverlayContext = createContext<ChartOverlayTarget | null>(
+  null
+);
+
+export const CHART_OVERLAY_LABELS: Record<keyof ChartOverlays, string> = {
+  halvings: "Halving signals",
+  fearGreed: "Fear & Greed",
+};
+
+function OverlayStatus({ children }: { children: ReactNode }) {
+  return (
+    <span className="text-muted-foreground flex items-center gap-1 text-xs">
+      {children}
+    </span>
+  );
+}
+
+/**
+ * Fallback shown while an overlay's source is still loading
+ */
+export function OverlayLoading({ label }: { label: string }) {
+  return (
+    <OverlayStatus>
+      <Spinner className="size-3" />
+      {label}
+    </OverlayStatus>
+  );
+}
+
+interface ChartOverlayProps<K extends keyof ChartOverlays> {
+  overlay: K;
+  label: string;
+  /**
+   * Resolves to null when the source is unavailable
+   */
+  value: Promise<ChartOverlays[K] | null>;
+}
+
+/**
+ * Draws one overlay on the enclosing chart once it arrives; suspends until
+ * then, so each overlay can have its own Suspense boundary
+ */
+export function ChartOverlayLayer<K extends keyof ChartOverlays>({
+  overlay,
+  label,
+  value,
+}: ChartOverlayProps<K>) {
+  const resolved = use(value);
+  const target = use(ChartOverlayContext);
+
+  useEffect(() => {
+    if (resolved) {
+      target?.setOverlay(overlay, resolved);
+    }
+  }, [target, overlay, resolved]);
+
+  return resolved ? null : <OverlayStatus>{label} unavailable</OverlayStatus>;
+}
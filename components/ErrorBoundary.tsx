@@ -0,0 +1,46 @@
+"use client";
+
+import { Component, ReactNode } from "react";
+
+interface ErrorBoundaryProps {
+  /**
+   * Rendered in place of the children once they throw; `reset` renders the
+   * children again
+   */
+  fallback: (reset: () => void) => ReactNode;
+  onError?: (error: Error) => void;
+  children: ReactNode;
+}
+
+interface ErrorBoundaryState {
+  failed: boolean;
+}
+
+/**
+ * Catches errors thrown while rendering its children, including promises
+ * read with `use` that reject
+ */
+export default class ErrorBoundary extends Component<
+  ErrorBoundaryProps,
+  ErrorBoundaryState
+> {
+  state: ErrorBoundaryState = { failed: false };
+
+  static getDerivedStateFromError(): ErrorBoundaryState {
+    return { failed: true };
+  }
+
+  componentDidCatch(error: Error) {
+    this.props.onError?.(error);
+  }
+
+  reset = () => {
+    this.setState({ failed: false });
+  };
+
+  render() {
+    return this.state.failed
+      ? this.props.fallback(this.reset)
+      : this.props.children;
+  }
+}
@@ -0,0 +1,171 @@
+"use client";
+
+import BitcoinChart from "@/components/BitcoinChart";
+import ErrorBoundary from "@/components/ErrorBoundary";
+import { Button } from "@/components/ui/button";
+import {
+  Empty,
+  EmptyContent,
+  EmptyDescription,
+  EmptyHeader,
+  EmptyMedia,
+  EmptyTitle,
+} from "@/components/ui/empty";
+import { Field, FieldLabel } from "@/components/ui/field";
+import { Spinner } from "@/components/ui/spinner";
+import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
+import { Timeframe, TIMEFRAME_LABELS, TIMEFRAMES } from "@/lib/constants";
+import {
+  loadOverlay,
+  loadTimeframe,
+  prefetchTimeframe,
+  retryTimeframe,
+} from "@/lib/timeframe-client";
+import { PendingChartOverlays, TimeframeChart } from "@/lib/timeframe-payload";
+import { Suspense, use, useState } from "react";
+
+interface TimeframeTabsProps {
+  initialTimeframe: Timeframe;
+  /**
+   * Chart for `initialTimeframe`, streamed from the server (null when the
+   * server had none, in which case it is requested like the other
+   * timeframes)
+   */
+  initialChart: Promise<TimeframeChart | null>;
+  /**
+   * Overlays for `initialTimeframe`, each streamed as its source is ready
+   */
+  initialOverlays: PendingChartOverlays;
+}
+
+interface TimeframePanelProps {
+  timeframe: Timeframe;
+  initialChart?: Promise<TimeframeChart | null>;
+  initialOverlays?: PendingChartOverlays;
+}
+
+/**
+ * One timeframe's chart; suspends until its series arrive, while each
+ * overlay suspends separately inside the chart
+ */
+function TimeframePanel({
+  timeframe,
+  initialChart,
+  initialOverlays,
+}: TimeframePanelProps) {
+  // Requested before suspending on the chart, so they load in parallel
+  const overlays = initialOverlays ?? {
+    halvings: loadOverlay("halvings", timeframe),
+    fearGreed: loadOverlay("fearGreed", timeframe),
+  };
+  const embedded = initialChart ? use(initialChart) : null;
+  const chart = embedded ?? use(loadTimeframe(timeframe));
+
+  return (
+    <BitcoinChart
+      series={chart.series}
+      orderBlocks={chart.orderBlocks}
+      timeframe={timeframe}
+      overlays={overlays}
+    />
+  );
+}
+
+/**
+ * Timeframe tabs that load each timeframe's data on first activation (or
+ * earlier, when the tab is hovered or focused)
+ */
+export default function TimeframeTabs({
+  initialTimeframe,
+  initialChart,
+  initialOverlays,
+}: TimeframeTabsProps) {
+  const [active, setActive] = useState<Timeframe>(initialTimeframe);
+
+  return (
+    <Tabs
+      value={active}
+      onValueChange={(value) => setActive(value as Timeframe)}
+      className="w-full"
+    >
+      <Field>
+        <FieldLabel>Timeframe</FieldLabel>
+        <TabsList>
+          {TIMEFRAMES.map((tf) => (
+            <TabsTrigger
+              key={tf}
+              value={tf}
+              onPointerEnter={() => prefetchTimeframe(tf)}
+              onFocus={() => prefetchTimeframe(tf)}
+            >
+              {TIMEFRAME_LABELS[tf]}
+            </TabsTrigger>
+          ))}
+        </TabsList>
+      </Field>
+
+      {TIMEFRAMES.map((tf) => (
+        <TabsContent key={tf} value={tf}>
+          <ErrorBoundary
+            onError={(error) =>
+              console.error(`Failed to load ${tf} data:`, error)
+            }
+            fallback={(reset) => (
+              <Empty className="border">
+                <EmptyHeader>
+                  <EmptyMedia>
+                    <div className="text-muted-foreground">⚠️</div>
+                  </EmptyMedia>
+                  <EmptyTitle>Failed to load chart data</EmptyTitle>
+                  <EmptyDescription>
+                    Unable to fetch Bitcoin data for {TIMEFRAME_LABELS[tf]}.
+                    Please try again later.
+                  </EmptyDescription>
+                </EmptyHeader>
+                <EmptyContent>
+                  <Button
+                    variant="outline"
+                    size="sm"
+                    onClick={() => {
+                      retryTimeframe(tf);
+                      reset();
+                    }}
+                  >
+                    Retry
+                  </Button>
+                </EmptyContent>
+              </Empty>
+            )}
+          >
+            <Suspense
+              fallback={
+                <Empty className="border">
+                  <EmptyHeader>
+                    <EmptyMedia>
+                      <Spinner />
+                    </EmptyMedia>
+                    <EmptyTitle>Loading chart data</EmptyTitle>
+                    <EmptyDescription>
+                      Fetching the latest Bitcoin data for{" "}
+                      {TIMEFRAME_LABELS[tf]}...
+                    </EmptyDescription>
+                  </EmptyHeader>
+                </Empty>
+              }
+            >
+              {tf === initialTimeframe ? (
+                <TimeframePanel
+                  timeframe={tf}
+                  initialChart={initialChart}
+                  initialOverlays={initialOverlays}
+                />
+              ) : (
+                <TimeframePanel timeframe={tf} />
+              )}
+            </Suspense>
+          </ErrorBoundary>
+        </TabsContent>
+      ))}
+    </Tabs>
+  );
+}
@@ -0,0 +1,15 @@
+/**
+ * Next.js instrumentation hook: start background market data ingestion once
+ * per server process, so page renders read snapshots instead of waiting on
+ * upstream APIs
+ */
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== "nodejs") {
+    return;
+  }
+  const { marketData } = await import("@/lib/market-data");
+  console.log(
+    `[${new Date().toISOString()}] 🛰️ Starting background market data ingestion`
+  );
+  marketData.start();
+}
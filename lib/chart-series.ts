@@ -0,0 +1,321 @@
+/**
+ * Chart series preparation
+ *
+ * Turns the columnar candles and indicator buffers into the arrays that
+ * lightweight-charts `setData`/`setMarkers` expect, in a single pass over the
+ * bars. Runs on the server, once per set of snapshots (see timeframeChart in
+ * lib/market-data.ts), so browsers receive the series ready to draw.
+ *
+ * The halving markers and the Fear and Greed line come from other sources
+ * than the candles, so they are built separately as overlays that the page
+ * streams in after the chart itself.
+ */
+
+import {
+  calculateHalvingSignals,
+  findNearestCandlestick,
+} from "@/lib/halving-signals";
+import { OHLCVSeries } from "@/lib/ohlcv";
+import {
+  CandlestickData,
+  HistogramData,
+  LineData,
+  SeriesMarker,
+  Time,
+} from "lightweight-charts";
+
+// Minimum value for logarithmic scale to avoid log(0) or log(negative) issues
+const MIN_LOG_VALUE = 0.01;
+
+export interface ChartIndicators {
+  ema13: Float64Array;
+  ema21: Float64Array;
+  ema50: Float64Array;
+  ema100: Float64Array;
+  bollinger: {
+    upper: Float64Array;
+    middle: Float64Array;
+    lower: Float64Array;
+  };
+  stochastic: {
+    k: Float64Array;
+    d: Float64Array;
+  };
+}
+
+export interface ChartSeriesInput {
+  data: OHLCVSeries;
+  indicators: ChartIndicators;
+}
+
+/**
+ * Fear and Greed readings keyed by UTC day number (epoch seconds / 86400)
+ */
+export type FearGreedByDay = Map<
+  number,
+  { value: number; classification: string }
+>;
+
+/**
+ * Ready-to-`setData` series for every line and histogram drawn by
+ * CandlestickChart, apart from the overlays
+ */
+export interface ChartSeries {
+  candlestick: CandlestickData<Time>[];
+  volume: HistogramData<Time>[];
+  ema13: LineData<Time>[];
+  ema21: LineData<Time>[];
+  ema50: LineData<Time>[];
+  ema100: LineData<Time>[];
+  bbUpper: LineData<Time>[];
+  bbMiddle: LineData<Time>[];
+  bbLower: LineData<Time>[];
+  /**
+   * Bollinger Bands without values a logarithmic scale cannot draw
+   */
+  bbUpperLog: LineData<Time>[];
+  bbMiddleLog: LineData<Time>[];
+  bbLowerLog: LineData<Time>[];
+  stochasticK: LineData<Time>[];
+  stochasticD: LineData<Time>[];
+  stochasticOverbought: LineData<Time>[];
+  stochasticOversold: LineData<Time>[];
+  /**
+   * Reference levels of the Fear and Greed pane (see buildFearGreedLine for
+   * the index itself)
+   */
+  fearGreedExtremeFear: LineData<Time>[];
+  fearGreedFear: LineData<Time>[];
+  fearGreedNeutral: LineData<Time>[];
+  fearGreedGreed: LineData<Time>[];
+  fearGreedExtremeGreed: LineData<Time>[];
+}
+
+// Indicator values of 0 or NaN are gaps, as with the `|| null` the chart
+// data previously went through
+function pushLine(line: LineData<Time>[], t: Time, value: number) {
+  if (value) {
+    line.push({ time: t, value });
+  }
+}
+
+/**
+ * Halving and cycle signal markers on the candles nearest to each date,
+ * sorted by time
+ */
+export function buildHalvingMarkers(
+  time: Uint32Array,
+  halvingDates: string[]
+): SeriesMarker<Time>[] {
+  if (!time.length || halvingDates.length === 0) return [];
+
+  // Convert string dates to Date objects and calculate signals
+  const halvingDatesArray = halvingDates.map((dateStr) => new Date(dateStr));
+  const signals = calculateHalvingSignals(halvingDatesArray);
+  const rangeStart = time[0];
+  const rangeEnd = time[time.length - 1];
+
+  // Signal labels keyed by the index of the nearest candlestick
+  const halvingLabels = new Map<number, string>();
+  const topSignalLabels = new Map<number, string>();
+  const bottomSignalLabels = new Map<number, string>();
+
+  const labelNearestCandlesticks = (
+    signalDates: Date[],
+    labels: Map<number, string>,
+    getLabel: (signalIndex: number) => string
+  ) => {
+    signalDates.forEach((signalDate, i) => {
+      const seconds = signalDate.getTime() / 1000;
+      if (seconds >= rangeStart && seconds <= rangeEnd) {
+        labels.set(findNearestCandlestick(signalDate, time), getLabel(i));
+      }
+    });
+  };
+
+  labelNearestCandlesticks(
+    signals.halvings,
+    halvingLabels,
+    (i) => `Halving ${i + 1}`
+  );
+  labelNearestCandlesticks(signals.topSignals, topSignalLabels, () => "Top");
+  labelNearestCandlesticks(
+    signals.bottomSignals,
+    bottomSignalLabels,
+    () => "Bottom"
+  );
+
+  // Several signals can share a candle; they keep this order within it
+  const indices = [
+    ...new Set([
+      ...halvingLabels.keys(),
+      ...topSignalLabels.keys(),
+      ...bottomSignalLabels.keys(),
+    ]),
+  ].sort((a, b) => a - b);
+
+  const markers: SeriesMarker<Time>[] = [];
+  for (const index of indices) {
+    const timestamp = time[index] as Time;
+    const halvingLabel = halvingLabels.get(index);
+    if (halvingLabel !== undefined) {
+      markers.push({
+        time: timestamp,
+        position: "belowBar",
+        color: "#f59e0b",
+        shape: "circle",
+        size: 2,
+        text: halvingLabel,
+      });
+    }
+    const topSignalLabel = topSignalLabels.get(index);
+    if (topSignalLabel !== undefined) {
+      markers.push({
+        time: timestamp,
+        position: "aboveBar",
+        color: "#ef4444",
+        shape: "arrowDown",
+        size: 2,
+        text: topSignalLabel,
+      });
+    }
+    const bottomSignalLabel = bottomSignalLabels.get(index);
+    if (bottomSignalLabel !== undefined) {
+      markers.push({
+        time: timestamp,
+        position: "belowBar",
+        color: "#10b981",
+        shape: "arrowUp",
+        size: 2,
+        text: bottomSignalLabel,
+      });
+    }
+  }
+  return markers;
+}
+
+/**
+ * Fear and Greed Index at every candle whose UTC day has a reading
+ */
+export function buildFearGreedLine(
+  time: Uint32Array,
+  fearGreedData: FearGreedByDay
+): LineData<Time>[] {
+  const line: LineData<Time>[] = [];
+  for (let index = 0; index < time.length; index++) {
+    const point = fearGreedData.get(Math.floor(time[index] / 86400));
+    pushLine(line, time[index] as Time, point?.value ?? 0);
+  }
+  return line;
+}
+
+/**
+ * Build the chart series for one timeframe, or null when there are no
+ * candles yet
+ */
+export function buildChartSeries({
+  data,
+  indicators,
+}: ChartSeriesInput): ChartSeries | null {
+  const { time } = data;
+  if (!time.length) return null;
+
+  const series: ChartSeries = {
+    candlestick: [],
+    volume: [],
+    ema13: [],
+    ema21: [],
+    ema50: [],
+    ema100: [],
+    bbUpper: [],
+    bbMiddle: [],
+    bbLower: [],
+    bbUpperLog: [],
+    bbMiddleLog: [],
+    bbLowerLog: [],
+    stochasticK: [],
+    stochasticD: [],
+    stochasticOverbought: [],
+    stochasticOversold: [],
+    fearGreedExtremeFear: [],
+    fearGreedFear: [],
+    fearGreedNeutral: [],
+    fearGreedGreed: [],
+    fearGreedExtremeGreed: [],
+  };
+
+  const pushBand = (
+    line: LineData<Time>[],
+    logLine: LineData<Time>[],
+    t: Time,
+    value: number
+  ) => {
+    if (value) {
+      line.push({ time: t, value });
+      if (value > MIN_LOG_VALUE) {
+        logLine.push({ time: t, value });
+      }
+    }
+  };
+
+  for (let index = 0; index < time.length; index++) {
+    const timestamp = time[index] as Time;
+    const open = data.open[index];
+    const close = data.close[index];
+
+    series.candlestick.push({
+      time: timestamp,
+      open,
+      high: data.high[index],
+      low: data.low[index],
+      close,
+    });
+    series.volume.push({
+      time: timestamp,
+      value: data.volume[index],
+      color:
+        close >= open ? "rgba(38, 166, 154, 0.2)" : "rgba(239, 83, 80, 0.2)",
+    });
+
+    pushLine(series.ema13, timestamp, indicators.ema13[index]);
+    pushLine(series.ema21, timestamp, indicators.ema21[index]);
+    pushLine(series.ema50, timestamp, indicators.ema50[index]);
+    pushLine(series.ema100, timestamp, indicators.ema100[index]);
+
+    const { bollinger, stochastic } = indicators;
+    pushBand(
+      series.bbUpper,
+      series.bbUpperLog,
+      timestamp,
+      bollinger.upper[index]
+    );
+    pushBand(
+      series.bbMiddle,
+      series.bbMiddleLog,
+      timestamp,
+      bollinger.middle[index]
+    );
+    pushBand(
+      series.bbLower,
+      series.bbLowerLog,
+      timestamp,
+      bollinger.lower[index]
+    );
+
+    // Stochastic oscillator and its reference lines (80 and 20)
+    pushLine(series.stochasticK, timestamp, stochastic.k[index]);
+    pushLine(series.stochasticD, timestamp, stochastic.d[index]);
+    series.stochasticOverbought.push({ time: timestamp, value: 80 });
+    series.stochasticOversold.push({ time: timestamp, value: 20 });
+
+    // Fear and Greed reference lines
+    series.fearGreedExtremeFear.push({ time: timestamp, value: 25 });
+    series.fearGreedFear.push({ time: timestamp, value: 45 });
+    series.fearGreedNeutral.push({ time: timestamp, value: 55 });
+    series.fearGreedGreed.push({ time: timestamp, value: 75 });
+    // Use 90 for extreme greed to reflect realistic ceiling
+    series.fearGreedExtremeGreed.push({ time: timestamp, value: 90 });
+  }
+
+  return series;
+}
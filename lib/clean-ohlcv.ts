@@ -0,0 +1,196 @@
+/**
+ * Gap-aware candle cleaning
+ *
+ * The indicator kernels treat consecutive rows as consecutive periods, so a
+ * missing candle silently stretches every EMA, Bollinger and stochastic
+ * window across it. This pass checks a series against its expected cadence
+ * (a `ResampleRule`, one candle per period) in a single walk over the
+ * columns:
+ * - candles in the same period are deduplicated, the later one winning as
+ *   the latest revision
+ * - candles older than the previous period are dropped as out of order
+ * - missing periods are forward-filled with flat candles at the previous
+ *   close and zero volume, or left out and only reported
+ *
+ * Every gap is listed in the report along with the counts above.
+ */
+
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+import { nextPeriodStart, periodStart, ResampleRule } from "@/lib/resample";
+
+/**
+ * How missing periods are handled:
+ * - `forward`: insert a flat candle at the previous close with zero volume
+ * - `none`: leave the gap in the series (it is still reported)
+ */
+export type GapFill = "forward" | "none";
+
+export interface OHLCVGap {
+  /**
+   * Start of the first missing period (epoch seconds)
+   */
+  from: number;
+  /**
+   * Start of the period that resumes the series (epoch seconds)
+   */
+  to: number;
+  missingBars: number;
+}
+
+export interface OHLCVCleanReport {
+  inputRows: number;
+  outputRows: number;
+  /**
+   * Candles replaced by a later candle in the same period
+   */
+  duplicates: number;
+  /**
+   * Candles dropped for falling before the previous period
+   */
+  outOfOrder: number;
+  /**
+   * Flat candles inserted into gaps (0 unless filling forward)
+   */
+  filledBars: number;
+  gaps: OHLCVGap[];
+  /**
+   * First output row that differs from the input row at the same index
+   * (`outputRows` when the series came through unchanged). Rows before it
+   * are identical to the input, so stores can keep them as they are.
+   */
+  firstChangedRow: number;
+}
+
+export interface CleanOHLCVResult {
+  series: OHLCVSeries;
+  report: OHLCVCleanReport;
+}
+
+const COLUMNS = ["time", "open", "high", "low", "close", "volume"] as const;
+
+/**
+ * Align a series to one candle per period of `rule`, in one pass over the
+ * input. Returns the input series itself when nothing needed cleaning.
+ */
+export function cleanOHLCV(
+  data: OHLCVSeries,
+  rule: ResampleRule,
+  fill: GapFill = "forward"
+): CleanOHLCVResult {
+  const length = data.time.length;
+  let output = createOHLCVSeries(length);
+  let count = 0;
+  let duplicates = 0;
+  let outOfOrder = 0;
+  let filledBars = 0;
+  let firstChangedRow = -1;
+  const gaps: OHLCVGap[] = [];
+
+  let currentPeriod = -Infinity;
+  let expectedPeriod = -Infinity;
+
+  // Room for one more row, doubling when a fill outgrows the input length
+  const reserve = () => {
+    if (count < output.time.length) {
+      return;
+    }
+    const grown = createOHLCVSeries(Math.max(16, output.time.length * 2));
+    for (const column of COLUMNS) {
+      grown[column].set(output[column]);
+    }
+    output = grown;
+  };
+  // A duplicate can rewrite a row before one already marked (after dropping
+  // out-of-order candles), so keep the lowest
+  const markChanged = (row: number) => {
+    if (firstChangedRow === -1 || row < firstChangedRow) {
+      firstChangedRow = row;
+    }
+  };
+
+  for (let i = 0; i < length; i++) {
+    const period = periodStart(data.time[i], rule);
+
+    if (period < currentPeriod) {
+      outOfOrder++;
+      markChanged(count);
+      continue;
+    }
+
+    let row = count;
+    if (period === currentPeriod) {
+      duplicates++;
+      row = count - 1;
+      markChanged(row);
+    } else {
+      if (period > expectedPeriod && count > 0) {
+        let missingBars = 0;
+        const previousClose = output.close[count - 1];
+        for (
+          let missing = expectedPeriod;
+          missing < period;
+          missing = nextPeriodStart(missing, rule)
+        ) {
+          missingBars++;
+          if (fill === "forward") {
+            reserve();
+            markChanged(count);
+            output.time[count] = missing;
+            output.open[count] = previousClose;
+            output.high[count] = previousClose;
+            output.low[count] = previousClose;
+            output.close[count] = previousClose;
+            output.volume[count] = 0;
+            count++;
+          }
+        }
+        if (fill === "forward") {
+          filledBars += missingBars;
+        }
+        gaps.push({ from: expectedPeriod, to: period, missingBars });
+      }
+      reserve();
+      row = count++;
+      currentPeriod = period;
+      expectedPeriod = nextPeriodStart(period, rule);
+    }
+
+    if (row !== i) {
+      markChanged(row);
+    }
+    output.time[row] = data.time[i];
+    output.open[row] = data.open[i];
+    output.high[row] = data.high[i];
+    output.low[row] = data.low[i];
+    output.close[row] = data.close[i];
+    output.volume[row] = data.volume[i];
+  }
+
+  const report: OHLCVCleanReport = {
+    inputRows: length,
+    outputRows: count,
+    duplicates,
+    outOfOrder,
+    filledBars,
+    gaps,
+    firstChangedRow: firstChangedRow === -1 ? count : firstChangedRow,
+  };
+
+  if (firstChangedRow === -1) {
+    return { series: data, report };
+  }
+  if (count === output.time.length) {
+    return { series: output, report };
+  }
+  return {
+    series: {
+      time: output.time.slice(0, count),
+      open: output.open.slice(0, count),
+      high: output.high.slice(0, count),
+      low: output.low.slice(0, count),
+      close: output.close.slice(0, count),
+      volume: output.volume.slice(0, count),
+    },
+    report,
+  };
+}
@@ -1,3 +1,5 @@
+import { ResampleRule } from "@/lib/resample";
+
 /**
  * Bitcoin genesis block date: January 3, 2009
  * This is when Bitcoin was created
@@ -7,12 +9,28 @@ export const BITCOIN_BIRTH_DATE = "2009-01-03";
 export const TIMEFRAMES = ["1d", "1w", "1m"] as const;
 export type Timeframe = (typeof TIMEFRAMES)[number];
 
+/**
+ * Timeframe shown on first load; the only one embedded in the page
+ */
+export const DEFAULT_TIMEFRAME: Timeframe = "1m";
+
 export const TIMEFRAME_LABELS: Record<(typeof TIMEFRAMES)[number], string> = {
   "1d": "1 Day",
   "1w": "1 Week",
   "1m": "1 Month",
 };
 
+/**
+ * How each timeframe is derived from the fetched daily candles (null for the
+ * daily candles themselves)
+ */
+export const TIMEFRAME_RESAMPLE_RULES: Record<Timeframe, ResampleRule | null> =
+  {
+    "1d": null,
+    "1w": { unit: "week", weekStartsOn: 1 },
+    "1m": { unit: "month", size: 1 },
+  };
+
 // Number of days to focus on for each timeframe's initial viewport
 export const TIMEFRAME_FOCUS_WINDOWS_DAYS: Record<Timeframe, number> = {
   "1d": 365 * 1, // 1 year
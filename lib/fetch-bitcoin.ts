@@ -1,39 +1,43 @@
+import { cleanOHLCV } from "@/lib/clean-ohlcv";
 import { BITCOIN_BIRTH_DATE } from "@/lib/constants";
-import { OHLCV } from "@/lib/indicators";
-
-interface BitcoinDataPoint {
-  date: string;
-  open: number;
-  high: number;
-  low: number;
-  close: number;
-  volume: number;
-}
-
-interface YahooFinanceResponse {
-  chart: {
-    result: Array<{
-      timestamp: number[];
-      indicators: {
-        quote: Array<{
-          open: number[];
-          high: number[];
-          low: number[];
-          close: number[];
-          volume: number[];
-        }>;
-      };
-    }>;
-  };
-}
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+import { ohlcvStore } from "@/lib/ohlcv-store";
+import { ResampleRule } from "@/lib/resample";
+import { upstreamClient } from "@/lib/upstream-client";
+import { YahooChartParser } from "@/lib/yahoo-chart-parser";
+
+// Stored candles re-requested on every refresh, so a still-forming candle and
+// Yahoo's provisional timestamp on the latest bar are always replaced
+const STORE_OVERLAP_BARS = 3;
+// Gaps in the stored history this close to its end are re-requested on every
+// refresh, in case Yahoo publishes the missing candles late
+const GAP_RECHECK_SECONDS = 30 * 86400;
+
+// Expected candle cadence per Yahoo Finance interval (Bitcoin trades every
+// day, and Yahoo stamps weekly candles on Mondays)
+const YAHOO_INTERVAL_CADENCE: Record<string, ResampleRule> = {
+  "1d": { unit: "day", size: 1 },
+  "1wk": { unit: "week", weekStartsOn: 1 },
+  "1mo": { unit: "month", size: 1 },
+};
 
 /**
  * Fetch Bitcoin data directly (bypassing HTTP layer)
  * Same logic as /api/bitcoin but called as a function
+ *
+ * History is kept in the local candle store, so only the candles since the
+ * last stored one (minus a small overlap) are requested from Yahoo Finance.
+ * When the request fails, the stored history is returned as is.
+ *
+ * The merged history is deduplicated and ordered before it is stored, and
+ * missing candles are forward-filled only in the returned series (see
+ * lib/clean-ohlcv.ts), so indicator windows never span a missing candle while
+ * the store keeps real candles only. Recent gaps are re-requested, so a
+ * candle published late still fills its gap.
  */
 export async function fetchBitcoinDataDirect(
   timeframe: string
-): Promise<OHLCV[]> {
+): Promise<OHLCVSeries> {
   const startTime = Date.now();
   console.log(
     `[${new Date().toISOString()}] 📈 Starting Bitcoin ${timeframe} fetch...`
@@ -51,12 +55,147 @@ export async function fetchBitcoinDataDirect(
     `[${new Date().toISOString()}] 🔄 Mapped ${timeframe} to Yahoo Finance interval: ${yfInterval}`
   );
 
-  // Build Yahoo Finance API URL
-  const now_timestamp = Math.floor(Date.now() / 1000);
-  const startTimestamp = Math.floor(
+  const storeKey = `btc-usd-${yfInterval}`;
+  const stored = await ohlcvStore.read(storeKey).catch((error) => {
+    console.warn(
+      `[${new Date().toISOString()}] ⚠️ Could not load stored ${storeKey} candles, fetching full history:`,
+      error
+    );
+    return null;
+  });
+  const storedLength = stored?.time.length ?? 0;
+  console.log(
+    `[${new Date().toISOString()}] 💾 Loaded ${storedLength} stored ${storeKey} candles in ${Date.now() - startTime}ms`
+  );
+
+  const cadence = YAHOO_INTERVAL_CADENCE[yfInterval];
+  let startTimestamp = Math.floor(
     new Date(BITCOIN_BIRTH_DATE).getTime() / 1000
   );
-  const endTimestamp = now_timestamp;
+  if (stored && storedLength > 0) {
+    startTimestamp =
+      stored.time[Math.max(0, storedLength - STORE_OVERLAP_BARS)];
+    const recheckFrom = stored.time[storedLength - 1] - GAP_RECHECK_SECONDS;
+    const gap = cadence
+      ? cleanOHLCV(stored, cadence, "none").report.gaps.find(
+          ({ to }) => to > recheckFrom
+        )
+      : undefined;
+    if (gap && gap.from < startTimestamp) {
+      console.log(
+        `[${new Date().toISOString()}] 🕳️ Re-requesting ${storeKey} from the gap at ${new Date(gap.from * 1000).toISOString()} (${gap.missingBars} missing)`
+      );
+      startTimestamp = gap.from;
+    }
+  }
+
+  let fresh: OHLCVSeries;
+  try {
+    fresh = await fetchYahooCandles(yfInterval, startTimestamp);
+  } catch (error) {
+    if (!stored) {
+      throw error;
+    }
+    console.error(
+      `[${new Date().toISOString()}] ❌ Yahoo Finance refresh failed, serving ${storedLength} stored candles:`,
+      error
+    );
+    return fillGaps(stored, yfInterval, storeKey);
+  }
+
+  let { series, keepRows } = mergeTail(stored, fresh);
+  if (cadence) {
+    const { series: cleaned, report } = cleanOHLCV(series, cadence, "none");
+    if (report.duplicates > 0 || report.outOfOrder > 0) {
+      console.log(
+        `[${new Date().toISOString()}] 🧹 Cleaned ${storeKey} candles: ${report.duplicates} duplicate(s), ${report.outOfOrder} out of order`
+      );
+    }
+    series = cleaned;
+    keepRows = Math.min(keepRows, report.firstChangedRow);
+  }
+
+  if (keepRows < series.time.length || keepRows < storedLength) {
+    await ohlcvStore.write(storeKey, series, keepRows).catch((error) => {
+      console.warn(
+        `[${new Date().toISOString()}] ⚠️ Could not persist ${storeKey} candles:`,
+        error
+      );
+    });
+  }
+
+  const filled = fillGaps(series, yfInterval, storeKey);
+  const duration = Date.now() - startTime;
+  console.log(
+    `[${new Date().toISOString()}] ✅ Bitcoin ${timeframe} fetch completed in ${duration}ms with ${filled.time.length} data points (${fresh.time.length} fetched)`
+  );
+
+  return filled;
+}
+
+/**
+ * Forward-fill the missing candles of a stored (deduplicated, ordered)
+ * series for the indicator kernels. The result is never written back.
+ */
+function fillGaps(
+  series: OHLCVSeries,
+  yfInterval: string,
+  storeKey: string
+): OHLCVSeries {
+  const cadence = YAHOO_INTERVAL_CADENCE[yfInterval];
+  if (!cadence) {
+    return series;
+  }
+  const { series: filled, report } = cleanOHLCV(series, cadence);
+  if (report.filledBars > 0) {
+    console.log(
+      `[${new Date().toISOString()}] 🧹 Filled ${report.filledBars} missing ${storeKey} candles:`,
+      report.gaps.slice(-5)
+    );
+  }
+  return filled;
+}
+
+/**
+ * Replace the stored candles from the first fetched timestamp onwards with
+ * the fetched ones. `keepRows` is how many leading stored rows are unchanged.
+ */
+function mergeTail(
+  stored: OHLCVSeries | null,
+  fresh: OHLCVSeries
+): { series: OHLCVSeries; keepRows: number } {
+  if (!stored || stored.time.length === 0) {
+    return { series: fresh, keepRows: 0 };
+  }
+  if (fresh.time.length === 0) {
+    return { series: stored, keepRows: stored.time.length };
+  }
+
+  let keepRows = stored.time.length;
+  while (keepRows > 0 && stored.time[keepRows - 1] >= fresh.time[0]) {
+    keepRows--;
+  }
+
+  const length = keepRows + fresh.time.length;
+  const series = createOHLCVSeries(length);
+  const columns = ["time", "open", "high", "low", "close", "volume"] as const;
+  for (const column of columns) {
+    series[column].set(stored[column].subarray(0, keepRows));
+    series[column].set(fresh[column], keepRows);
+  }
+  return { series, keepRows };
+}
+
+/**
+ * Request the candles from `startTimestamp` until now and convert them to a
+ * series
+ */
+async function fetchYahooCandles(
+  yfInterval: string,
+  startTimestamp: number
+): Promise<OHLCVSeries> {
+  // Build Yahoo Finance API URL
+  const endTimestamp = Math.floor(Date.now() / 1000);
 
   const url = `https://query1.finance.yahoo.com/v8/finance/chart/BTC-USD?interval=${yfInterval}&period1=${startTimestamp}&period2=${endTimestamp}&includePrePost=false&events=div%7Csplit%7Cearn&lang=en-US&region=US`;
 
@@ -64,11 +203,12 @@ export async function fetchBitcoinDataDirect(
     `[${new Date().toISOString()}] 🌐 Fetching from Yahoo Finance: ${url}`
   );
 
-  const response = await fetch(url, {
-    headers: {
-      "User-Agent": "Mozilla/5.0",
-    },
-  });
+  // Parse the body into typed columns as it arrives, a fresh parser per
+  // attempt
+  const response = await upstreamClient.stream(
+    url,
+    () => new YahooChartParser()
+  );
 
   console.log(
     `[${new Date().toISOString()}] 📡 Yahoo Finance response status: ${response.status}`
@@ -81,42 +221,10 @@ export async function fetchBitcoinDataDirect(
     throw new Error(`Yahoo Finance API error: ${response.statusText}`);
   }
 
-  const data: YahooFinanceResponse = await response.json();
-  console.log(
-    `[${new Date().toISOString()}] 📦 Received data from Yahoo Finance`
-  );
-
-  if (!data.chart?.result?.[0]) {
-    console.error(
-      `[${new Date().toISOString()}] ❌ No chart data in Yahoo Finance response`
-    );
-    throw new Error("No data returned from Yahoo Finance");
-  }
-
-  const result = data.chart.result[0];
-  const timestamps = result.timestamp;
-  const quote = result.indicators.quote[0];
-
-  console.log(
-    `[${new Date().toISOString()}] 📊 Processing ${timestamps.length} data points from Yahoo Finance`
-  );
-
-  // Convert to our format
-  const dataPoints: BitcoinDataPoint[] = timestamps
-    .map((timestamp, index) => ({
-      date: new Date(timestamp * 1000).toISOString(),
-      open: quote.open[index] || 0,
-      high: quote.high[index] || 0,
-      low: quote.low[index] || 0,
-      close: quote.close[index] || 0,
-      volume: quote.volume[index] || 0,
-    }))
-    .filter((point) => point.open > 0 && point.close > 0);
-
-  const duration = Date.now() - startTime;
+  const { series, rawCount, droppedCount, filledCount } = response.value!;
   console.log(
-    `[${new Date().toISOString()}] ✅ Bitcoin ${timeframe} fetch completed in ${duration}ms with ${dataPoints.length} data points`
+    `[${new Date().toISOString()}] 📊 Parsed ${rawCount} data points from Yahoo Finance (${droppedCount} dropped without open/close, ${filledCount} with gaps filled)`
   );
 
-  return dataPoints;
+  return series;
 }
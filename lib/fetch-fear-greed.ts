@@ -1,9 +1,31 @@
-interface FearGreedDataPoint {
+import { readJsonFile, writeJsonFile } from "@/lib/json-store";
+import { upstreamClient } from "@/lib/upstream-client";
+
+const SECONDS_PER_DAY = 86400;
+const FEAR_GREED_CACHE_FILE = "fear-greed.json";
+// Stored days re-requested on every refresh, in case the latest reading was
+// revised
+const OVERLAP_DAYS = 2;
+
+export interface FearGreedDataPoint {
+  /**
+   * UTC day number (epoch seconds / 86400)
+   */
+  day: number;
   date: string;
   value: number;
   classification: string;
 }
 
+type FearGreedReading = [day: number, value: number, classification: string];
+
+/**
+ * Persisted readings, ascending by day
+ */
+interface FearGreedCache {
+  points: FearGreedReading[];
+}
+
 interface FearGreedAPIResponse {
   name: string;
   data: Array<{
@@ -16,27 +38,109 @@ interface FearGreedAPIResponse {
   };
 }
 
+async function loadFearGreedCache(): Promise<FearGreedReading[]> {
+  try {
+    const cache = await readJsonFile<FearGreedCache>(FEAR_GREED_CACHE_FILE);
+    return cache?.points ?? [];
+  } catch (error) {
+    console.warn(
+      `[${new Date().toISOString()}] ⚠️ Could not load Fear & Greed cache, fetching full history:`,
+      error
+    );
+    return [];
+  }
+}
+
+function toDataPoint([
+  day,
+  value,
+  classification,
+]: FearGreedReading): FearGreedDataPoint {
+  return {
+    day,
+    date: new Date(day * SECONDS_PER_DAY * 1000).toISOString(),
+    value,
+    classification,
+  };
+}
+
 /**
  * Fetch Fear and Greed Index data directly (bypassing HTTP layer)
+ *
+ * Readings are persisted by UTC day, so only the days since the last stored
+ * one are requested. When the request fails, the stored readings are
+ * returned as is.
  */
 export async function fetchFearGreedDataDirect(): Promise<
-  Array<{ date: string; value: number; classification: string }>
+  FearGreedDataPoint[]
 > {
   const startTime = Date.now();
   console.log(
     `[${new Date().toISOString()}] 😱 Starting Fear & Greed Index fetch...`
   );
 
-  const url = `https://api.alternative.me/fng/?limit=0`;
+  const stored = await loadFearGreedCache();
+  const today = Math.floor(Date.now() / 1000 / SECONDS_PER_DAY);
+  const lastStoredDay =
+    stored.length > 0 ? stored[stored.length - 1][0] : null;
+  // limit=0 returns the entire history
+  const limit =
+    lastStoredDay === null
+      ? 0
+      : Math.max(1, today - lastStoredDay + 1 + OVERLAP_DAYS);
+
+  const url = `https://api.alternative.me/fng/?limit=${limit}`;
   console.log(
     `[${new Date().toISOString()}] 🌐 Fetching from Alternative.me: ${url}`
   );
 
-  const response = await fetch(url, {
-    headers: {
-      "User-Agent": "Mozilla/5.0",
-    },
-  });
+  let fetched: FearGreedReading[];
+  try {
+    fetched = await fetchReadings(url);
+  } catch (error) {
+    if (stored.length === 0) {
+      throw error;
+    }
+    console.error(
+      `[${new Date().toISOString()}] ❌ Fear & Greed refresh failed, serving ${stored.length} stored points:`,
+      error
+    );
+    return stored.map(toDataPoint);
+  }
+
+  // Replace stored days from the first fetched day onwards
+  let points = stored;
+  if (fetched.length > 0) {
+    const firstFetchedDay = fetched[0][0];
+    let keep = stored.length;
+    while (keep > 0 && stored[keep - 1][0] >= firstFetchedDay) {
+      keep--;
+    }
+    points = stored.slice(0, keep).concat(fetched);
+    await writeJsonFile(FEAR_GREED_CACHE_FILE, { points }).catch((error) => {
+      console.warn(
+        `[${new Date().toISOString()}] ⚠️ Could not persist Fear & Greed cache:`,
+        error
+      );
+    });
+  }
+
+  const dataPoints = points.map(toDataPoint);
+
+  const duration = Date.now() - startTime;
+  console.log(
+    `[${new Date().toISOString()}] ✅ Fear & Greed fetch completed in ${duration}ms with ${dataPoints.length} data points (${fetched.length} fetched)`
+  );
+
+  return dataPoints;
+}
+
+/**
+ * Request readings and return them as [day, value, classification],
+ * ascending by day with one entry per day
+ */
+async function fetchReadings(url: string): Promise<FearGreedReading[]> {
+  const response = await upstreamClient.get(url);
 
   console.log(
     `[${new Date().toISOString()}] 📡 Alternative.me response status: ${response.status}`
@@ -49,7 +153,7 @@ export async function fetchFearGreedDataDirect(): Promise<
     throw new Error(`Fear and Greed API error: ${response.statusText}`);
   }
 
-  const data: FearGreedAPIResponse = await response.json();
+  const data = await response.json<FearGreedAPIResponse>();
   console.log(
     `[${new Date().toISOString()}] 📦 Received data from Alternative.me`
   );
@@ -65,19 +169,24 @@ export async function fetchFearGreedDataDirect(): Promise<
     `[${new Date().toISOString()}] 📊 Processing ${data.data.length} Fear & Greed data points`
   );
 
-  // Convert to our format
-  const dataPoints: FearGreedDataPoint[] = data.data
-    .map((point) => ({
-      date: new Date(parseInt(point.timestamp) * 1000).toISOString(),
-      value: parseInt(point.value),
-      classification: point.value_classification,
-    }))
-    .sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime()); // Sort by date ascending
-
-  const duration = Date.now() - startTime;
-  console.log(
-    `[${new Date().toISOString()}] ✅ Fear & Greed fetch completed in ${duration}ms with ${dataPoints.length} data points`
+  // The API lists readings newest first, so reversing gives ascending days;
+  // out-of-order input only costs an integer sort
+  const readings = data.data.map(
+    (point): FearGreedReading => [
+      Math.floor(parseInt(point.timestamp) / SECONDS_PER_DAY),
+      parseInt(point.value),
+      point.value_classification,
+    ]
   );
-
-  return dataPoints;
+  readings.reverse();
+  for (let i = 1; i < readings.length; i++) {
+    if (readings[i][0] <= readings[i - 1][0]) {
+      readings.sort((a, b) => a[0] - b[0]);
+      return readings.filter(
+        (reading, index) =>
+          index === readings.length - 1 || reading[0] !== readings[index + 1][0]
+      );
+    }
+  }
+  return readings;
 }
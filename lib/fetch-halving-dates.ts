@@ -1,3 +1,6 @@
+import { readJsonFile, writeJsonFile } from "@/lib/json-store";
+import { upstreamClient } from "@/lib/upstream-client";
+
 /**
  * Bitcoin halving constants
  * Halvings occur every 210,000 blocks starting at block 210,000
@@ -28,6 +31,16 @@ function generateAllHalvingBlocks(): number[] {
 
 const HALVING_BLOCKS = generateAllHalvingBlocks();
 
+// Blocks this deep are final for all practical purposes and safe to cache
+const CONFIRMATION_DEPTH = 6;
+// Protocol target block interval, used when no block interval can be measured
+const TARGET_BLOCK_SECONDS = 600;
+// Blocks per difficulty adjustment period. The projection averages the pace
+// since the start of the last full period before the tip, so it reflects the
+// current hashrate rather than the whole era since the last halving
+const RECENT_BLOCK_WINDOW = 2016;
+const HALVING_CACHE_FILE = "halvings.json";
+
 /**
  * Interface for block data from Blockstream API
  */
@@ -47,13 +60,8 @@ async function fetchCurrentBlockHeight(): Promise<number> {
     `[${new Date().toISOString()}] 🏔️ Fetching current Bitcoin block height from Mempool.space...`
   );
   try {
-    const response = await fetch(
-      "https://mempool.space/api/blocks/tip/height",
-      {
-        headers: {
-          "User-Agent": "Mozilla/5.0",
-        },
-      }
+    const response = await upstreamClient.get(
+      "https://mempool.space/api/blocks/tip/height"
     );
 
     console.log(
@@ -93,13 +101,8 @@ async function fetchBlockHash(blockHeight: number): Promise<string | null> {
     `[${new Date().toISOString()}] 🔍 Fetching block hash for height ${blockHeight}...`
   );
   try {
-    const response = await fetch(
-      `https://mempool.space/api/block-height/${blockHeight}`,
-      {
-        headers: {
-          "User-Agent": "Mozilla/5.0",
-        },
-      }
+    const response = await upstreamClient.get(
+      `https://mempool.space/api/block-height/${blockHeight}`
     );
 
     console.log(
@@ -142,13 +145,8 @@ async function fetchBlockDetails(blockHash: string): Promise<BlockData> {
     `[${new Date().toISOString()}] 📦 Fetching block details for hash ${blockHash}...`
   );
 
-  const blockResponse = await fetch(
-    `https://mempool.space/api/block/${blockHash}`,
-    {
-      headers: {
-        "User-Agent": "Mozilla/5.0",
-      },
-    }
+  const blockResponse = await upstreamClient.get(
+    `https://mempool.space/api/block/${blockHash}`
   );
 
   console.log(
@@ -164,7 +162,7 @@ async function fetchBlockDetails(blockHash: string): Promise<BlockData> {
     );
   }
 
-  const blockData = await blockResponse.json();
+  const blockData = await blockResponse.json<BlockData>();
   console.log(
     `[${new Date().toISOString()}] 📊 Block ${blockData.height} mined at ${new Date(blockData.timestamp * 1000).toISOString()}`
   );
@@ -172,12 +170,128 @@ async function fetchBlockDetails(blockHash: string): Promise<BlockData> {
   return blockData;
 }
 
+/**
+ * Projected next halving, extrapolated from the average block interval since
+ * the recent window start (see recentWindowStart)
+ */
+export interface NextHalvingProjection {
+  height: number;
+  blocksRemaining: number;
+  averageBlockSeconds: number;
+  projectedDate: string;
+}
+
+/**
+ * Timestamp (epoch seconds) of confirmed blocks, keyed by height: every
+ * halving block and the current recent window start
+ */
+type HalvingTimestampCache = Record<string, number>;
+
+/**
+ * Look up the timestamp of one block (height → hash → block), or null when
+ * the block does not exist yet
+ */
+async function fetchBlockTimestamp(
+  blockHeight: number
+): Promise<number | null> {
+  const blockHash = await fetchBlockHash(blockHeight);
+  if (blockHash === null) {
+    return null;
+  }
+  const blockData = await fetchBlockDetails(blockHash);
+  return blockData.timestamp;
+}
+
+async function loadHalvingCache(): Promise<HalvingTimestampCache> {
+  try {
+    return (
+      (await readJsonFile<HalvingTimestampCache>(HALVING_CACHE_FILE)) ?? {}
+    );
+  } catch (error) {
+    console.warn(
+      `[${new Date().toISOString()}] ⚠️ Could not load halving cache, refetching:`,
+      error
+    );
+    return {};
+  }
+}
+
+/**
+ * Height the recent block pace is measured from: the first block of the
+ * newest difficulty period that starts at least RECENT_BLOCK_WINDOW blocks
+ * below the tip. It moves once per period, so its timestamp is cached like
+ * the halving blocks.
+ */
+function recentWindowStart(currentBlockHeight: number): number {
+  const periods = Math.floor(
+    (currentBlockHeight - RECENT_BLOCK_WINDOW) / RECENT_BLOCK_WINDOW
+  );
+  return Math.max(0, periods * RECENT_BLOCK_WINDOW);
+}
+
+/**
+ * Look up the recent window start timestamp. Null when the lookup fails, so
+ * the projection can fall back.
+ */
+async function fetchWindowStartTimestamp(
+  startHeight: number
+): Promise<number | null> {
+  try {
+    return await fetchBlockTimestamp(startHeight);
+  } catch (error) {
+    console.warn(
+      `[${new Date().toISOString()}] ⚠️ Could not measure the recent block interval, falling back:`,
+      error
+    );
+    return null;
+  }
+}
+
+/**
+ * Project the next halving from the tip height, assuming blocks keep coming
+ * at the recent pace. Without one, falls back to the average since the last
+ * known halving, then to 10 minutes.
+ */
+function projectNextHalving(
+  currentBlockHeight: number,
+  recentBlockSeconds: number | null,
+  lastHalving: { height: number; timestamp: number } | null,
+  nowSeconds: number
+): NextHalvingProjection {
+  const height =
+    HALVING_BLOCKS.find((blockHeight) => blockHeight > currentBlockHeight) ??
+    currentBlockHeight + BLOCKS_PER_HALVING;
+  const blocksSince = lastHalving ? currentBlockHeight - lastHalving.height : 0;
+  const averageBlockSeconds =
+    recentBlockSeconds !== null && recentBlockSeconds > 0
+      ? recentBlockSeconds
+      : lastHalving && blocksSince > 0
+        ? (nowSeconds - lastHalving.timestamp) / blocksSince
+        : TARGET_BLOCK_SECONDS;
+  const blocksRemaining = height - currentBlockHeight;
+
+  return {
+    height,
+    blocksRemaining,
+    averageBlockSeconds,
+    projectedDate: new Date(
+      (nowSeconds + blocksRemaining * averageBlockSeconds) * 1000
+    ).toISOString(),
+  };
+}
+
 /**
  * Fetch halving dates directly (bypassing HTTP layer)
  * Same logic as /api/halving-dates but called as a function
+ *
+ * Confirmed block timestamps never change, so they are persisted and the
+ * two-hop block lookup runs only for blocks not cached yet: once after each
+ * new halving, and once per difficulty period for the recent window start.
+ * Otherwise a call requests only the tip height.
  */
 export async function fetchHalvingDatesDirect(): Promise<{
   halvingDates: string[];
+  nextHalving: NextHalvingProjection | null;
 }> {
   const startTime = Date.now();
   console.log(
@@ -185,10 +299,8 @@ export async function fetchHalvingDatesDirect(): Promise<{
   );
 
   try {
-    const halvingDates: Date[] = [];
-    const now = new Date();
+    const nowSeconds = Math.floor(Date.now() / 1000);
 
-    // Fetch current block height to avoid unnecessary API calls for future blocks
     const currentBlockHeight = await fetchCurrentBlockHeight();
 
     // Filter halving blocks to only include those that exist (<= current block height)
@@ -207,79 +319,123 @@ export async function fetchHalvingDatesDirect(): Promise<{
       throw new Error("No halving dates could be fetched");
     }
 
-    // Fetch all block hashes in parallel (these should all exist, avoiding 404s)
-    console.log(
-      `[${new Date().toISOString()}] 🔄 Fetching ${existingHalvingBlocks.length} block hashes in parallel...`
-    );
-    const blockHashPromises = existingHalvingBlocks.map((blockHeight) =>
-      fetchBlockHash(blockHeight)
-    );
-    const blockHashes = await Promise.all(blockHashPromises);
-
-    // Filter out any null values (shouldn't happen, but safety check)
-    const validBlockHashes = blockHashes.filter(
-      (hash): hash is string => hash !== null
-    );
-
-    console.log(
-      `[${new Date().toISOString()}] ✅ Retrieved ${validBlockHashes.length} valid block hashes`
+    const cache = await loadHalvingCache();
+    const missingHalvingBlocks = existingHalvingBlocks.filter(
+      (blockHeight) => cache[blockHeight] === undefined
     );
+    const windowStart = recentWindowStart(currentBlockHeight);
+    const cachedWindowStart = cache[windowStart];
+    // Looked up alongside the halvings; failures only degrade the projection
+    const windowStartTimestamp =
+      cachedWindowStart !== undefined
+        ? Promise.resolve(cachedWindowStart)
+        : fetchWindowStartTimestamp(windowStart);
+
+    // Fetch uncached halvings in parallel
+    const timestamps = new Map<number, number>();
+    let cacheChanged = false;
+    if (missingHalvingBlocks.length > 0) {
+      console.log(
+        `[${new Date().toISOString()}] 🔄 Fetching ${missingHalvingBlocks.length} uncached halving blocks in parallel...`
+      );
+      const fetched = await Promise.all(
+        missingHalvingBlocks.map((blockHeight) =>
+          fetchBlockTimestamp(blockHeight)
+        )
+      );
 
-    if (validBlockHashes.length === 0) {
-      console.error(
-        `[${new Date().toISOString()}] ❌ No valid block hashes found`
+      // Only blocks buried deep enough to survive a reorg are persisted
+      missingHalvingBlocks.forEach((blockHeight, i) => {
+        const timestamp = fetched[i];
+        if (timestamp === null) {
+          return;
+        }
+        timestamps.set(blockHeight, timestamp);
+        if (currentBlockHeight - blockHeight >= CONFIRMATION_DEPTH) {
+          cache[blockHeight] = timestamp;
+          cacheChanged = true;
+        }
+      });
+    } else {
+      console.log(
+        `[${new Date().toISOString()}] 💾 All ${existingHalvingBlocks.length} halving blocks served from cache`
       );
-      throw new Error("No halving dates could be fetched");
     }
 
-    // Fetch all block details in parallel
-    console.log(
-      `[${new Date().toISOString()}] 🔄 Fetching ${validBlockHashes.length} block details in parallel...`
-    );
-    const blockDetailsPromises = validBlockHashes.map((blockHash) =>
-      fetchBlockDetails(blockHash)
-    );
-    const blockDetailsArray = await Promise.all(blockDetailsPromises);
-
-    console.log(
-      `[${new Date().toISOString()}] 📊 Processing ${blockDetailsArray.length} block details`
-    );
+    // The window start is a full period deep, so it is always confirmed. It
+    // replaces the previous period's start, which is not needed again.
+    const startTimestamp = await windowStartTimestamp;
+    if (startTimestamp !== null && cachedWindowStart === undefined) {
+      for (const height of Object.keys(cache)) {
+        if (!HALVING_BLOCKS.includes(Number(height))) {
+          delete cache[height];
+        }
+      }
+      cache[windowStart] = startTimestamp;
+      cacheChanged = true;
+    }
+    if (cacheChanged) {
+      await writeJsonFile(HALVING_CACHE_FILE, cache).catch((error) => {
+        console.warn(
+          `[${new Date().toISOString()}] ⚠️ Could not persist halving cache:`,
+          error
+        );
+      });
+    }
 
     // Convert timestamps to dates and filter out future dates
-    for (const blockData of blockDetailsArray) {
-      const halvingDate = new Date(blockData.timestamp * 1000);
-
+    const halvings: { height: number; timestamp: number }[] = [];
+    for (const blockHeight of existingHalvingBlocks) {
+      const timestamp = cache[blockHeight] ?? timestamps.get(blockHeight);
+      if (timestamp === undefined) {
+        continue;
+      }
       // If date is in the future, stop processing (early return optimization)
-      if (halvingDate > now) {
-        console.log(
-          `[${new Date().toISOString()}] ⏸️ Stopping at future halving date: ${halvingDate.toISOString()}`
-        );
+      if (timestamp > nowSeconds) {
         break;
       }
-
-      halvingDates.push(halvingDate);
+      halvings.push({ height: blockHeight, timestamp });
     }
 
     console.log(
-      `[${new Date().toISOString()}] 📅 Found ${halvingDates.length} past halving dates`
+      `[${new Date().toISOString()}] 📅 Found ${halvings.length} past halving dates`
     );
 
-    if (halvingDates.length === 0) {
+    if (halvings.length === 0) {
       console.error(
         `[${new Date().toISOString()}] ❌ No past halving dates found`
       );
       throw new Error("No halving dates could be fetched");
     }
 
-    // Convert Date objects to ISO strings for JSON serialization
-    const halvingDatesISO = halvingDates.map((date) => date.toISOString());
+    // Convert to ISO strings for JSON serialization
+    const halvingDatesISO = halvings.map(({ timestamp }) =>
+      new Date(timestamp * 1000).toISOString()
+    );
+    // Measured up to now rather than to the tip block, which would cost
+    // another two-hop lookup; the difference is at most one block interval
+    // over thousands
+    const recentBlocks = currentBlockHeight - windowStart;
+    const recentBlockSeconds =
+      startTimestamp !== null && recentBlocks > 0
+        ? (nowSeconds - startTimestamp) / recentBlocks
+        : null;
+    const nextHalving = projectNextHalving(
+      currentBlockHeight,
+      recentBlockSeconds,
+      halvings[halvings.length - 1],
+      nowSeconds
+    );
+    console.log(
+      `[${new Date().toISOString()}] 🔮 Next halving at block ${nextHalving.height} projected for ${nextHalving.projectedDate} (${nextHalving.blocksRemaining} blocks at ${nextHalving.averageBlockSeconds.toFixed(0)}s)`
+    );
 
     const duration = Date.now() - startTime;
     console.log(
       `[${new Date().toISOString()}] ✅ Halving dates fetch completed in ${duration}ms with ${halvingDatesISO.length} dates`
     );
 
-    return { halvingDates: halvingDatesISO };
+    return { halvingDates: halvingDatesISO, nextHalving };
   } catch (error) {
     const duration = Date.now() - startTime;
     console.error(
@@ -38,23 +38,36 @@ export function calculateHalvingSignals(halvingDates: Date[]): HalvingSignals {
 }
 
 /**
- * Find the nearest data point timestamp to a target date
+ * Find the index of the candle whose time is nearest to a target date
+ *
+ * @param targetDate - Date to locate
+ * @param times - Ascending candle times in epoch seconds
+ * @returns Index into `times`, or -1 if it is empty
  */
 export function findNearestCandlestick(
   targetDate: Date,
-  dataDates: string[]
-): string {
-  const targetTime = targetDate.getTime();
-  let nearestDate = dataDates[0];
-  let minDiff = Math.abs(new Date(dataDates[0]).getTime() - targetTime);
-
-  for (const dateStr of dataDates) {
-    const diff = Math.abs(new Date(dateStr).getTime() - targetTime);
-    if (diff < minDiff) {
-      minDiff = diff;
-      nearestDate = dateStr;
+  times: ArrayLike<number>
+): number {
+  if (!times.length) {
+    return -1;
+  }
+
+  // Binary search for the first candle at or after the target
+  const target = targetDate.getTime() / 1000;
+  let lo = 0;
+  let hi = times.length - 1;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (times[mid] < target) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
     }
   }
 
-  return nearestDate;
+  // The previous candle may be closer; ties go to the earlier one
+  if (lo > 0 && target - times[lo - 1] <= times[lo] - target) {
+    return lo - 1;
+  }
+  return lo;
 }
@@ -0,0 +1,228 @@
+/**
+ * Memoization layer for indicator results
+ *
+ * Results are keyed by indicator name, parameters and a content fingerprint of
+ * the input series, so a regeneration that receives byte-identical history
+ * skips the computation entirely. Entries are evicted least recently used
+ * first once their estimated size exceeds the byte budget.
+ */
+
+import { OHLCVSeries } from "@/lib/ohlcv";
+
+const DEFAULT_MAX_BYTES = 64 * 1024 * 1024;
+
+// Rough per-value cost of plain JS values that are not typed arrays
+const PRIMITIVE_BYTES = 8;
+
+export interface IndicatorCacheStats {
+  hits: number;
+  misses: number;
+  evictions: number;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+}
+
+interface CacheEntry {
+  value: unknown;
+  bytes: number;
+}
+
+/**
+ * 64-bit content fingerprint of a series, prefixed with the candle count.
+ * Two 32-bit lanes run over the raw column data as 32-bit words: one
+ * FNV-1a-style (xor, then multiply by the FNV prime), the other multiplying
+ * by the MurmurHash2 constant with a shift-xor and seeded with the count.
+ * Neither lane is FNV-1a proper, which works byte by byte.
+ */
+export function fingerprintSeries(series: OHLCVSeries): string {
+  let lowLane = 0x811c9dc5;
+  let highLane = 0x01000193 ^ series.time.length;
+
+  const columns = [
+    series.time,
+    series.open,
+    series.high,
+    series.low,
+    series.close,
+    series.volume,
+  ];
+  for (const column of columns) {
+    // Float64 columns are 8-byte aligned, so a 32-bit word view always fits
+    const words = new Uint32Array(
+      column.buffer,
+      column.byteOffset,
+      column.byteLength / 4
+    );
+    for (let i = 0; i < words.length; i++) {
+      lowLane = Math.imul(lowLane ^ words[i], 0x01000193);
+      highLane =
+        Math.imul(highLane ^ words[i], 0x5bd1e995) ^ (highLane >>> 15);
+    }
+  }
+
+  const hex = (lane: number) => (lane >>> 0).toString(16).padStart(8, "0");
+  return `${series.time.length}:${hex(highLane)}${hex(lowLane)}`;
+}
+
+function cacheKey(
+  name: string,
+  params: unknown,
+  series: OHLCVSeries
+): string {
+  const fingerprint = fingerprintSeries(series);
+  return `${name}:${JSON.stringify(params ?? null)}:${fingerprint}`;
+}
+
+/**
+ * Approximate retained size of a cached value. Typed arrays count their
+ * backing buffer once even when several views share it.
+ */
+export function estimateBytes(value: unknown): number {
+  const buffers = new Set<ArrayBufferLike>();
+  let bytes = 0;
+
+  const visit = (current: unknown) => {
+    if (ArrayBuffer.isView(current)) {
+      if (!buffers.has(current.buffer)) {
+        buffers.add(current.buffer);
+        bytes += current.buffer.byteLength;
+      }
+      return;
+    }
+    if (Array.isArray(current)) {
+      bytes += current.length * PRIMITIVE_BYTES;
+      current.forEach(visit);
+      return;
+    }
+    if (current !== null && typeof current === "object") {
+      for (const field of Object.values(current)) {
+        bytes += PRIMITIVE_BYTES;
+        visit(field);
+      }
+      return;
+    }
+    if (typeof current === "string") {
+      bytes += current.length * 2;
+    }
+  };
+
+  visit(value);
+  return bytes;
+}
+
+/**
+ * Byte-bounded LRU cache of indicator results
+ */
+export class IndicatorCache {
+  readonly maxBytes: number;
+  // Map iteration order is insertion order, so the first key is the LRU entry
+  private readonly entries = new Map<string, CacheEntry>();
+  private bytes = 0;
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+
+  constructor(maxBytes: number = DEFAULT_MAX_BYTES) {
+    this.maxBytes = maxBytes;
+  }
+
+  get stats(): IndicatorCacheStats {
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+    };
+  }
+
+  /**
+   * Return the cached result of `compute(series)` for this indicator and
+   * parameters, computing and storing it on a miss.
+   *
+   * Cached results are shared between callers and must not be mutated.
+   */
+  memoize<T>(
+    name: string,
+    params: unknown,
+    series: OHLCVSeries,
+    compute: (series: OHLCVSeries) => T
+  ): T {
+    const key = cacheKey(name, params, series);
+    if (this.entries.has(key)) {
+      return this.hit<T>(key);
+    }
+
+    this.misses += 1;
+    const value = compute(series);
+    this.store(key, value);
+    return value;
+  }
+
+  /**
+   * memoize for asynchronous computations. The key is taken before `compute`
+   * starts, so `compute` may transfer the series columns away meanwhile.
+   */
+  async memoizeAsync<T>(
+    name: string,
+    params: unknown,
+    series: OHLCVSeries,
+    compute: (series: OHLCVSeries) => Promise<T>
+  ): Promise<T> {
+    const key = cacheKey(name, params, series);
+    if (this.entries.has(key)) {
+      return this.hit<T>(key);
+    }
+
+    this.misses += 1;
+    const value = await compute(series);
+    this.store(key, value);
+    return value;
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.bytes = 0;
+  }
+
+  private hit<T>(key: string): T {
+    const entry = this.entries.get(key)!;
+    this.hits += 1;
+    // Re-insert to mark as most recently used
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value as T;
+  }
+
+  private store(key: string, value: unknown): void {
+    const bytes = estimateBytes(value);
+    // Oversized results are returned but never displace the whole cache
+    if (bytes > this.maxBytes || this.entries.has(key)) {
+      return;
+    }
+    this.entries.set(key, { value, bytes });
+    this.bytes += bytes;
+    this.evict();
+  }
+
+  private evict(): void {
+    for (const [key, entry] of this.entries) {
+      if (this.bytes <= this.maxBytes) {
+        return;
+      }
+      this.entries.delete(key);
+      this.bytes -= entry.bytes;
+      this.evictions += 1;
+    }
+  }
+}
+
+/**
+ * Process-wide cache shared by server renders. The budget can be overridden
+ * with INDICATOR_CACHE_MAX_BYTES.
+ */
+export const indicatorCache = new IndicatorCache(
+  Number(process.env.INDICATOR_CACHE_MAX_BYTES) || DEFAULT_MAX_BYTES
+);
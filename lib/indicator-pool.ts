@@ -0,0 +1,273 @@
+/**
+ * worker_threads pool for server-side indicator computation
+ *
+ * Each job posts the series columns to a worker, where they arrive as a
+ * structured clone, and gets the indicator buffers back as transferred
+ * ArrayBuffers. The input is copied once: transferring the caller's buffers
+ * would detach its columns for the length of the job and lose them with a
+ * crashed worker, and a job whose worker fails reruns inline on them. Jobs also
+ * run inline on the calling thread when the pool is disabled, the series is
+ * too small to be worth a hop, or a worker cannot be started.
+ *
+ * Workers run a bundled JavaScript build of lib/indicator-worker.ts
+ * (`npm run build:worker`, run before `next build`), since Node cannot load
+ * the TypeScript entry or its `@/` imports. Without the bundle every job runs
+ * inline, which the pool reports once at startup.
+ */
+
+import { existsSync } from "node:fs";
+import { availableParallelism } from "node:os";
+import path from "node:path";
+import { Worker } from "node:worker_threads";
+import { calculateAllIndicators, IndicatorSet } from "@/lib/indicators";
+import { OHLCVSeries } from "@/lib/ohlcv";
+
+// Upper bound on workers regardless of core count
+const MAX_POOL_SIZE = 4;
+
+// Below this many candles the postMessage round trip costs more than the work
+const DEFAULT_INLINE_THRESHOLD = 2_000;
+
+/**
+ * Output of `npm run build:worker`, relative to the project root
+ */
+export const DEFAULT_WORKER_PATH = path.join(
+  process.cwd(),
+  "build",
+  "indicator-worker.mjs"
+);
+
+interface PendingJob {
+  id: number;
+  series: OHLCVSeries;
+  resolve: (indicators: IndicatorSet) => void;
+  reject: (error: unknown) => void;
+}
+
+type IndicatorReply =
+  | { type: "ready" }
+  | {
+      type: "result";
+      id: number;
+      indicators?: IndicatorSet;
+      error?: string;
+    };
+
+export interface IndicatorWorkerPoolOptions {
+  /**
+   * Maximum number of workers; 0 runs every job inline
+   */
+  size?: number;
+  /**
+   * Series with fewer candles than this run inline
+   */
+  inlineThreshold?: number;
+  /**
+   * Worker entry (default DEFAULT_WORKER_PATH)
+   */
+  workerPath?: string;
+}
+
+export class IndicatorWorkerPool {
+  readonly size: number;
+  readonly inlineThreshold: number;
+  readonly workerPath: string;
+  // Spawned workers that have not finished loading their module yet
+  private readonly starting = new Set<Worker>();
+  private readonly idle: Worker[] = [];
+  private readonly busy = new Map<Worker, PendingJob>();
+  private readonly queue: PendingJob[] = [];
+  private nextJobId = 0;
+  private spawnFailed = false;
+
+  constructor(options: IndicatorWorkerPoolOptions = {}) {
+    const requested = options.size ?? availableParallelism() - 1;
+    this.size = Number.isFinite(requested)
+      ? Math.max(0, Math.min(MAX_POOL_SIZE, Math.floor(requested)))
+      : 0;
+    this.inlineThreshold = options.inlineThreshold ?? DEFAULT_INLINE_THRESHOLD;
+    this.workerPath = options.workerPath ?? DEFAULT_WORKER_PATH;
+  }
+
+  /**
+   * Calculate all indicators for a series off the calling thread, or inline
+   * when no worker can take it
+   */
+  run(series: OHLCVSeries): Promise<IndicatorSet> {
+    if (
+      this.size === 0 ||
+      this.spawnFailed ||
+      series.time.length < this.inlineThreshold
+    ) {
+      return this.runInline(series);
+    }
+
+    return new Promise<IndicatorSet>((resolve, reject) => {
+      this.queue.push({ id: this.nextJobId++, series, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  /**
+   * Terminate every worker. In-flight jobs are rejected and queued jobs
+   * finish inline.
+   */
+  async destroy(): Promise<void> {
+    const workers = [...this.starting, ...this.idle, ...this.busy.keys()];
+    this.starting.clear();
+    this.idle.length = 0;
+    this.spawnFailed = true;
+    await Promise.all(workers.map((worker) => worker.terminate()));
+    this.drainInline();
+  }
+
+  private runInline(series: OHLCVSeries): Promise<IndicatorSet> {
+    try {
+      return Promise.resolve(calculateAllIndicators(series));
+    } catch (error) {
+      return Promise.reject(error);
+    }
+  }
+
+  private dispatch(): void {
+    while (this.queue.length > 0) {
+      const worker = this.idle.pop();
+      if (!worker) {
+        // Jobs only go to workers that finished loading, so a worker that
+        // fails to start never holds up a caller's job
+        let missing = this.queue.length - this.starting.size;
+        while (missing > 0 && this.spawn()) {
+          missing -= 1;
+        }
+        if (this.workerCount === 0) {
+          this.drainInline();
+        }
+        return;
+      }
+
+      const job = this.queue.shift()!;
+      this.busy.set(worker, job);
+      worker.postMessage({ id: job.id, series: job.series });
+    }
+  }
+
+  private get workerCount(): number {
+    return this.starting.size + this.idle.length + this.busy.size;
+  }
+
+  private spawn(): boolean {
+    if (this.spawnFailed || this.workerCount >= this.size) {
+      return false;
+    }
+
+    if (!existsSync(this.workerPath)) {
+      console.error(
+        `[${new Date().toISOString()}] ❌ Indicator worker ${this.workerPath} not found (run npm run build:worker), running inline`
+      );
+      this.spawnFailed = true;
+      return false;
+    }
+
+    let worker: Worker;
+    try {
+      worker = new Worker(this.workerPath);
+    } catch (error) {
+      console.error(
+        `[${new Date().toISOString()}] ❌ Indicator worker failed to start, running inline:`,
+        error
+      );
+      this.spawnFailed = true;
+      return false;
+    }
+
+    // Idle workers must not keep the server process alive
+    worker.unref();
+    this.starting.add(worker);
+    worker.on("message", (reply: IndicatorReply) =>
+      this.handleReply(worker, reply)
+    );
+    worker.on("error", (error) => this.handleFailure(worker, error));
+    worker.on("exit", (code) => {
+      if (this.owns(worker)) {
+        this.handleFailure(worker, new Error(`Worker exited with ${code}`));
+      }
+    });
+    return true;
+  }
+
+  private owns(worker: Worker): boolean {
+    return (
+      this.starting.has(worker) ||
+      this.busy.has(worker) ||
+      this.idle.includes(worker)
+    );
+  }
+
+  private handleReply(worker: Worker, reply: IndicatorReply): void {
+    if (reply.type === "ready") {
+      this.starting.delete(worker);
+      this.idle.push(worker);
+      this.dispatch();
+      return;
+    }
+
+    const job = this.busy.get(worker);
+    this.busy.delete(worker);
+    this.idle.push(worker);
+
+    if (job) {
+      if (reply.indicators) {
+        job.resolve(reply.indicators);
+      } else {
+        this.runInline(job.series).then(job.resolve, job.reject);
+      }
+    }
+    this.dispatch();
+  }
+
+  private handleFailure(worker: Worker, error: unknown): void {
+    if (!this.owns(worker)) {
+      return;
+    }
+    console.error(
+      `[${new Date().toISOString()}] ❌ Indicator worker failed:`,
+      error
+    );
+
+    const failedOnStartup = this.starting.delete(worker);
+    const index = this.idle.indexOf(worker);
+    if (index !== -1) {
+      this.idle.splice(index, 1);
+    }
+
+    const job = this.busy.get(worker);
+    this.busy.delete(worker);
+    if (job) {
+      // Only a copy of the columns went to the worker
+      this.runInline(job.series).then(job.resolve, job.reject);
+    }
+
+    // A worker that cannot load its module will not do better next time
+    if (failedOnStartup) {
+      this.spawnFailed = true;
+    }
+    this.dispatch();
+  }
+
+  private drainInline(): void {
+    for (const job of this.queue.splice(0)) {
+      this.runInline(job.series).then(job.resolve, job.reject);
+    }
+  }
+}
+
+/**
+ * Process-wide pool used by server renders. INDICATOR_POOL_SIZE overrides the
+ * worker count (0 disables workers).
+ */
+export const indicatorPool = new IndicatorWorkerPool({
+  size:
+    process.env.INDICATOR_POOL_SIZE !== undefined
+      ? Number(process.env.INDICATOR_POOL_SIZE)
+      : undefined,
+});
@@ -0,0 +1,206 @@
+/**
+ * Incremental indicator updates across candle refreshes
+ *
+ * An IndicatorStream keeps the candles a timeframe's indicators were last
+ * computed for, and the streaming indicator states (lib/indicators.ts) fed
+ * with the same candles. When a refresh only revises the last candle and
+ * appends new ones, the usual case for a forming candle, the new columns are
+ * the previous ones extended through the states: O(1) indicator work per
+ * changed candle instead of a full recomputation. Any other change (an older
+ * candle revised, such as a filled gap, or a shorter history) is computed in
+ * full, and the states are rebuilt from the candles.
+ */
+
+import {
+  BollingerBandsState,
+  CHART_EMA_PERIODS,
+  EMAState,
+  IndicatorSet,
+  OrderBlockState,
+  StochasticState,
+} from "@/lib/indicators";
+import { getOHLCVBar, OHLCV, OHLCVSeries } from "@/lib/ohlcv";
+
+const CANDLE_COLUMNS = [
+  "time",
+  "open",
+  "high",
+  "low",
+  "close",
+  "volume",
+] as const;
+
+// IndicatorSet keys of the CHART_EMA_PERIODS columns, in the same order
+const EMA_KEYS = ["ema13", "ema21", "ema50", "ema100"] as const;
+
+/**
+ * First row at which two series differ, or the shorter length when one is a
+ * prefix of the other
+ */
+function firstDifferentRow(a: OHLCVSeries, b: OHLCVSeries): number {
+  const length = Math.min(a.time.length, b.time.length);
+  for (let row = 0; row < length; row++) {
+    for (const column of CANDLE_COLUMNS) {
+      if (!Object.is(a[column][row], b[column][row])) {
+        return row;
+      }
+    }
+  }
+  return length;
+}
+
+/**
+ * Streaming states for every indicator calculateAllIndicators computes, with
+ * the same parameters
+ */
+class IndicatorStates {
+  private readonly emas = CHART_EMA_PERIODS.map(
+    (period) => new EMAState(period)
+  );
+  private readonly bollinger = new BollingerBandsState(20, 2.0);
+  private readonly stochastic = new StochasticState(5, 3, 3);
+  readonly orderBlocks = new OrderBlockState();
+
+  push(bar: OHLCV): void {
+    for (const ema of this.emas) {
+      ema.push(bar);
+    }
+    this.bollinger.push(bar);
+    this.stochastic.push(bar);
+    this.orderBlocks.push(bar);
+  }
+
+  updateLast(bar: OHLCV): void {
+    for (const ema of this.emas) {
+      ema.updateLast(bar);
+    }
+    this.bollinger.updateLast(bar);
+    this.stochastic.updateLast(bar);
+    this.orderBlocks.updateLast(bar);
+  }
+
+  /**
+   * Write the latest column values into `row` of `indicators`
+   */
+  write(indicators: IndicatorSet, row: number): void {
+    EMA_KEYS.forEach((key, i) => {
+      indicators[key][row] = this.emas[i].value;
+    });
+    const bands = this.bollinger.value;
+    indicators.bollinger.upper[row] = bands.upper;
+    indicators.bollinger.middle[row] = bands.middle;
+    indicators.bollinger.lower[row] = bands.lower;
+    const { k, d } = this.stochastic.value;
+    indicators.stochastic.k[row] = k;
+    indicators.stochastic.d[row] = d;
+  }
+}
+
+/**
+ * Indicators of one candle series (a timeframe), kept current across
+ * refreshes
+ */
+export class IndicatorStream {
+  private data: OHLCVSeries | null = null;
+  private indicators: IndicatorSet | null = null;
+  private states: IndicatorStates | null = null;
+  private extendedCount = 0;
+  private computedCount = 0;
+
+  /**
+   * Refreshes extended from the previous candles and refreshes computed in
+   * full
+   */
+  get stats(): { extended: number; computed: number } {
+    return { extended: this.extendedCount, computed: this.computedCount };
+  }
+
+  /**
+   * Indicators for `data`, extended from the previous call when only its
+   * last candle changed or candles were appended, and from `compute`
+   * otherwise. Returned sets are never modified afterwards.
+   */
+  async update(
+    data: OHLCVSeries,
+    compute: (data: OHLCVSeries) => Promise<IndicatorSet>
+  ): Promise<IndicatorSet> {
+    const { data: previous, indicators, states } = this;
+    if (previous && indicators && states) {
+      const fedRows = previous.time.length;
+      const firstChanged = firstDifferentRow(previous, data);
+      if (firstChanged === fedRows && data.time.length === fedRows) {
+        return indicators;
+      }
+      if (firstChanged >= fedRows - 1 && data.time.length >= fedRows) {
+        // Dropped while the states advance, so a failure part way through
+        // leads to a full computation next time
+        this.states = null;
+        const extended = this.extend(states, indicators, data, firstChanged);
+        this.data = data;
+        this.indicators = extended;
+        this.states = states;
+        this.extendedCount += 1;
+        return extended;
+      }
+    }
+
+    this.states = null;
+    const computed = await compute(data);
+    const rebuilt = new IndicatorStates();
+    for (let row = 0; row < data.time.length; row++) {
+      rebuilt.push(getOHLCVBar(data, row));
+    }
+    this.data = data;
+    this.indicators = computed;
+    this.states = rebuilt;
+    this.computedCount += 1;
+    return computed;
+  }
+
+  /**
+   * Copy the columns before `from` and advance the states over the rest: the
+   * previous last candle is revised, later ones are appended
+   */
+  private extend(
+    states: IndicatorStates,
+    previous: IndicatorSet,
+    data: OHLCVSeries,
+    from: number
+  ): IndicatorSet {
+    const length = data.time.length;
+    const fedRows = this.data!.time.length;
+    const grow = (column: Float64Array) => {
+      const next = new Float64Array(length);
+      next.set(column.subarray(0, from));
+      return next;
+    };
+
+    const indicators: IndicatorSet = {
+      ema13: grow(previous.ema13),
+      ema21: grow(previous.ema21),
+      ema50: grow(previous.ema50),
+      ema100: grow(previous.ema100),
+      bollinger: {
+        upper: grow(previous.bollinger.upper),
+        middle: grow(previous.bollinger.middle),
+        lower: grow(previous.bollinger.lower),
+      },
+      stochastic: {
+        k: grow(previous.stochastic.k),
+        d: grow(previous.stochastic.d),
+      },
+      orderBlocks: [],
+    };
+    for (let row = from; row < length; row++) {
+      const bar = getOHLCVBar(data, row);
+      if (row < fedRows) {
+        states.updateLast(bar);
+      } else {
+        states.push(bar);
+      }
+      states.write(indicators, row);
+    }
+    indicators.orderBlocks = states.orderBlocks.value;
+    return indicators;
+  }
+}
@@ -0,0 +1,35 @@
+/**
+ * worker_threads entry for IndicatorWorkerPool
+ *
+ * Receives a copy of a series, computes every indicator, and transfers the
+ * result buffers back. A "ready" message tells the pool
+ * the module loaded, before any data is sent.
+ *
+ * Node runs the bundled build of this file (see `build:worker` in
+ * package.json), not the TypeScript source.
+ */
+
+import { parentPort } from "node:worker_threads";
+import { calculateAllIndicators } from "@/lib/indicators";
+import { OHLCVSeries } from "@/lib/ohlcv";
+import { transferListFor } from "@/lib/transfer";
+
+interface IndicatorJob {
+  id: number;
+  series: OHLCVSeries;
+}
+
+parentPort?.on("message", ({ id, series }: IndicatorJob) => {
+  try {
+    const indicators = calculateAllIndicators(series);
+    parentPort?.postMessage(
+      { type: "result", id, indicators },
+      transferListFor(indicators)
+    );
+  } catch (error) {
+    // The caller still has its columns and falls back inline
+    parentPort?.postMessage({ type: "result", id, error: String(error) });
+  }
+});
+
+parentPort?.postMessage({ type: "ready" });
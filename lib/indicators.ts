@@ -2,14 +2,12 @@
  * Technical indicator calculations
  */
 
-export interface OHLCV {
-  date: string;
-  open: number;
-  high: number;
-  low: number;
-  close: number;
-  volume: number;
-}
+import { OHLCV, OHLCVSeries, OHLCVSeriesBuffer } from "@/lib/ohlcv";
+import {
+  RollingMeanSkipNaN,
+  RollingStats,
+  SlidingExtremum,
+} from "@/lib/sliding-window";
 
 export type OrderBlockType = "buy" | "sell";
 
@@ -23,13 +21,16 @@ export interface OrderBlockZone {
    * Index of the candle that invalidates the zone (or the last candle if still valid).
    */
   endIndex: number;
-  startTime: string;
-  endTime: string;
+  /**
+   * Epoch seconds of the source and end candles.
+   */
+  startTime: number;
+  endTime: number;
   low: number;
   high: number;
 }
 
-interface OrderBlockSettings {
+export interface OrderBlockSettings {
   /**
    * Number of candles on each side required to confirm a swing high/low.
    */
@@ -44,302 +45,810 @@ interface OrderBlockSettings {
   maxSourceLookback: number;
 }
 
-const DEFAULT_ORDER_BLOCK_SETTINGS: OrderBlockSettings = {
+export const DEFAULT_ORDER_BLOCK_SETTINGS: OrderBlockSettings = {
   swingLookback: 3,
   minimumBreakoutPercent: 0.0015, // 0.15%
   maxSourceLookback: 15,
 };
 
 /**
- * Calculate Exponential Moving Average
+ * EMA periods charted by calculateAllIndicators (ema13, ema21, ema50, ema100)
+ */
+export const CHART_EMA_PERIODS: readonly number[] = [13, 21, 50, 100];
+
+/**
+ * EMA ribbon periods: 20 to 200 in steps of 10
+ */
+export const EMA_RIBBON_PERIODS: readonly number[] = Array.from(
+  { length: 19 },
+  (_, i) => 20 + i * 10
+);
+
+// Bars per block in calculateEMAs; a block of inputs stays in L1 while every
+// period consumes it
+const EMA_BLOCK_SIZE = 4096;
+
+// Largest output (in values, 32 MB) calculateEMAs allocates as one buffer.
+// Beyond it, faulting in the single buffer costs more than the blocking saves
+// and separate per-period passes measured faster (the ribbon at 300k+ bars).
+const EMA_BATCH_MAX_VALUES = 4_000_000;
+
+/**
+ * Write the EMA of `data` for one period into `row`
  */
-export function calculateEMA(data: number[], period: number): number[] {
-  const ema: number[] = [];
+function fillEMA(
+  data: ArrayLike<number>,
+  period: number,
+  row: Float64Array
+): void {
+  // Bars before the first full period stay NaN
+  row.fill(NaN);
+  if (period < 1 || data.length < period) {
+    return;
+  }
   const multiplier = 2 / (period + 1);
 
   // Start with SMA for first value
   let sum = 0;
-  for (let i = 0; i < period && i < data.length; i++) {
+  for (let i = 0; i < period; i++) {
     sum += data[i];
   }
-  if (data.length >= period) {
-    ema.push(sum / period);
-  }
+  let value = sum / period;
+  row[period - 1] = value;
 
   // Calculate EMA for remaining values
   for (let i = period; i < data.length; i++) {
-    const value =
-      (data[i] - ema[ema.length - 1]) * multiplier + ema[ema.length - 1];
-    ema.push(value);
+    value = (data[i] - value) * multiplier + value;
+    row[i] = value;
+  }
+}
+
+/**
+ * Calculate Exponential Moving Averages for several periods at once
+ *
+ * Reads `data` once, block by block, advancing every period over each block
+ * before moving on. Results are written period-major into `target`: row `p`
+ * holds the EMA for `periods[p]` at offsets `p * data.length` to
+ * `(p + 1) * data.length`. The returned rows are views into `target`. Bars
+ * before the first full period stay NaN.
+ *
+ * Without a `target`, outputs larger than EMA_BATCH_MAX_VALUES are computed
+ * one period at a time into separate arrays instead, with identical values.
+ */
+export function calculateEMAs(
+  data: ArrayLike<number>,
+  periods: readonly number[],
+  target?: Float64Array
+): Float64Array[] {
+  const length = data.length;
+  const count = periods.length;
+  if (!target && count * length > EMA_BATCH_MAX_VALUES) {
+    return periods.map((period) => {
+      const row = new Float64Array(length);
+      fillEMA(data, period, row);
+      return row;
+    });
+  }
+  const buffer = target ?? new Float64Array(count * length);
+  if (buffer.length < count * length) {
+    throw new RangeError(
+      `EMA buffer holds ${buffer.length} values, need ${count * length}`
+    );
+  }
+
+  // Invalid periods never finish seeding, so their rows stay NaN
+  const seedLengths = Float64Array.from(periods, (period) =>
+    period >= 1 ? period : Infinity
+  );
+  const multipliers = Float64Array.from(periods, (period) => 2 / (period + 1));
+  // Running seed sum until each period is reached, then the EMA itself
+  const values = new Float64Array(count);
+
+  const rows = Array.from({ length: count }, (_, p) => {
+    const row = buffer.subarray(p * length, (p + 1) * length);
+    row.fill(NaN, 0, Math.min(length, seedLengths[p] - 1));
+    return row;
+  });
+
+  for (let start = 0; start < length; start += EMA_BLOCK_SIZE) {
+    const end = Math.min(length, start + EMA_BLOCK_SIZE);
+
+    for (let p = 0; p < count; p++) {
+      const row = rows[p];
+      const seedLength = seedLengths[p];
+      const multiplier = multipliers[p];
+      let value = values[p];
+      let i = start;
+
+      for (; i < end && i < seedLength - 1; i++) {
+        value += data[i];
+      }
+      if (i < end && i === seedLength - 1) {
+        // Start with SMA for first value
+        value = (value + data[i]) / seedLength;
+        row[i] = value;
+        i++;
+      }
+      for (; i < end; i++) {
+        value = (data[i] - value) * multiplier + value;
+        row[i] = value;
+      }
+
+      values[p] = value;
+    }
   }
 
-  // Pad beginning with null values
-  return [...Array(Math.max(0, period - 1)).fill(NaN), ...ema];
+  return rows;
+}
+
+/**
+ * Calculate Exponential Moving Average
+ */
+export function calculateEMA(
+  data: ArrayLike<number>,
+  period: number
+): Float64Array {
+  const ema = new Float64Array(data.length);
+  fillEMA(data, period, ema);
+  return ema;
+}
+
+/**
+ * Calculate the EMA ribbon (EMA_RIBBON_PERIODS) with calculateEMAs
+ */
+export function calculateEMARibbon(data: ArrayLike<number>): Float64Array[] {
+  return calculateEMAs(data, EMA_RIBBON_PERIODS);
 }
 
 /**
  * Calculate Bollinger Bands
+ *
+ * Runs in a single O(n) pass: a rolling Welford window supplies the SMA and
+ * standard deviation for each bar instead of re-reducing a slice per candle.
  */
 export function calculateBollingerBands(
-  data: number[],
+  data: ArrayLike<number>,
   period: number = 20,
   stdDev: number = 2.0
-): { upper: number[]; middle: number[]; lower: number[] } {
-  const middle: number[] = [];
-  const upper: number[] = [];
-  const lower: number[] = [];
+): { upper: Float64Array; middle: Float64Array; lower: Float64Array } {
+  const middle = new Float64Array(data.length);
+  const upper = new Float64Array(data.length);
+  const lower = new Float64Array(data.length);
+  const stats = new RollingStats(period);
 
   for (let i = 0; i < data.length; i++) {
-    if (i < period - 1) {
-      middle.push(NaN);
-      upper.push(NaN);
-      lower.push(NaN);
-      continue;
-    }
+    stats.push(data[i]);
 
-    // Calculate SMA (middle band)
-    const slice = data.slice(i - period + 1, i + 1);
-    const sma = slice.reduce((sum, val) => sum + val, 0) / period;
-    middle.push(sma);
+    // Middle band is the SMA, NaN until the window is full
+    const sma = stats.mean;
+    const sd = Math.sqrt(stats.variance);
 
-    // Calculate standard deviation
-    const variance =
-      slice.reduce((sum, val) => sum + Math.pow(val - sma, 2), 0) / period;
-    const sd = Math.sqrt(variance);
-
-    upper.push(sma + stdDev * sd);
-    lower.push(sma - stdDev * sd);
+    middle[i] = sma;
+    upper[i] = sma + stdDev * sd;
+    lower[i] = sma - stdDev * sd;
   }
 
   return { upper, middle, lower };
 }
 
+/**
+ * Raw %K for one bar given the window's highest high and lowest low
+ */
+function stochasticK(close: number, highestHigh: number, lowestLow: number) {
+  if (highestHigh === lowestLow) {
+    return 50; // Avoid division by zero
+  }
+  return ((close - lowestLow) / (highestHigh - lowestLow)) * 100;
+}
+
+/**
+ * Rolling NaN-skipping mean of a whole column, written into `target`.
+ * The window keeps its own copy of the inputs, so `target` may be `data`.
+ */
+function fillRollingMeanSkipNaN(
+  data: ArrayLike<number>,
+  period: number,
+  target: Float64Array
+): void {
+  const rolling = new RollingMeanSkipNaN(period);
+  for (let i = 0; i < data.length; i++) {
+    rolling.push(data[i]);
+    target[i] = rolling.mean;
+  }
+}
+
 /**
  * Calculate Stochastic Oscillator
+ *
+ * Highest high / lowest low come from monotonic-deque sliding extrema and the
+ * %K/%D smoothing uses running sums, so the whole oscillator is O(n).
  */
 export function calculateStochastic(
-  high: number[],
-  low: number[],
-  close: number[],
+  high: ArrayLike<number>,
+  low: ArrayLike<number>,
+  close: ArrayLike<number>,
   kPeriod: number = 5,
   dPeriod: number = 3,
   smoothK: number = 3
-): { k: number[]; d: number[] } {
-  const k: number[] = [];
-  const d: number[] = [];
+): { k: Float64Array; d: Float64Array } {
+  const k = new Float64Array(close.length);
+  const d = new Float64Array(close.length);
+  const highestHigh = new SlidingExtremum(kPeriod, "max");
+  const lowestLow = new SlidingExtremum(kPeriod, "min");
 
   // Calculate %K
   for (let i = 0; i < close.length; i++) {
-    if (i < kPeriod - 1) {
-      k.push(NaN);
-      continue;
-    }
+    highestHigh.push(high[i]);
+    lowestLow.push(low[i]);
+    k[i] =
+      i < kPeriod - 1
+        ? NaN
+        : stochasticK(close[i], highestHigh.value, lowestLow.value);
+  }
 
-    const highSlice = high.slice(i - kPeriod + 1, i + 1);
-    const lowSlice = low.slice(i - kPeriod + 1, i + 1);
-    const highestHigh = Math.max(...highSlice);
-    const lowestLow = Math.min(...lowSlice);
+  // Smooth %K in place (if smoothK > 1)
+  if (smoothK > 1) {
+    fillRollingMeanSkipNaN(k, smoothK, k);
+  }
 
-    if (highestHigh === lowestLow) {
-      k.push(50); // Avoid division by zero
-    } else {
-      const stochK = ((close[i] - lowestLow) / (highestHigh - lowestLow)) * 100;
-      k.push(stochK);
-    }
+  // Calculate %D (moving average of %K)
+  fillRollingMeanSkipNaN(k, dPeriod, d);
+
+  return { k, d };
+}
+
+/**
+ * Binary heap of active order block zones ordered by invalidation price.
+ * `sign` = 1 keeps the highest price on top, -1 the lowest.
+ */
+class ZoneInvalidationHeap {
+  private readonly sign: 1 | -1;
+  private zoneIds: number[] = [];
+  private keys: number[] = [];
+
+  constructor(sign: 1 | -1) {
+    this.sign = sign;
   }
 
-  // Smooth %K (if smoothK > 1)
-  let smoothedK = k;
-  if (smoothK > 1) {
-    smoothedK = [];
-    for (let i = 0; i < k.length; i++) {
-      if (i < smoothK - 1) {
-        smoothedK.push(NaN);
-        continue;
+  get size(): number {
+    return this.zoneIds.length;
+  }
+
+  peekPrice(): number {
+    return this.sign * this.keys[0];
+  }
+
+  push(zoneId: number, price: number): void {
+    const key = this.sign * price;
+    let index = this.zoneIds.length;
+    this.zoneIds.push(zoneId);
+    this.keys.push(key);
+
+    while (index > 0) {
+      const parent = (index - 1) >> 1;
+      if (this.keys[parent] >= key) {
+        break;
       }
-      const slice = k.slice(i - smoothK + 1, i + 1).filter((v) => !isNaN(v));
-      smoothedK.push(slice.reduce((sum, val) => sum + val, 0) / slice.length);
+      this.zoneIds[index] = this.zoneIds[parent];
+      this.keys[index] = this.keys[parent];
+      index = parent;
     }
+    this.zoneIds[index] = zoneId;
+    this.keys[index] = key;
   }
 
-  // Calculate %D (moving average of %K)
-  for (let i = 0; i < smoothedK.length; i++) {
-    if (i < dPeriod - 1) {
-      d.push(NaN);
-      continue;
+  pop(): number {
+    const top = this.zoneIds[0];
+    const lastId = this.zoneIds.pop() as number;
+    const lastKey = this.keys.pop() as number;
+    const size = this.zoneIds.length;
+    if (size === 0) {
+      return top;
     }
-    const slice = smoothedK
-      .slice(i - dPeriod + 1, i + 1)
-      .filter((v) => !isNaN(v));
-    d.push(slice.reduce((sum, val) => sum + val, 0) / slice.length);
+
+    let index = 0;
+    while (true) {
+      let child = 2 * index + 1;
+      if (child >= size) {
+        break;
+      }
+      if (child + 1 < size && this.keys[child + 1] > this.keys[child]) {
+        child += 1;
+      }
+      if (this.keys[child] <= lastKey) {
+        break;
+      }
+      this.zoneIds[index] = this.zoneIds[child];
+      this.keys[index] = this.keys[child];
+      index = child;
+    }
+    this.zoneIds[index] = lastId;
+    this.keys[index] = lastKey;
+    return top;
   }
 
-  return { k: smoothedK, d };
+  clone(): ZoneInvalidationHeap {
+    const copy = new ZoneInvalidationHeap(this.sign);
+    copy.zoneIds = this.zoneIds.slice();
+    copy.keys = this.keys.slice();
+    return copy;
+  }
+}
+
+interface OrderBlockRecord {
+  type: OrderBlockType;
+  startIndex: number;
+  /**
+   * Invalidating candle, or -1 while the zone is still open.
+   */
+  endIndex: number;
+  low: number;
+  high: number;
 }
 
 /**
- * Detect buy/sell order blocks using a simplified LuxAlgo-style BOS approach.
+ * Resumable forward sweep behind calculateOrderBlocks and OrderBlockState.
  *
- * The logic:
- * - Identify swing highs/lows using a symmetric lookback window.
- * - Confirm a break of structure (BOS) once price closes beyond the prior swing
- *   by at least `minimumBreakoutPercent`.
- * - Mark the last opposite candle before the BOS as the order block origin.
- * - Extend the zone forward until an invalidation close pierces the extreme.
+ * Bars are processed strictly in order with `step`. Swings come from
+ * sliding-window extrema that run `swingLookback` bars ahead, and open zones
+ * sit in heaps ordered by invalidation price, so each close only pops the
+ * zones it pierces and long histories stay linear.
  */
-export function calculateOrderBlocks(
-  data: OHLCV[],
-  settings: OrderBlockSettings = DEFAULT_ORDER_BLOCK_SETTINGS
-): OrderBlockZone[] {
-  if (!data.length) {
-    return [];
+class OrderBlockSweep {
+  private readonly settings: OrderBlockSettings;
+  private windowHigh: SlidingExtremum;
+  private windowLow: SlidingExtremum;
+  private fedIndex = 0;
+  private lastSwingHighIndex: number | null = null;
+  private lastSwingLowIndex: number | null = null;
+  private records: OrderBlockRecord[] = [];
+  // Buy zones die when a close drops below their low, so the highest
+  // invalidation price sits on top; sell zones are the mirror image
+  private activeBuyZones = new ZoneInvalidationHeap(1);
+  private activeSellZones = new ZoneInvalidationHeap(-1);
+
+  constructor(settings: OrderBlockSettings) {
+    this.settings = settings;
+    // Window of 2 * swingLookback + 1 bars centred on the candidate swing bar
+    const swingWindow = 2 * settings.swingLookback + 1;
+    this.windowHigh = new SlidingExtremum(swingWindow, "max");
+    this.windowLow = new SlidingExtremum(swingWindow, "min");
   }
 
-  const zones: OrderBlockZone[] = [];
-  const { swingLookback, minimumBreakoutPercent, maxSourceLookback } = settings;
+  /**
+   * Process bar `i` of `data`, where `lastIndex` is the last bar known so far.
+   * Swings are only confirmed once `swingLookback` bars follow them.
+   */
+  step(data: OHLCVSeries, i: number, lastIndex: number): void {
+    const { open, high, low, close } = data;
+    const { swingLookback, minimumBreakoutPercent } = this.settings;
+    const barClose = close[i];
+
+    // Close out zones whose extreme this candle pierced
+    while (
+      this.activeBuyZones.size > 0 &&
+      barClose < this.activeBuyZones.peekPrice()
+    ) {
+      this.records[this.activeBuyZones.pop()].endIndex = i;
+    }
+    while (
+      this.activeSellZones.size > 0 &&
+      barClose > this.activeSellZones.peekPrice()
+    ) {
+      this.records[this.activeSellZones.pop()].endIndex = i;
+    }
 
-  const isSwingHigh = (index: number) => {
-    if (index < swingLookback || index > data.length - swingLookback - 1) {
-      return false;
+    // Keep the swing window spanning [i - swingLookback, i + swingLookback]
+    const feedUntil = Math.min(i + swingLookback, lastIndex);
+    for (; this.fedIndex <= feedUntil; this.fedIndex += 1) {
+      this.windowHigh.push(high[this.fedIndex]);
+      this.windowLow.push(low[this.fedIndex]);
     }
-    const window = data.slice(index - swingLookback, index + swingLookback + 1);
-    const targetHigh = data[index].high;
-    return window.every(
-      (bar, idx) => idx === swingLookback || targetHigh >= bar.high
-    );
-  };
 
-  const isSwingLow = (index: number) => {
-    if (index < swingLookback || index > data.length - swingLookback - 1) {
-      return false;
+    const hasFullWindow = i >= swingLookback && i <= lastIndex - swingLookback;
+    if (
+      hasFullWindow &&
+      (swingLookback === 0 || this.windowHigh.value === high[i])
+    ) {
+      this.lastSwingHighIndex = i;
     }
-    const window = data.slice(index - swingLookback, index + swingLookback + 1);
-    const targetLow = data[index].low;
-    return window.every(
-      (bar, idx) => idx === swingLookback || targetLow <= bar.low
-    );
-  };
+    if (
+      hasFullWindow &&
+      (swingLookback === 0 || this.windowLow.value === low[i])
+    ) {
+      this.lastSwingLowIndex = i;
+    }
+
+    if (this.lastSwingHighIndex !== null) {
+      const swingHigh = high[this.lastSwingHighIndex];
+      const breakPct = (barClose - swingHigh) / swingHigh;
+      const brokeUp =
+        breakPct >= minimumBreakoutPercent && barClose > swingHigh;
+      if (brokeUp) {
+        const sourceIndex = this.findSourceCandle(data, i, "buy");
+        this.openZone(
+          data,
+          i,
+          sourceIndex,
+          low[sourceIndex],
+          open[sourceIndex],
+          "buy"
+        );
+        this.lastSwingHighIndex = null;
+      }
+    }
+
+    if (this.lastSwingLowIndex !== null) {
+      const swingLow = low[this.lastSwingLowIndex];
+      const breakPct = (swingLow - barClose) / swingLow;
+      const brokeDown =
+        breakPct >= minimumBreakoutPercent && barClose < swingLow;
+      if (brokeDown) {
+        const sourceIndex = this.findSourceCandle(data, i, "sell");
+        this.openZone(
+          data,
+          i,
+          sourceIndex,
+          open[sourceIndex],
+          high[sourceIndex],
+          "sell"
+        );
+        this.lastSwingLowIndex = null;
+      }
+    }
+  }
+
+  /**
+   * Zones found so far; zones still open extend to `lastIndex`
+   */
+  getZones(data: OHLCVSeries, lastIndex: number): OrderBlockZone[] {
+    return this.records.map((record) => {
+      const endIndex = record.endIndex === -1 ? lastIndex : record.endIndex;
+      return {
+        type: record.type,
+        startIndex: record.startIndex,
+        endIndex,
+        startTime: data.time[record.startIndex],
+        endTime: data.time[endIndex],
+        low: record.low,
+        high: record.high,
+      };
+    });
+  }
+
+  /**
+   * Independent copy of the sweep, for finishing a provisional tail
+   */
+  clone(): OrderBlockSweep {
+    const copy = new OrderBlockSweep(this.settings);
+    copy.windowHigh = this.windowHigh.clone();
+    copy.windowLow = this.windowLow.clone();
+    copy.fedIndex = this.fedIndex;
+    copy.lastSwingHighIndex = this.lastSwingHighIndex;
+    copy.lastSwingLowIndex = this.lastSwingLowIndex;
+    copy.records = this.records.map((record) => ({ ...record }));
+    copy.activeBuyZones = this.activeBuyZones.clone();
+    copy.activeSellZones = this.activeSellZones.clone();
+    return copy;
+  }
 
-  const findSourceCandle = (breakIndex: number, type: OrderBlockType) => {
-    const start = Math.max(0, breakIndex - maxSourceLookback);
+  private findSourceCandle(
+    data: OHLCVSeries,
+    breakIndex: number,
+    type: OrderBlockType
+  ) {
+    const { open, close } = data;
+    const start = Math.max(0, breakIndex - this.settings.maxSourceLookback);
     for (let i = breakIndex - 1; i >= start; i -= 1) {
-      const bar = data[i];
       const isOpposite =
-        type === "buy" ? bar.close < bar.open : bar.close > bar.open;
+        type === "buy" ? close[i] < open[i] : close[i] > open[i];
       if (isOpposite) {
         return i;
       }
     }
     return Math.max(0, breakIndex - 1);
-  };
+  }
 
-  const findInvalidationIndex = (
+  private openZone(
+    data: OHLCVSeries,
+    breakIndex: number,
     sourceIndex: number,
     zoneLow: number,
     zoneHigh: number,
     type: OrderBlockType
-  ) => {
-    for (let i = sourceIndex + 1; i < data.length; i += 1) {
-      const bar = data[i];
+  ) {
+    const zoneId = this.records.length;
+    const record: OrderBlockRecord = {
+      type,
+      startIndex: sourceIndex,
+      endIndex: -1,
+      low: Math.min(zoneLow, zoneHigh),
+      high: Math.max(zoneLow, zoneHigh),
+    };
+    this.records.push(record);
+
+    // Bars between the source candle and the break are already known
+    const invalidationPrice = type === "buy" ? zoneLow : zoneHigh;
+    for (let i = sourceIndex + 1; i <= breakIndex; i += 1) {
       const isInvalidated =
-        type === "buy" ? bar.close < zoneLow : bar.close > zoneHigh;
+        type === "buy"
+          ? data.close[i] < invalidationPrice
+          : data.close[i] > invalidationPrice;
       if (isInvalidated) {
-        return i;
+        record.endIndex = i;
+        return;
       }
     }
-    return data.length - 1;
+
+    // A NaN price can never be crossed, so the zone simply stays open
+    if (!Number.isNaN(invalidationPrice)) {
+      const heap = type === "buy" ? this.activeBuyZones : this.activeSellZones;
+      heap.push(zoneId, invalidationPrice);
+    }
+  }
+}
+
+/**
+ * Detect buy/sell order blocks using a simplified LuxAlgo-style BOS approach.
+ *
+ * The logic:
+ * - Identify swing highs/lows using a symmetric lookback window.
+ * - Confirm a break of structure (BOS) once price closes beyond the prior swing
+ *   by at least `minimumBreakoutPercent`.
+ * - Mark the last opposite candle before the BOS as the order block origin.
+ * - Extend the zone forward until an invalidation close pierces the extreme.
+ *
+ * Everything happens in one linear forward sweep (see OrderBlockSweep).
+ */
+export function calculateOrderBlocks(
+  data: OHLCVSeries,
+  settings: OrderBlockSettings = DEFAULT_ORDER_BLOCK_SETTINGS
+): OrderBlockZone[] {
+  const lastIndex = data.time.length - 1;
+  if (lastIndex < 0) {
+    return [];
+  }
+
+  const sweep = new OrderBlockSweep(settings);
+  for (let i = 0; i <= lastIndex; i += 1) {
+    sweep.step(data, i, lastIndex);
+  }
+  return sweep.getZones(data, lastIndex);
+}
+
+/**
+ * Calculate all indicators for a dataset
+ */
+export function calculateAllIndicators(data: OHLCVSeries) {
+  const { high, low, close } = data;
+  const [ema13, ema21, ema50, ema100] = calculateEMAs(close, CHART_EMA_PERIODS);
+
+  return {
+    ema13,
+    ema21,
+    ema50,
+    ema100,
+    bollinger: calculateBollingerBands(close, 20, 2.0),
+    stochastic: calculateStochastic(high, low, close, 5, 3, 3),
+    orderBlocks: calculateOrderBlocks(data),
   };
+}
 
-  let lastSwingHighIndex: number | null = null;
-  let lastSwingLowIndex: number | null = null;
+/**
+ * Result of calculateAllIndicators
+ */
+export type IndicatorSet = ReturnType<typeof calculateAllIndicators>;
+
+/**
+ * Incremental indicator state.
+ *
+ * `push` appends a new candle and `updateLast` revises the latest one (the
+ * still-forming candle), each in O(1) for a fixed period. Outputs are
+ * bit-for-bit equal to the last element of the matching batch function over
+ * the same candles, so a refresh only has to feed the changed tail.
+ */
+export interface IndicatorState<T> {
+  push(bar: OHLCV): void;
+  updateLast(bar: OHLCV): void;
+  readonly value: T;
+}
+
+/**
+ * Streaming counterpart of calculateEMA over candle closes
+ */
+export class EMAState implements IndicatorState<number> {
+  readonly period: number;
+  private readonly multiplier: number;
+  private count = 0;
+  private sum = 0;
+  private current = NaN;
+  private previousSum = 0;
+  private previousValue = NaN;
+
+  constructor(period: number) {
+    this.period = period;
+    this.multiplier = 2 / (period + 1);
+  }
 
-  for (let i = 0; i < data.length; i += 1) {
-    if (isSwingHigh(i)) {
-      lastSwingHighIndex = i;
+  get value(): number {
+    return this.current;
+  }
+
+  push(bar: OHLCV): void {
+    this.previousSum = this.sum;
+    this.previousValue = this.current;
+    this.count += 1;
+    this.apply(bar.close);
+  }
+
+  updateLast(bar: OHLCV): void {
+    if (this.count === 0) {
+      this.push(bar);
+      return;
     }
-    if (isSwingLow(i)) {
-      lastSwingLowIndex = i;
+    this.sum = this.previousSum;
+    this.current = this.previousValue;
+    this.apply(bar.close);
+  }
+
+  private apply(close: number): void {
+    if (this.period < 1) {
+      return;
+    }
+    if (this.count < this.period) {
+      this.sum += close;
+    } else if (this.count === this.period) {
+      // Start with SMA for first value
+      this.sum += close;
+      this.current = this.sum / this.period;
+    } else {
+      this.current = (close - this.current) * this.multiplier + this.current;
     }
+  }
+}
 
-    const bar = data[i];
+/**
+ * Streaming counterpart of calculateBollingerBands over candle closes
+ */
+export class BollingerBandsState
+  implements IndicatorState<{ upper: number; middle: number; lower: number }>
+{
+  private readonly stats: RollingStats;
+  private readonly stdDev: number;
+
+  constructor(period: number = 20, stdDev: number = 2.0) {
+    this.stats = new RollingStats(period);
+    this.stdDev = stdDev;
+  }
 
-    if (lastSwingHighIndex !== null) {
-      const swingHigh = data[lastSwingHighIndex];
-      const breakPct = (bar.close - swingHigh.high) / swingHigh.high;
-      const brokeUp =
-        breakPct >= minimumBreakoutPercent && bar.close > swingHigh.high;
-      if (brokeUp) {
-        const sourceIndex = findSourceCandle(i, "buy");
-        const sourceBar = data[sourceIndex];
-        const zoneLow = sourceBar.low;
-        const zoneHigh = sourceBar.open;
-        const endIndex = findInvalidationIndex(
-          sourceIndex,
-          zoneLow,
-          zoneHigh,
-          "buy"
-        );
-        zones.push({
-          type: "buy",
-          startIndex: sourceIndex,
-          endIndex,
-          startTime: data[sourceIndex].date,
-          endTime: data[endIndex].date,
-          low: Math.min(zoneLow, zoneHigh),
-          high: Math.max(zoneLow, zoneHigh),
-        });
-        lastSwingHighIndex = null;
-      }
+  get value() {
+    const sma = this.stats.mean;
+    const sd = Math.sqrt(this.stats.variance);
+    return {
+      upper: sma + this.stdDev * sd,
+      middle: sma,
+      lower: sma - this.stdDev * sd,
+    };
+  }
+
+  push(bar: OHLCV): void {
+    this.stats.push(bar.close);
+  }
+
+  updateLast(bar: OHLCV): void {
+    this.stats.updateLast(bar.close);
+  }
+}
+
+/**
+ * Streaming counterpart of calculateStochastic
+ */
+export class StochasticState
+  implements IndicatorState<{ k: number; d: number }>
+{
+  private readonly kPeriod: number;
+  private readonly highestHigh: SlidingExtremum;
+  private readonly lowestLow: SlidingExtremum;
+  private readonly smoothedK: RollingMeanSkipNaN | null;
+  private readonly d: RollingMeanSkipNaN;
+  private count = 0;
+  private currentK = NaN;
+
+  constructor(kPeriod: number = 5, dPeriod: number = 3, smoothK: number = 3) {
+    this.kPeriod = kPeriod;
+    this.highestHigh = new SlidingExtremum(kPeriod, "max");
+    this.lowestLow = new SlidingExtremum(kPeriod, "min");
+    this.smoothedK = smoothK > 1 ? new RollingMeanSkipNaN(smoothK) : null;
+    this.d = new RollingMeanSkipNaN(dPeriod);
+  }
+
+  get value() {
+    return { k: this.currentK, d: this.d.mean };
+  }
+
+  push(bar: OHLCV): void {
+    this.count += 1;
+    this.highestHigh.push(bar.high);
+    this.lowestLow.push(bar.low);
+    const rawK = this.rawK(bar.close);
+    if (this.smoothedK) {
+      this.smoothedK.push(rawK);
+      this.currentK = this.smoothedK.mean;
+    } else {
+      this.currentK = rawK;
     }
+    this.d.push(this.currentK);
+  }
 
-    if (lastSwingLowIndex !== null) {
-      const swingLow = data[lastSwingLowIndex];
-      const breakPct = (swingLow.low - bar.close) / swingLow.low;
-      const brokeDown =
-        breakPct >= minimumBreakoutPercent && bar.close < swingLow.low;
-      if (brokeDown) {
-        const sourceIndex = findSourceCandle(i, "sell");
-        const sourceBar = data[sourceIndex];
-        const zoneLow = sourceBar.open;
-        const zoneHigh = sourceBar.high;
-        const endIndex = findInvalidationIndex(
-          sourceIndex,
-          zoneLow,
-          zoneHigh,
-          "sell"
-        );
-        zones.push({
-          type: "sell",
-          startIndex: sourceIndex,
-          endIndex,
-          startTime: data[sourceIndex].date,
-          endTime: data[endIndex].date,
-          low: Math.min(zoneLow, zoneHigh),
-          high: Math.max(zoneLow, zoneHigh),
-        });
-        lastSwingLowIndex = null;
-      }
+  updateLast(bar: OHLCV): void {
+    if (this.count === 0) {
+      this.push(bar);
+      return;
+    }
+    this.highestHigh.updateLast(bar.high);
+    this.lowestLow.updateLast(bar.low);
+    const rawK = this.rawK(bar.close);
+    if (this.smoothedK) {
+      this.smoothedK.updateLast(rawK);
+      this.currentK = this.smoothedK.mean;
+    } else {
+      this.currentK = rawK;
     }
+    this.d.updateLast(this.currentK);
   }
 
-  return zones;
+  private rawK(close: number): number {
+    if (this.count < this.kPeriod) {
+      return NaN;
+    }
+    return stochasticK(close, this.highestHigh.value, this.lowestLow.value);
+  }
 }
 
 /**
- * Calculate all indicators for a dataset
+ * Streaming counterpart of calculateOrderBlocks.
+ *
+ * Bars whose swing window no longer includes the latest candle are committed
+ * to the sweep once; the short provisional tail is replayed on a copy when
+ * `value` is read, so revising the forming candle never rewinds committed work.
  */
-export function calculateAllIndicators(data: OHLCV[]) {
-  const close = data.map((d) => d.close);
-  const high = data.map((d) => d.high);
-  const low = data.map((d) => d.low);
+export class OrderBlockState implements IndicatorState<OrderBlockZone[]> {
+  private readonly settings: OrderBlockSettings;
+  private readonly bars = new OHLCVSeriesBuffer();
+  private readonly sweep: OrderBlockSweep;
+  private committed = 0;
+
+  constructor(settings: OrderBlockSettings = DEFAULT_ORDER_BLOCK_SETTINGS) {
+    this.settings = settings;
+    this.sweep = new OrderBlockSweep(settings);
+  }
 
-  return {
-    ema13: calculateEMA(close, 13),
-    ema21: calculateEMA(close, 21),
-    ema50: calculateEMA(close, 50),
-    ema100: calculateEMA(close, 100),
-    bollinger: calculateBollingerBands(close, 20, 2.0),
-    stochastic: calculateStochastic(high, low, close, 5, 3, 3),
-    orderBlocks: calculateOrderBlocks(data),
-  };
+  get value(): OrderBlockZone[] {
+    const lastIndex = this.bars.length - 1;
+    if (lastIndex < 0) {
+      return [];
+    }
+    const data = this.bars.columns;
+    const provisional = this.sweep.clone();
+    for (let i = this.committed; i <= lastIndex; i += 1) {
+      provisional.step(data, i, lastIndex);
+    }
+    return provisional.getZones(data, lastIndex);
+  }
+
+  push(bar: OHLCV): void {
+    this.bars.push(bar);
+
+    // Commit bars whose swing window ends before the (still mutable) last bar
+    const lastIndex = this.bars.length - 1;
+    const commitUntil = lastIndex - 1 - this.settings.swingLookback;
+    const data = this.bars.columns;
+    for (; this.committed <= commitUntil; this.committed += 1) {
+      this.sweep.step(data, this.committed, lastIndex);
+    }
+  }
+
+  updateLast(bar: OHLCV): void {
+    this.bars.updateLast(bar);
+  }
 }
@@ -0,0 +1,307 @@
+/**
+ * Background ingestion scheduler
+ *
+ * Refreshes each registered source on its own cadence, independently of page
+ * renders, and publishes the result as an immutable snapshot that readers
+ * pick up synchronously. Snapshots are frozen and replaced, never updated,
+ * so their values must be treated as read-only. A failed refresh keeps the
+ * previous snapshot and is retried with backoff. Freshness per source (age,
+ * staleness, last error) is observable through `freshness()`.
+ *
+ * Time goes through a `Clock`, so the scheduler can be driven by a fake clock
+ * in scripts and checks.
+ */
+
+export interface Clock {
+  now(): number;
+  setTimeout(callback: () => void, ms: number): unknown;
+  clearTimeout(handle: unknown): void;
+}
+
+/**
+ * Wall clock whose timers do not keep the process alive
+ */
+export const systemClock: Clock = {
+  now: () => Date.now(),
+  setTimeout: (callback, ms) => {
+    const handle = setTimeout(callback, ms);
+    handle.unref?.();
+    return handle;
+  },
+  clearTimeout: (handle) =>
+    clearTimeout(handle as ReturnType<typeof setTimeout>),
+};
+
+export interface SourceOptions<T> {
+  /**
+   * Time between successful refreshes
+   */
+  intervalMs: number;
+  /**
+   * First retry delay after a failure, doubling up to `intervalMs`
+   * (default a tenth of the interval)
+   */
+  retryMs?: number;
+  load: () => Promise<T>;
+}
+
+export interface Snapshot<T> {
+  readonly value: T;
+  /**
+   * Increases by one with every published snapshot of the source
+   */
+  readonly version: number;
+  readonly updatedAt: number;
+}
+
+export interface SourceFreshness {
+  version: number;
+  updatedAt: number | null;
+  ageMs: number | null;
+  /**
+   * No successful refresh within twice the interval
+   */
+  stale: boolean;
+  refreshing: boolean;
+  lastAttemptAt: number | null;
+  lastError: string | null;
+  consecutiveFailures: number;
+  nextRefreshAt: number | null;
+}
+
+// A source is stale once its snapshot is older than this many intervals
+const STALE_INTERVALS = 2;
+
+interface SourceState<T> {
+  name: PropertyKey;
+  options: SourceOptions<T>;
+  snapshot: Snapshot<T> | null;
+  inFlight: Promise<Snapshot<T> | null> | null;
+  timer: unknown;
+  nextRefreshAt: number | null;
+  lastAttemptAt: number | null;
+  lastError: string | null;
+  consecutiveFailures: number;
+  /**
+   * Readers waiting for the next attempt to settle
+   */
+  waiters: ((snapshot: Snapshot<T> | null) => void)[];
+}
+
+export class IngestionScheduler<Sources extends Record<string, unknown>> {
+  private readonly clock: Clock;
+  private readonly sources = new Map<
+    keyof Sources,
+    SourceState<Sources[keyof Sources]>
+  >();
+  private running = false;
+
+  constructor(clock: Clock = systemClock) {
+    this.clock = clock;
+  }
+
+  get isRunning(): boolean {
+    return this.running;
+  }
+
+  register<K extends keyof Sources>(
+    name: K,
+    options: SourceOptions<Sources[K]>
+  ): void {
+    if (this.sources.has(name)) {
+      throw new Error(`Ingestion source ${String(name)} already registered`);
+    }
+    this.sources.set(name, {
+      name,
+      options,
+      snapshot: null,
+      inFlight: null,
+      timer: null,
+      nextRefreshAt: null,
+      lastAttemptAt: null,
+      lastError: null,
+      consecutiveFailures: 0,
+      waiters: [],
+    } as SourceState<Sources[keyof Sources]>);
+    if (this.running) {
+      void this.refresh(name);
+    }
+  }
+
+  /**
+   * Refresh every source now and keep them on their cadence. Safe to call
+   * more than once.
+   */
+  start(): void {
+    if (this.running) {
+      return;
+    }
+    this.running = true;
+    for (const name of this.sources.keys()) {
+      void this.refresh(name);
+    }
+  }
+
+  stop(): void {
+    this.running = false;
+    for (const state of this.sources.values()) {
+      if (state.timer !== null) {
+        this.clock.clearTimeout(state.timer);
+        state.timer = null;
+      }
+      state.nextRefreshAt = null;
+    }
+  }
+
+  /**
+   * Latest published snapshot, or null before the first successful refresh
+   */
+  snapshot<K extends keyof Sources>(name: K): Snapshot<Sources[K]> | null {
+    return (this.state(name).snapshot as Snapshot<Sources[K]> | null) ?? null;
+  }
+
+  /**
+   * The latest snapshot, waiting (at most `timeoutMs`) only when none has
+   * been published yet. Waits join the refresh in progress or the next
+   * scheduled one, so readers never bypass the retry backoff; a refresh is
+   * started only when none is scheduled. Resolves to null when that refresh
+   * fails or times out.
+   */
+  whenReady<K extends keyof Sources>(
+    name: K,
+    timeoutMs: number = Infinity
+  ): Promise<Snapshot<Sources[K]> | null> {
+    const state = this.state(name);
+    if (state.snapshot) {
+      return Promise.resolve(state.snapshot as Snapshot<Sources[K]>);
+    }
+
+    const pending = (
+      state.inFlight ??
+      (state.timer !== null
+        ? new Promise<Snapshot<Sources[keyof Sources]> | null>((resolve) =>
+            state.waiters.push(resolve)
+          )
+        : this.refresh(name))
+    ) as Promise<Snapshot<Sources[K]> | null>;
+    if (!Number.isFinite(timeoutMs)) {
+      return pending;
+    }
+    return new Promise((resolve) => {
+      const timer = this.clock.setTimeout(() => resolve(null), timeoutMs);
+      pending.then((snapshot) => {
+        this.clock.clearTimeout(timer);
+        resolve(snapshot);
+      });
+    });
+  }
+
+  /**
+   * Refresh a source now (joining a refresh already in progress) and resolve
+   * to the new snapshot, or null when the refresh failed
+   */
+  refresh<K extends keyof Sources>(
+    name: K
+  ): Promise<Snapshot<Sources[K]> | null> {
+    const state = this.state(name);
+    if (state.inFlight) {
+      return state.inFlight as Promise<Snapshot<Sources[K]> | null>;
+    }
+    if (state.timer !== null) {
+      this.clock.clearTimeout(state.timer);
+      state.timer = null;
+      state.nextRefreshAt = null;
+    }
+
+    state.lastAttemptAt = this.clock.now();
+    const inFlight = Promise.resolve()
+      .then(() => state.options.load())
+      .then((value) => {
+        const snapshot = Object.freeze({
+          value,
+          version: (state.snapshot?.version ?? 0) + 1,
+          updatedAt: this.clock.now(),
+        });
+        state.snapshot = snapshot;
+        state.lastError = null;
+        state.consecutiveFailures = 0;
+        this.schedule(state, state.options.intervalMs);
+        return snapshot;
+      })
+      .catch((error) => {
+        state.lastError = error instanceof Error ? error.message : `${error}`;
+        state.consecutiveFailures += 1;
+        console.error(
+          `[${new Date().toISOString()}] ❌ Ingestion of ${String(name)} failed (${state.consecutiveFailures} in a row):`,
+          error
+        );
+        const { intervalMs, retryMs = intervalMs / 10 } = state.options;
+        this.schedule(
+          state,
+          Math.min(intervalMs, retryMs * 2 ** (state.consecutiveFailures - 1))
+        );
+        return null;
+      })
+      .then((snapshot) => {
+        state.inFlight = null;
+        for (const resolve of state.waiters.splice(0)) {
+          resolve(snapshot);
+        }
+        return snapshot;
+      });
+
+    state.inFlight = inFlight;
+    return inFlight as Promise<Snapshot<Sources[K]> | null>;
+  }
+
+  /**
+   * Freshness of every source at the current clock time
+   */
+  freshness(): Record<keyof Sources, SourceFreshness> {
+    const now = this.clock.now();
+    const report = {} as Record<keyof Sources, SourceFreshness>;
+    for (const [name, state] of this.sources) {
+      const updatedAt = state.snapshot?.updatedAt ?? null;
+      const ageMs = updatedAt === null ? null : now - updatedAt;
+      report[name] = {
+        version: state.snapshot?.version ?? 0,
+        updatedAt,
+        ageMs,
+        stale:
+          ageMs === null ||
+          ageMs > state.options.intervalMs * STALE_INTERVALS,
+        refreshing: state.inFlight !== null,
+        lastAttemptAt: state.lastAttemptAt,
+        lastError: state.lastError,
+        consecutiveFailures: state.consecutiveFailures,
+        nextRefreshAt: state.nextRefreshAt,
+      };
+    }
+    return report;
+  }
+
+  private state<K extends keyof Sources>(
+    name: K
+  ): SourceState<Sources[keyof Sources]> {
+    const state = this.sources.get(name);
+    if (!state) {
+      throw new Error(`Unknown ingestion source ${String(name)}`);
+    }
+    return state;
+  }
+
+  private schedule(
+    state: SourceState<Sources[keyof Sources]>,
+    delayMs: number
+  ): void {
+    if (!this.running) {
+      return;
+    }
+    state.nextRefreshAt = this.clock.now() + delayMs;
+    state.timer = this.clock.setTimeout(() => {
+      state.timer = null;
+      state.nextRefreshAt = null;
+      void this.refresh(state.name as keyof Sources);
+    }, delayMs);
+  }
+}
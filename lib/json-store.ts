@@ -0,0 +1,41 @@
+/**
+ * Small JSON files persisted next to the candle store
+ *
+ * Used for upstream data that rarely or never changes once observed (halving
+ * block timestamps, past Fear and Greed readings). Files live in DATA_DIR,
+ * which defaults to `.data` and can be overridden with the DATA_DIR
+ * environment variable. Writes are atomic (temporary file plus rename).
+ */
+
+import { mkdir, readFile, rename, writeFile } from "node:fs/promises";
+import { dirname, join } from "node:path";
+
+export const DATA_DIR = process.env.DATA_DIR || join(process.cwd(), ".data");
+
+/**
+ * Read and parse `DATA_DIR/name`, or return null when it does not exist
+ */
+export async function readJsonFile<T>(name: string): Promise<T | null> {
+  try {
+    return JSON.parse(await readFile(join(DATA_DIR, name), "utf8"));
+  } catch (error) {
+    if ((error as NodeJS.ErrnoException)?.code === "ENOENT") {
+      return null;
+    }
+    throw error;
+  }
+}
+
+/**
+ * Atomically replace `DATA_DIR/name` with `value` serialized as JSON
+ */
+export async function writeJsonFile(
+  name: string,
+  value: unknown
+): Promise<void> {
+  const path = join(DATA_DIR, name);
+  await mkdir(dirname(path), { recursive: true });
+  const temporary = `${path}.${process.pid}.tmp`;
+  await writeFile(temporary, `${JSON.stringify(value, null, 2)}\n`);
+  await rename(temporary, path);
+}
@@ -0,0 +1,282 @@
+/**
+ * Market data sources and their ingestion cadence
+ *
+ * Candles (with derived timeframes and indicators), halving dates and the
+ * Fear and Greed Index are refreshed in the background by one process-wide
+ * scheduler, started from instrumentation.ts. Pages read the published
+ * snapshots instead of fetching upstream while rendering, and the chart
+ * series and overlays derived from them are built once per snapshot.
+ */
+
+import {
+  buildChartSeries,
+  buildFearGreedLine,
+  buildHalvingMarkers,
+  FearGreedByDay,
+} from "@/lib/chart-series";
+import {
+  Timeframe,
+  TIMEFRAME_RESAMPLE_RULES,
+  TIMEFRAMES,
+} from "@/lib/constants";
+import { fetchBitcoinDataDirect } from "@/lib/fetch-bitcoin";
+import {
+  FearGreedDataPoint,
+  fetchFearGreedDataDirect,
+} from "@/lib/fetch-fear-greed";
+import {
+  fetchHalvingDatesDirect,
+  NextHalvingProjection,
+} from "@/lib/fetch-halving-dates";
+import { indicatorCache } from "@/lib/indicator-cache";
+import { indicatorPool } from "@/lib/indicator-pool";
+import { IndicatorStream } from "@/lib/indicator-stream";
+import { IngestionScheduler, Snapshot } from "@/lib/ingestion";
+import { resampleSeries } from "@/lib/resample";
+import {
+  ChartOverlay,
+  ChartOverlays,
+  TimeframeChart,
+  TimeframeSnapshot,
+} from "@/lib/timeframe-payload";
+
+const MINUTE_MS = 60 * 1000;
+
+/**
+ * How long a request on a cold server waits for the first ingestion
+ */
+export const FIRST_SNAPSHOT_TIMEOUT_MS = 30_000;
+
+// A type alias rather than an interface, so it satisfies the scheduler's
+// Record constraint
+export type MarketDataSources = {
+  bitcoin: Record<Timeframe, TimeframeSnapshot>;
+  halvings: {
+    halvingDates: string[];
+    nextHalving: NextHalvingProjection | null;
+  };
+  fearGreed: {
+    points: FearGreedDataPoint[];
+    /**
+     * Readings keyed by UTC day number (epoch seconds / 86400)
+     */
+    byDay: FearGreedByDay;
+  };
+};
+
+/**
+ * Fetch daily candles, derive the other timeframes and bring their
+ * indicators up to date. A refresh that only revises the forming candle or
+ * appends new ones extends the previous indicators through each timeframe's
+ * stream; otherwise they are computed on the worker pool (reusing cached
+ * results for unchanged history). Fails as a whole when any timeframe's
+ * indicators fail, so the scheduler keeps the previous snapshot and retries.
+ */
+async function loadBitcoin(
+  streams: Record<Timeframe, IndicatorStream>
+): Promise<MarketDataSources["bitcoin"]> {
+  const daily = await fetchBitcoinDataDirect("1d");
+
+  const series = TIMEFRAMES.map((tf) => {
+    const rule = TIMEFRAME_RESAMPLE_RULES[tf];
+    return rule ? resampleSeries(daily, rule) : daily;
+  });
+
+  const entries = await Promise.all(
+    TIMEFRAMES.map(async (tf, i): Promise<[Timeframe, TimeframeSnapshot]> => {
+      const data = series[i];
+      if (data.time.length === 0) {
+        return [tf, { data, indicators: null }];
+      }
+      try {
+        const indicators = await streams[tf].update(data, (input) =>
+          indicatorCache.memoizeAsync("all", null, input, (series) =>
+            indicatorPool.run(series)
+          )
+        );
+        return [tf, { data, indicators }];
+      } catch (error) {
+        console.error(
+          `[${new Date().toISOString()}] ❌ Indicators for ${tf} failed:`,
+          error
+        );
+        throw error;
+      }
+    })
+  );
+
+  console.log(
+    `[${new Date().toISOString()}] 🧮 Indicator cache:`,
+    indicatorCache.stats,
+    "streams:",
+    Object.fromEntries(TIMEFRAMES.map((tf) => [tf, streams[tf].stats]))
+  );
+  return Object.fromEntries(entries) as MarketDataSources["bitcoin"];
+}
+
+async function loadFearGreed(): Promise<MarketDataSources["fearGreed"]> {
+  const points = await fetchFearGreedDataDirect();
+  const byDay = new Map(
+    points.map((point) => [
+      point.day,
+      { value: point.value, classification: point.classification },
+    ])
+  );
+  return { points, byDay };
+}
+
+// Charts and overlays per candle snapshot, keyed by kind and timeframe;
+// overlays are kept while the overlay snapshot they were built from is
+// current
+const chartCache = new WeakMap<
+  Snapshot<MarketDataSources["bitcoin"]>,
+  Map<string, { source: object | null; value: unknown }>
+>();
+
+function memoizeChart<T>(
+  bitcoin: Snapshot<MarketDataSources["bitcoin"]>,
+  key: string,
+  source: object | null,
+  build: () => T
+): T {
+  let entries = chartCache.get(bitcoin);
+  if (!entries) {
+    entries = new Map();
+    chartCache.set(bitcoin, entries);
+  }
+  const entry = entries.get(key);
+  if (entry && entry.source === source) {
+    return entry.value as T;
+  }
+
+  const startTime = Date.now();
+  const value = build();
+  console.log(
+    `[${new Date().toISOString()}] 🎨 Built ${key} in ${Date.now() - startTime}ms`
+  );
+  entries.set(key, { source, value });
+  return value;
+}
+
+/**
+ * Chart-ready series for one timeframe, built from the candle snapshot at
+ * most once (every visitor in the same regeneration gets the same object).
+ * Null when the timeframe has no candles or indicators yet.
+ */
+export function timeframeChart(
+  timeframe: Timeframe,
+  bitcoin: Snapshot<MarketDataSources["bitcoin"]>
+): TimeframeChart | null {
+  return memoizeChart(bitcoin, `${timeframe} chart`, null, () => {
+    const { data, indicators } = bitcoin.value[timeframe];
+    if (!indicators) {
+      return null;
+    }
+    const series = buildChartSeries({ data, indicators });
+    return series && { series, orderBlocks: indicators.orderBlocks };
+  });
+}
+
+const OVERLAY_BUILDERS: {
+  [K in ChartOverlay]: (
+    time: Uint32Array,
+    source: MarketDataSources[K]
+  ) => ChartOverlays[K];
+} = {
+  halvings: (time, { halvingDates }) => buildHalvingMarkers(time, halvingDates),
+  fearGreed: (time, { byDay }) => buildFearGreedLine(time, byDay),
+};
+
+/**
+ * One overlay for a timeframe's chart, built from the candle and overlay
+ * snapshots at most once
+ */
+export function chartOverlay<K extends ChartOverlay>(
+  overlay: K,
+  timeframe: Timeframe,
+  bitcoin: Snapshot<MarketDataSources["bitcoin"]>,
+  source: Snapshot<MarketDataSources[K]>
+): ChartOverlays[K] {
+  return memoizeChart(bitcoin, `${timeframe} ${overlay}`, source, () =>
+    OVERLAY_BUILDERS[overlay](bitcoin.value[timeframe].data.time, source.value)
+  );
+}
+
+/**
+ * The chart for one timeframe once candles are available, waiting only for
+ * the candle source (null when it has none in time)
+ */
+export async function loadTimeframeChart(
+  timeframe: Timeframe
+): Promise<TimeframeChart | null> {
+  marketData.start();
+  const bitcoin = await marketData.whenReady(
+    "bitcoin",
+    FIRST_SNAPSHOT_TIMEOUT_MS
+  );
+  return bitcoin && timeframeChart(timeframe, bitcoin);
+}
+
+/**
+ * One overlay for a timeframe once its source and the candles are available
+ * (null when either has none in time), independently of the other overlays
+ */
+export async function loadChartOverlay<K extends ChartOverlay>(
+  overlay: K,
+  timeframe: Timeframe
+): Promise<ChartOverlays[K] | null> {
+  marketData.start();
+  const [bitcoin, source] = await Promise.all([
+    marketData.whenReady("bitcoin", FIRST_SNAPSHOT_TIMEOUT_MS),
+    marketData.whenReady(overlay, FIRST_SNAPSHOT_TIMEOUT_MS),
+  ]);
+  return bitcoin && source && chartOverlay(overlay, timeframe, bitcoin, source);
+}
+
+/**
+ * Register the market data sources on a scheduler. Intervals are in
+ * milliseconds.
+ */
+export function registerMarketDataSources(
+  scheduler: IngestionScheduler<MarketDataSources>,
+  intervals: Record<keyof MarketDataSources, number> = {
+    bitcoin: 15 * MINUTE_MS,
+    halvings: 60 * MINUTE_MS,
+    fearGreed: 60 * MINUTE_MS,
+  }
+): void {
+  const streams = Object.fromEntries(
+    TIMEFRAMES.map((tf) => [tf, new IndicatorStream()])
+  ) as Record<Timeframe, IndicatorStream>;
+  scheduler.register("bitcoin", {
+    intervalMs: intervals.bitcoin,
+    load: () => loadBitcoin(streams),
+  });
+  scheduler.register("halvings", {
+    intervalMs: intervals.halvings,
+    load: fetchHalvingDatesDirect,
+  });
+  scheduler.register("fearGreed", {
+    intervalMs: intervals.fearGreed,
+    load: loadFearGreed,
+  });
+}
+
+// instrumentation.ts and the app routes are bundled separately, so the
+// scheduler lives on globalThis to be shared between them
+const globalForMarketData = globalThis as typeof globalThis & {
+  marketDataScheduler?: IngestionScheduler<MarketDataSources>;
+};
+
+function createMarketDataScheduler(): IngestionScheduler<MarketDataSources> {
+  const scheduler = new IngestionScheduler<MarketDataSources>();
+  registerMarketDataSources(scheduler);
+  return scheduler;
+}
+
+/**
+ * Process-wide scheduler for the market data sources (not started until
+ * `start()` is called)
+ */
+export const marketData = (globalForMarketData.marketDataScheduler ??=
+  createMarketDataScheduler());
@@ -0,0 +1,202 @@
+/**
+ * Persistent local candle store
+ *
+ * One append-only binary file per series key plus a small JSON manifest.
+ * Each candle is a fixed 48-byte little-endian record (time, open, high, low,
+ * close, volume as float64), so loading is a single read and revising the
+ * still-forming tail is a truncate plus append. The manifest records how many
+ * rows are committed; bytes past that (an interrupted write) are ignored and
+ * overwritten by the next write.
+ *
+ * The directory defaults to `ohlcv` under DATA_DIR (`.data`) and can be
+ * overridden with OHLCV_STORE_DIR. Callers treat the store as a best-effort
+ * cache: every failure surfaces as an exception they can log and ignore.
+ */
+
+import { DATA_DIR } from "@/lib/json-store";
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+import { mkdir, open, readFile, rename, writeFile } from "node:fs/promises";
+import { join } from "node:path";
+
+// Version 2 stores real candles only; version 1 stores may hold forward-filled
+// ones and are rebuilt from upstream
+const STORE_VERSION = 2;
+const FIELDS_PER_RECORD = 6;
+const RECORD_BYTES = FIELDS_PER_RECORD * 8;
+const MANIFEST_FILE = "manifest.json";
+
+export interface StoredSeriesInfo {
+  file: string;
+  rows: number;
+  firstTime: number;
+  lastTime: number;
+  updatedAt: string;
+}
+
+interface StoreManifest {
+  version: number;
+  recordBytes: number;
+  series: Record<string, StoredSeriesInfo>;
+}
+
+function emptyManifest(): StoreManifest {
+  return { version: STORE_VERSION, recordBytes: RECORD_BYTES, series: {} };
+}
+
+function isMissing(error: unknown): boolean {
+  return (error as NodeJS.ErrnoException)?.code === "ENOENT";
+}
+
+/**
+ * Encode `series.slice(from)` as consecutive records
+ */
+function encodeRecords(series: OHLCVSeries, from: number): Buffer {
+  const rows = series.time.length - from;
+  const buffer = Buffer.alloc(rows * RECORD_BYTES);
+  for (let row = 0; row < rows; row++) {
+    const index = from + row;
+    const offset = row * RECORD_BYTES;
+    buffer.writeDoubleLE(series.time[index], offset);
+    buffer.writeDoubleLE(series.open[index], offset + 8);
+    buffer.writeDoubleLE(series.high[index], offset + 16);
+    buffer.writeDoubleLE(series.low[index], offset + 24);
+    buffer.writeDoubleLE(series.close[index], offset + 32);
+    buffer.writeDoubleLE(series.volume[index], offset + 40);
+  }
+  return buffer;
+}
+
+function decodeRecords(buffer: Buffer, rows: number): OHLCVSeries {
+  const series = createOHLCVSeries(rows);
+  for (let row = 0; row < rows; row++) {
+    const offset = row * RECORD_BYTES;
+    series.time[row] = buffer.readDoubleLE(offset);
+    series.open[row] = buffer.readDoubleLE(offset + 8);
+    series.high[row] = buffer.readDoubleLE(offset + 16);
+    series.low[row] = buffer.readDoubleLE(offset + 24);
+    series.close[row] = buffer.readDoubleLE(offset + 32);
+    series.volume[row] = buffer.readDoubleLE(offset + 40);
+  }
+  return series;
+}
+
+/**
+ * Directory-backed store of candle series keyed by name (e.g. "btc-usd-1d")
+ */
+export class OHLCVStore {
+  readonly directory: string;
+  // Manifest updates are serialized so concurrent writers never interleave
+  private writeQueue: Promise<unknown> = Promise.resolve();
+
+  constructor(directory: string) {
+    this.directory = directory;
+  }
+
+  /**
+   * Committed rows and time range for a key, or null when nothing is stored
+   */
+  async info(key: string): Promise<StoredSeriesInfo | null> {
+    const manifest = await this.readManifest();
+    return manifest.series[key] ?? null;
+  }
+
+  /**
+   * Load the stored series for a key, or null when nothing is stored
+   */
+  async read(key: string): Promise<OHLCVSeries | null> {
+    const info = await this.info(key);
+    if (!info || info.rows === 0) {
+      return null;
+    }
+
+    const buffer = await readFile(join(this.directory, info.file));
+    if (buffer.length < info.rows * RECORD_BYTES) {
+      throw new Error(
+        `Candle store file ${info.file} is shorter than its manifest (${buffer.length} bytes for ${info.rows} rows)`
+      );
+    }
+    return decodeRecords(buffer, info.rows);
+  }
+
+  /**
+   * Persist `series` for a key, given that its first `keepRows` rows are
+   * already stored unchanged. Only the rows after that are written.
+   */
+  write(key: string, series: OHLCVSeries, keepRows: number): Promise<void> {
+    const task = this.writeQueue.then(() =>
+      this.writeTail(key, series, keepRows)
+    );
+    this.writeQueue = task.catch(() => undefined);
+    return task;
+  }
+
+  private async writeTail(
+    key: string,
+    series: OHLCVSeries,
+    keepRows: number
+  ): Promise<void> {
+    await mkdir(this.directory, { recursive: true });
+    const manifest = await this.readManifest();
+    const file = `${key}.bin`;
+    const stored = manifest.series[key]?.rows ?? 0;
+    const from = Math.max(0, Math.min(keepRows, stored, series.time.length));
+
+    const path = join(this.directory, file);
+    const handle = await open(path, from > 0 ? "r+" : "w");
+    try {
+      const offset = from * RECORD_BYTES;
+      await handle.truncate(offset);
+      await handle.write(encodeRecords(series, from), 0, undefined, offset);
+      await handle.sync();
+    } finally {
+      await handle.close();
+    }
+
+    const rows = series.time.length;
+    manifest.series[key] = {
+      file,
+      rows,
+      firstTime: rows > 0 ? series.time[0] : 0,
+      lastTime: rows > 0 ? series.time[rows - 1] : 0,
+      updatedAt: new Date().toISOString(),
+    };
+    await this.writeManifest(manifest);
+  }
+
+  private async readManifest(): Promise<StoreManifest> {
+    let text: string;
+    try {
+      text = await readFile(join(this.directory, MANIFEST_FILE), "utf8");
+    } catch (error) {
+      if (isMissing(error)) {
+        return emptyManifest();
+      }
+      throw error;
+    }
+
+    const manifest: StoreManifest = JSON.parse(text);
+    // A different layout is treated as an empty store and rewritten
+    if (
+      manifest.version !== STORE_VERSION ||
+      manifest.recordBytes !== RECORD_BYTES
+    ) {
+      return emptyManifest();
+    }
+    return manifest;
+  }
+
+  private async writeManifest(manifest: StoreManifest): Promise<void> {
+    const path = join(this.directory, MANIFEST_FILE);
+    const temporary = `${path}.${process.pid}.tmp`;
+    await writeFile(temporary, `${JSON.stringify(manifest, null, 2)}\n`);
+    await rename(temporary, path);
+  }
+}
+
+/**
+ * Process-wide store used by the fetchers. The directory can be overridden
+ * with OHLCV_STORE_DIR.
+ */
+export const ohlcvStore = new OHLCVStore(
+  process.env.OHLCV_STORE_DIR || join(DATA_DIR, "ohlcv")
+);
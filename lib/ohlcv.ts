@@ -0,0 +1,133 @@
+/**
+ * OHLCV data types
+ */
+
+/**
+ * A single candle. `time` is the candle open in epoch seconds (UTC).
+ */
+export interface OHLCV {
+  time: number;
+  open: number;
+  high: number;
+  low: number;
+  close: number;
+  volume: number;
+}
+
+/**
+ * Columnar candle history: one typed array per field, all the same length and
+ * ordered by ascending `time` (epoch seconds, UTC).
+ *
+ * This is the canonical shape passed between fetchers, indicators and charts.
+ * Columns can be handed straight to the indicator kernels without re-projecting
+ * per-bar objects, and typed arrays survive the RSC boundary as binary.
+ */
+export interface OHLCVSeries {
+  time: Uint32Array;
+  open: Float64Array;
+  high: Float64Array;
+  low: Float64Array;
+  close: Float64Array;
+  volume: Float64Array;
+}
+
+/**
+ * Allocate a zero-filled series with room for `length` candles
+ */
+export function createOHLCVSeries(length: number): OHLCVSeries {
+  return {
+    time: new Uint32Array(length),
+    open: new Float64Array(length),
+    high: new Float64Array(length),
+    low: new Float64Array(length),
+    close: new Float64Array(length),
+    volume: new Float64Array(length),
+  };
+}
+
+/**
+ * Read the candle at `index` as a plain object
+ */
+export function getOHLCVBar(series: OHLCVSeries, index: number): OHLCV {
+  return {
+    time: series.time[index],
+    open: series.open[index],
+    high: series.high[index],
+    low: series.low[index],
+    close: series.close[index],
+    volume: series.volume[index],
+  };
+}
+
+/**
+ * Append-only columnar candle storage that grows by doubling, for building a
+ * series one candle at a time. The last candle can be revised in place while
+ * it is still forming.
+ */
+export class OHLCVSeriesBuffer {
+  private storage: OHLCVSeries;
+  private size = 0;
+
+  constructor(initialCapacity: number = 256) {
+    this.storage = createOHLCVSeries(Math.max(1, initialCapacity));
+  }
+
+  get length(): number {
+    return this.size;
+  }
+
+  /**
+   * Backing columns. Only the first `length` entries are meaningful, and the
+   * arrays are replaced whenever the buffer grows.
+   */
+  get columns(): OHLCVSeries {
+    return this.storage;
+  }
+
+  /**
+   * Series view over the stored candles (shares memory with the buffer)
+   */
+  toSeries(): OHLCVSeries {
+    const { time, open, high, low, close, volume } = this.storage;
+    return {
+      time: time.subarray(0, this.size),
+      open: open.subarray(0, this.size),
+      high: high.subarray(0, this.size),
+      low: low.subarray(0, this.size),
+      close: close.subarray(0, this.size),
+      volume: volume.subarray(0, this.size),
+    };
+  }
+
+  push(bar: OHLCV): void {
+    if (this.size === this.storage.time.length) {
+      const grown = createOHLCVSeries(this.size * 2);
+      grown.time.set(this.storage.time);
+      grown.open.set(this.storage.open);
+      grown.high.set(this.storage.high);
+      grown.low.set(this.storage.low);
+      grown.close.set(this.storage.close);
+      grown.volume.set(this.storage.volume);
+      this.storage = grown;
+    }
+    this.size += 1;
+    this.write(this.size - 1, bar);
+  }
+
+  updateLast(bar: OHLCV): void {
+    if (this.size === 0) {
+      this.push(bar);
+      return;
+    }
+    this.write(this.size - 1, bar);
+  }
+
+  private write(index: number, bar: OHLCV): void {
+    this.storage.time[index] = bar.time;
+    this.storage.open[index] = bar.open;
+    this.storage.high[index] = bar.high;
+    this.storage.low[index] = bar.low;
+    this.storage.close[index] = bar.close;
+    this.storage.volume[index] = bar.volume;
+  }
+}
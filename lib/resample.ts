@@ -0,0 +1,127 @@
+/**
+ * Candle resampling
+ *
+ * Aggregates a finer columnar series (normally daily candles) into coarser
+ * candles: first open, highest high, lowest low, last close and summed
+ * volume per period. Each output candle is stamped with the start of its
+ * period in UTC, the same convention Yahoo Finance uses for 1wk and 1mo bars.
+ */
+
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+
+const SECONDS_PER_DAY = 86400;
+// 1970-01-01 was a Thursday
+const EPOCH_WEEKDAY = 4;
+
+/**
+ * Period to aggregate into:
+ * - `day`: blocks of `size` days counted from 1970-01-01
+ * - `week`: calendar weeks starting on `weekStartsOn` (0 = Sunday, default
+ *   1 = Monday as in Yahoo Finance)
+ * - `month`: blocks of `size` calendar months aligned to January 1970, so 3
+ *   gives quarters and 12 gives years
+ */
+export type ResampleRule =
+  | { unit: "day"; size: number }
+  | { unit: "week"; weekStartsOn?: number }
+  | { unit: "month"; size?: number };
+
+/**
+ * Start of the period containing `time`, both in epoch seconds
+ */
+export function periodStart(time: number, rule: ResampleRule): number {
+  const day = Math.floor(time / SECONDS_PER_DAY);
+  switch (rule.unit) {
+    case "day": {
+      const size = Math.max(1, Math.floor(rule.size));
+      return Math.floor(day / size) * size * SECONDS_PER_DAY;
+    }
+    case "week": {
+      const weekStartsOn = rule.weekStartsOn ?? 1;
+      const weekday = (day + EPOCH_WEEKDAY) % 7;
+      const offset = (weekday - weekStartsOn + 14) % 7;
+      return (day - offset) * SECONDS_PER_DAY;
+    }
+    case "month": {
+      const size = Math.max(1, Math.floor(rule.size ?? 1));
+      const date = new Date(time * 1000);
+      const month = date.getUTCFullYear() * 12 + date.getUTCMonth();
+      const start = Math.floor(month / size) * size;
+      return Date.UTC(Math.floor(start / 12), start % 12, 1) / 1000;
+    }
+  }
+}
+
+/**
+ * Aggregate a time-ordered series into one candle per period, in a single
+ * pass over the input
+ */
+export function resampleSeries(
+  data: OHLCVSeries,
+  rule: ResampleRule
+): OHLCVSeries {
+  const length = data.time.length;
+  // At most one output candle per input candle; trimmed at the end
+  const output = createOHLCVSeries(length);
+  let count = 0;
+  let currentStart = NaN;
+  let currentEnd = -Infinity;
+
+  for (let i = 0; i < length; i++) {
+    const time = data.time[i];
+    const high = data.high[i];
+    const low = data.low[i];
+
+    // Periods are contiguous, so a period boundary is crossed exactly when
+    // the time reaches the end of the current one
+    if (time >= currentEnd || time < currentStart) {
+      currentStart = periodStart(time, rule);
+      currentEnd = nextPeriodStart(currentStart, rule);
+      output.time[count] = currentStart;
+      output.open[count] = data.open[i];
+      output.high[count] = high;
+      output.low[count] = low;
+      output.close[count] = data.close[i];
+      output.volume[count] = data.volume[i];
+      count++;
+      continue;
+    }
+
+    const last = count - 1;
+    if (high > output.high[last]) output.high[last] = high;
+    if (low < output.low[last]) output.low[last] = low;
+    output.close[last] = data.close[i];
+    output.volume[last] += data.volume[i];
+  }
+
+  if (count === length) {
+    return output;
+  }
+  return {
+    time: output.time.slice(0, count),
+    open: output.open.slice(0, count),
+    high: output.high.slice(0, count),
+    low: output.low.slice(0, count),
+    close: output.close.slice(0, count),
+    volume: output.volume.slice(0, count),
+  };
+}
+
+/**
+ * Start of the period after the one starting at `start`
+ */
+export function nextPeriodStart(start: number, rule: ResampleRule): number {
+  switch (rule.unit) {
+    case "day":
+      return start + Math.max(1, Math.floor(rule.size)) * SECONDS_PER_DAY;
+    case "week":
+      return start + 7 * SECONDS_PER_DAY;
+    case "month": {
+      const size = Math.max(1, Math.floor(rule.size ?? 1));
+      const date = new Date(start * 1000);
+      return (
+        Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + size, 1) / 1000
+      );
+    }
+  }
+}
@@ -0,0 +1,353 @@
+/**
+ * Range- and column-selective views of a timeframe's candles and indicators
+ *
+ * Backs /api/series. A query names a timeframe, an optional inclusive time
+ * range and the columns to return, so a client downloads only the window and
+ * series it draws. Queries are normalized (fields deduplicated and ordered,
+ * ranges as epoch seconds) so equal requests map to the same cache key.
+ * Responses are JSON, or a binary columnar frame (lib/columnar-codec.ts)
+ * with `format=binary`.
+ */
+
+import { ColumnPrecision, encodeColumnarFrame } from "@/lib/columnar-codec";
+import { DEFAULT_TIMEFRAME, Timeframe, TIMEFRAMES } from "@/lib/constants";
+import { OrderBlockType } from "@/lib/indicators";
+import { TimeframeSnapshot } from "@/lib/timeframe-payload";
+
+type ColumnGetter = (snapshot: TimeframeSnapshot) => Float64Array | null;
+
+/**
+ * Every column a query can select, in response order
+ */
+const SERIES_COLUMNS = {
+  open: ({ data }) => data.open,
+  high: ({ data }) => data.high,
+  low: ({ data }) => data.low,
+  close: ({ data }) => data.close,
+  volume: ({ data }) => data.volume,
+  ema13: ({ indicators }) => indicators?.ema13 ?? null,
+  ema21: ({ indicators }) => indicators?.ema21 ?? null,
+  ema50: ({ indicators }) => indicators?.ema50 ?? null,
+  ema100: ({ indicators }) => indicators?.ema100 ?? null,
+  bbUpper: ({ indicators }) => indicators?.bollinger.upper ?? null,
+  bbMiddle: ({ indicators }) => indicators?.bollinger.middle ?? null,
+  bbLower: ({ indicators }) => indicators?.bollinger.lower ?? null,
+  stochK: ({ indicators }) => indicators?.stochastic.k ?? null,
+  stochD: ({ indicators }) => indicators?.stochastic.d ?? null,
+} satisfies Record<string, ColumnGetter>;
+
+export type SeriesColumn = keyof typeof SERIES_COLUMNS;
+
+const COLUMN_NAMES = Object.keys(SERIES_COLUMNS) as SeriesColumn[];
+
+/**
+ * Shorthands accepted in `fields` for groups of columns
+ */
+const FIELD_GROUPS: Record<string, SeriesColumn[]> = {
+  ohlc: ["open", "high", "low", "close"],
+  ohlcv: ["open", "high", "low", "close", "volume"],
+  ema: ["ema13", "ema21", "ema50", "ema100"],
+  bb: ["bbUpper", "bbMiddle", "bbLower"],
+  stoch: ["stochK", "stochD"],
+};
+
+const ORDER_BLOCKS_FIELD = "orderBlocks";
+
+const SERIES_FORMATS = ["json", "binary"] as const;
+export type SeriesFormat = (typeof SERIES_FORMATS)[number];
+
+const COLUMN_PRECISIONS: readonly ColumnPrecision[] = ["float64", "float32"];
+
+export interface SeriesQuery {
+  timeframe: Timeframe;
+  /**
+   * Inclusive bounds on candle time in epoch seconds (null for unbounded)
+   */
+  from: number | null;
+  to: number | null;
+  columns: SeriesColumn[];
+  orderBlocks: boolean;
+  format: SeriesFormat;
+  /**
+   * Value type of binary columns (always float64 for JSON)
+   */
+  precision: ColumnPrecision;
+}
+
+/**
+ * Order block zone without its indices, which refer to the full series
+ */
+export interface SeriesOrderBlock {
+  type: OrderBlockType;
+  startTime: number;
+  endTime: number;
+  low: number;
+  high: number;
+}
+
+/**
+ * JSON body of /api/series. Columns hold null where the value is NaN
+ * (indicator warm-up).
+ */
+export interface SeriesResponse {
+  timeframe: Timeframe;
+  time: number[];
+  columns: Partial<Record<SeriesColumn, (number | null)[]>>;
+  orderBlocks?: SeriesOrderBlock[];
+}
+
+/**
+ * Metadata of a binary /api/series frame; the columns are named as in the
+ * JSON response
+ */
+export interface SeriesFrameMeta {
+  timeframe: Timeframe;
+  orderBlocks?: SeriesOrderBlock[];
+}
+
+/**
+ * Invalid query parameters (answered with 400)
+ */
+export class SeriesQueryError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = "SeriesQueryError";
+  }
+}
+
+/**
+ * Plain number array with null in place of NaN
+ */
+function encodeColumn(values: ArrayLike<number>): (number | null)[] {
+  const column: (number | null)[] = new Array(values.length);
+  for (let i = 0; i < values.length; i++) {
+    const value = values[i];
+    column[i] = Number.isNaN(value) ? null : value;
+  }
+  return column;
+}
+
+/**
+ * Epoch seconds (at least 9 digits, so from 1973 on), or an ISO 8601
+ * date/time, including a bare year such as `2024`. Other all-digit values,
+ * such as `20240101`, are ambiguous and rejected.
+ */
+function parseTime(name: string, value: string | null): number | null {
+  if (value === null || value === "") {
+    return null;
+  }
+  if (/^\d+$/.test(value) && !/^(\d{4}|\d{9,})$/.test(value)) {
+    throw new SeriesQueryError(
+      `Ambiguous ${name} ${value}: epoch seconds have at least 9 digits; ` +
+        "use an ISO 8601 date such as 2024-01-01"
+    );
+  }
+  const time = /^\d{9,}$/.test(value)
+    ? Number(value)
+    : Math.floor(Date.parse(value) / 1000);
+  if (!Number.isFinite(time)) {
+    throw new SeriesQueryError(
+      `Invalid ${name}: expected epoch seconds or an ISO 8601 date`
+    );
+  }
+  return time;
+}
+
+/**
+ * Parse and normalize `tf`, `from`, `to`, `fields` (comma separated columns
+ * or groups; every column and the order blocks when omitted), `format`
+ * (json or binary) and `precision` (float64 or float32, binary only)
+ */
+export function parseSeriesQuery(params: URLSearchParams): SeriesQuery {
+  const timeframe = params.get("tf") ?? DEFAULT_TIMEFRAME;
+  if (!TIMEFRAMES.includes(timeframe as Timeframe)) {
+    throw new SeriesQueryError(
+      `Unknown timeframe ${timeframe}: expected one of ${TIMEFRAMES.join(", ")}`
+    );
+  }
+
+  const from = parseTime("from", params.get("from"));
+  const to = parseTime("to", params.get("to"));
+  if (from !== null && to !== null && from > to) {
+    throw new SeriesQueryError("from must not be after to");
+  }
+
+  const format = params.get("format") ?? "json";
+  if (!SERIES_FORMATS.includes(format as SeriesFormat)) {
+    throw new SeriesQueryError(
+      `Unknown format ${format}: expected one of ${SERIES_FORMATS.join(", ")}`
+    );
+  }
+  const precision = params.get("precision") ?? "float64";
+  if (!COLUMN_PRECISIONS.includes(precision as ColumnPrecision)) {
+    throw new SeriesQueryError(
+      `Unknown precision ${precision}: expected one of ${COLUMN_PRECISIONS.join(", ")}`
+    );
+  }
+
+  const fields = params.get("fields");
+  let columns = COLUMN_NAMES;
+  let orderBlocks = true;
+  if (fields !== null && fields.trim() !== "") {
+    const selected = new Set<SeriesColumn>();
+    orderBlocks = false;
+    for (const field of fields.split(",")) {
+      const name = field.trim();
+      if (name === "") {
+        continue;
+      }
+      if (name === ORDER_BLOCKS_FIELD) {
+        orderBlocks = true;
+      } else if (name in FIELD_GROUPS) {
+        FIELD_GROUPS[name].forEach((column) => selected.add(column));
+      } else if (name in SERIES_COLUMNS) {
+        selected.add(name as SeriesColumn);
+      } else {
+        throw new SeriesQueryError(`Unknown field ${name}`);
+      }
+    }
+    columns = COLUMN_NAMES.filter((column) => selected.has(column));
+  }
+
+  return {
+    timeframe: timeframe as Timeframe,
+    from,
+    to,
+    columns,
+    orderBlocks,
+    format: format as SeriesFormat,
+    precision: format === "binary" ? (precision as ColumnPrecision) : "float64",
+  };
+}
+
+/**
+ * Canonical string form of a query; equal for equivalent requests
+ */
+export function seriesQueryKey(query: SeriesQuery): string {
+  const fields = query.orderBlocks
+    ? [...query.columns, ORDER_BLOCKS_FIELD]
+    : query.columns;
+  return `${query.timeframe}|${query.from ?? ""}|${query.to ?? ""}|${fields.join(",")}|${query.format}|${query.precision}`;
+}
+
+/**
+ * Requested fields the snapshot cannot provide yet (indicators still
+ * missing), order blocks included
+ */
+export function missingSeriesFields(
+  snapshot: TimeframeSnapshot,
+  query: SeriesQuery
+): string[] {
+  const missing: string[] = query.columns.filter(
+    (column) => !SERIES_COLUMNS[column](snapshot)
+  );
+  if (query.orderBlocks && !snapshot.indicators) {
+    missing.push(ORDER_BLOCKS_FIELD);
+  }
+  return missing;
+}
+
+/**
+ * Index range `[start, end)` of the candles within `from`..`to` (inclusive),
+ * by binary search over the ascending time column
+ */
+export function seriesRange(
+  time: Uint32Array,
+  from: number | null,
+  to: number | null
+): { start: number; end: number } {
+  const lowerBound = (target: number) => {
+    let low = 0;
+    let high = time.length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      if (time[middle] < target) {
+        low = middle + 1;
+      } else {
+        high = middle;
+      }
+    }
+    return low;
+  };
+  const start = from === null ? 0 : lowerBound(from);
+  const end = to === null ? time.length : lowerBound(to + 1);
+  return { start, end: Math.max(start, end) };
+}
+
+/**
+ * Rows, columns and order blocks a query selects. Columns are views into
+ * the snapshot; ones it cannot provide are left out (see
+ * missingSeriesFields).
+ */
+function sliceSeries(snapshot: TimeframeSnapshot, query: SeriesQuery) {
+  const { time } = snapshot.data;
+  const { start, end } = seriesRange(time, query.from, query.to);
+
+  const columns: Partial<Record<SeriesColumn, Float64Array>> = {};
+  for (const column of query.columns) {
+    const values = SERIES_COLUMNS[column](snapshot);
+    if (values) {
+      columns[column] = values.subarray(start, end);
+    }
+  }
+
+  let orderBlocks: SeriesOrderBlock[] | undefined;
+  if (query.orderBlocks) {
+    // Zones overlapping the selected window
+    const windowStart = start < end ? time[start] : Infinity;
+    const windowEnd = start < end ? time[end - 1] : -Infinity;
+    orderBlocks = (snapshot.indicators?.orderBlocks ?? [])
+      .filter(
+        (zone) => zone.endTime >= windowStart && zone.startTime <= windowEnd
+      )
+      .map(({ type, startTime, endTime, low, high }) => ({
+        type,
+        startTime,
+        endTime,
+        low,
+        high,
+      }));
+  }
+
+  return { time: time.subarray(start, end), columns, orderBlocks };
+}
+
+/**
+ * JSON response body for a query
+ */
+export function selectSeries(
+  snapshot: TimeframeSnapshot,
+  query: SeriesQuery
+): SeriesResponse {
+  const { time, columns, orderBlocks } = sliceSeries(snapshot, query);
+  const response: SeriesResponse = {
+    timeframe: query.timeframe,
+    time: Array.from(time),
+    columns: {},
+  };
+  for (const [column, values] of Object.entries(columns)) {
+    response.columns[column as SeriesColumn] = encodeColumn(values);
+  }
+  if (orderBlocks) {
+    response.orderBlocks = orderBlocks;
+  }
+  return response;
+}
+
+/**
+ * Binary response body for a query, at the query's precision
+ */
+export function encodeSeriesFrame(
+  snapshot: TimeframeSnapshot,
+  query: SeriesQuery
+): Uint8Array<ArrayBuffer> {
+  const { time, columns, orderBlocks } = sliceSeries(snapshot, query);
+  const meta: SeriesFrameMeta = { timeframe: query.timeframe };
+  if (orderBlocks) {
+    meta.orderBlocks = orderBlocks;
+  }
+  return encodeColumnarFrame(
+    { time, columns: columns as Record<string, Float64Array>, meta },
+    { precision: query.precision }
+  );
+}
@@ -0,0 +1,427 @@
+/**
+ * Sliding-window primitives shared by the indicator calculations
+ *
+ * Every primitive supports `push` for a new value and `updateLast` to revise
+ * the most recent one (e.g. a still-forming candle), and produces exactly the
+ * same output as if the revised value had been pushed in the first place.
+ */
+
+// Relative size (against mean^2 per value) below which Welford's m2 may be
+// dominated by accumulated rounding error
+const WELFORD_NOISE_RATIO = 1e-8;
+
+/**
+ * Rolling mean and population variance over the last `period` values.
+ *
+ * Uses Welford's update/downdate so each push is O(1) and stays numerically
+ * stable at BTC price magnitudes, where a naive sum-of-squares would lose most
+ * of its precision to cancellation. NaN values are tracked separately: while
+ * one is inside the window the statistics report NaN, matching a plain
+ * reduce over the window.
+ */
+export class RollingStats {
+  readonly period: number;
+  private readonly window: Float64Array;
+  private head = 0;
+  private size = 0;
+  private nanCount = 0;
+  private validCount = 0;
+  private runningMean = 0;
+  private m2 = 0;
+
+  // State before the latest push, restored by updateLast
+  private previousSize = 0;
+  private previousNanCount = 0;
+  private previousValidCount = 0;
+  private previousMean = 0;
+  private previousM2 = 0;
+  private previousEvicted = 0;
+
+  constructor(period: number) {
+    this.period = Math.max(0, Math.floor(period));
+    this.window = new Float64Array(this.period);
+  }
+
+  /**
+   * Whether the window holds `period` values
+   */
+  get isFull(): boolean {
+    return this.period > 0 && this.size === this.period;
+  }
+
+  /**
+   * Mean of the window, or NaN until it is full or while it contains NaN
+   */
+  get mean(): number {
+    if (!this.isFull || this.nanCount > 0) {
+      return NaN;
+    }
+    return this.runningMean;
+  }
+
+  /**
+   * Population variance of the window, or NaN until it is full or while it
+   * contains NaN
+   */
+  get variance(): number {
+    if (!this.isFull || this.nanCount > 0) {
+      return NaN;
+    }
+    // On (nearly) flat windows the downdates leave rounding residue of the
+    // same order as the true m2, which the square root in Bollinger Bands
+    // would amplify, so fall back to an exact two-pass sum there
+    const noiseFloor =
+      this.runningMean * this.runningMean * this.period * WELFORD_NOISE_RATIO;
+    const m2 = this.m2 > noiseFloor ? this.m2 : this.exactM2();
+    return m2 / this.period;
+  }
+
+  /**
+   * Append a value, evicting the oldest one once the window is full
+   */
+  push(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+
+    this.previousSize = this.size;
+    this.previousNanCount = this.nanCount;
+    this.previousValidCount = this.validCount;
+    this.previousMean = this.runningMean;
+    this.previousM2 = this.m2;
+    this.previousEvicted = this.window[this.head];
+
+    if (this.size === this.period) {
+      this.remove(this.window[this.head]);
+    } else {
+      this.size += 1;
+    }
+
+    this.window[this.head] = value;
+    this.head = this.head + 1 === this.period ? 0 : this.head + 1;
+    this.add(value);
+  }
+
+  /**
+   * Replace the most recently pushed value
+   */
+  updateLast(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+    if (this.size === 0) {
+      this.push(value);
+      return;
+    }
+
+    this.head = (this.head === 0 ? this.period : this.head) - 1;
+    this.window[this.head] = this.previousEvicted;
+    this.size = this.previousSize;
+    this.nanCount = this.previousNanCount;
+    this.validCount = this.previousValidCount;
+    this.runningMean = this.previousMean;
+    this.m2 = this.previousM2;
+    this.push(value);
+  }
+
+  /**
+   * Sum of squared deviations from the mean, computed over the full window
+   * in push order
+   */
+  private exactM2(): number {
+    let sum = 0;
+    for (let i = 0, slot = this.head; i < this.period; i++) {
+      sum += this.window[slot];
+      slot = slot + 1 === this.period ? 0 : slot + 1;
+    }
+    const mean = sum / this.period;
+    let m2 = 0;
+    for (let i = 0, slot = this.head; i < this.period; i++) {
+      const deviation = this.window[slot] - mean;
+      m2 += deviation * deviation;
+      slot = slot + 1 === this.period ? 0 : slot + 1;
+    }
+    return m2;
+  }
+
+  private add(value: number): void {
+    if (Number.isNaN(value)) {
+      this.nanCount += 1;
+      return;
+    }
+    this.validCount += 1;
+    const delta = value - this.runningMean;
+    this.runningMean += delta / this.validCount;
+    this.m2 += delta * (value - this.runningMean);
+  }
+
+  private remove(value: number): void {
+    if (Number.isNaN(value)) {
+      this.nanCount -= 1;
+      return;
+    }
+    this.validCount -= 1;
+    if (this.validCount === 0) {
+      this.runningMean = 0;
+      this.m2 = 0;
+      return;
+    }
+    const delta = value - this.runningMean;
+    this.runningMean -= delta / this.validCount;
+    this.m2 -= delta * (value - this.runningMean);
+  }
+}
+
+/**
+ * Rolling mean over the last `period` values that skips NaN entries, matching
+ * a `slice(...).filter((v) => !isNaN(v))` average but with a running sum.
+ * The mean is NaN until `period` values have been pushed, and also whenever
+ * the window holds no valid values.
+ */
+export class RollingMeanSkipNaN {
+  readonly period: number;
+  private readonly window: Float64Array;
+  private slot = 0;
+  private count = 0;
+  private sum = 0;
+  private validCount = 0;
+
+  // State before the latest push, restored by updateLast
+  private previousSum = 0;
+  private previousValidCount = 0;
+  private previousEvicted = 0;
+
+  constructor(period: number) {
+    this.period = Math.max(0, Math.floor(period));
+    this.window = new Float64Array(this.period);
+  }
+
+  /**
+   * Mean of the valid values in the window
+   */
+  get mean(): number {
+    if (this.period === 0 || this.count < this.period) {
+      return NaN;
+    }
+    return this.sum / this.validCount;
+  }
+
+  /**
+   * Append a value, evicting the oldest one once the window is full
+   */
+  push(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+
+    const slot = this.slot;
+    this.previousSum = this.sum;
+    this.previousValidCount = this.validCount;
+    this.previousEvicted = this.window[slot];
+
+    if (!Number.isNaN(value)) {
+      this.sum += value;
+      this.validCount += 1;
+    }
+
+    if (this.count >= this.period) {
+      const expired = this.window[slot];
+      if (!Number.isNaN(expired)) {
+        this.sum -= expired;
+        this.validCount -= 1;
+        if (this.validCount === 0) {
+          // Reset so rounding residue never leaks into the next window
+          this.sum = 0;
+        }
+      }
+    }
+
+    this.window[slot] = value;
+    this.slot = slot + 1 === this.period ? 0 : slot + 1;
+    this.count += 1;
+  }
+
+  /**
+   * Replace the most recently pushed value
+   */
+  updateLast(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+    if (this.count === 0) {
+      this.push(value);
+      return;
+    }
+
+    this.count -= 1;
+    this.slot = (this.slot === 0 ? this.period : this.slot) - 1;
+    this.window[this.slot] = this.previousEvicted;
+    this.sum = this.previousSum;
+    this.validCount = this.previousValidCount;
+    this.push(value);
+  }
+}
+
+export type ExtremumKind = "max" | "min";
+
+/**
+ * Sliding-window maximum or minimum over the last `period` values.
+ *
+ * Backed by a monotonic deque held in fixed ring buffers, so each push is
+ * amortized O(1) with no allocation. Unlike `Math.max(...slice)` it has no
+ * argument-count limit on large periods. A NaN inside the window makes the
+ * extremum NaN, matching `Math.max`/`Math.min`.
+ */
+export class SlidingExtremum {
+  readonly period: number;
+  readonly kind: ExtremumKind;
+  // Values are stored multiplied by `sign` so the deque always tracks a max
+  private readonly sign: number;
+  private readonly window: Float64Array;
+  private readonly dequeIndex: Float64Array;
+  private readonly dequeValue: Float64Array;
+  private dequeHead = 0;
+  private dequeSize = 0;
+  private slot = 0;
+  private count = 0;
+  private nanCount = 0;
+
+  constructor(period: number, kind: ExtremumKind) {
+    this.period = Math.max(0, Math.floor(period));
+    this.kind = kind;
+    this.sign = kind === "max" ? 1 : -1;
+    this.window = new Float64Array(this.period);
+    this.dequeIndex = new Float64Array(this.period);
+    this.dequeValue = new Float64Array(this.period);
+  }
+
+  /**
+   * Whether the window holds `period` values
+   */
+  get isFull(): boolean {
+    return this.period > 0 && this.count >= this.period;
+  }
+
+  /**
+   * Extremum of the values currently in the window (which may be partial),
+   * NaN if the window is empty or contains NaN
+   */
+  get value(): number {
+    if (this.dequeSize === 0 || this.nanCount > 0) {
+      return NaN;
+    }
+    return this.sign * this.dequeValue[this.dequeHead];
+  }
+
+  /**
+   * Append a value, evicting the oldest one once the window is full
+   */
+  push(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+
+    const index = this.count;
+    const slot = this.slot;
+    if (index >= this.period && Number.isNaN(this.window[slot])) {
+      this.nanCount -= 1;
+    }
+    this.window[slot] = value;
+    this.slot = slot + 1 === this.period ? 0 : slot + 1;
+    this.count += 1;
+
+    // Expire the front once it falls out of the window (at most one entry)
+    if (
+      this.dequeSize > 0 &&
+      this.dequeIndex[this.dequeHead] <= index - this.period
+    ) {
+      this.dequeHead =
+        this.dequeHead + 1 === this.period ? 0 : this.dequeHead + 1;
+      this.dequeSize -= 1;
+    }
+
+    if (Number.isNaN(value)) {
+      this.nanCount += 1;
+    } else {
+      this.pushBack(index, value);
+    }
+  }
+
+  /**
+   * Replace the most recently pushed value.
+   *
+   * The deque is a pure function of the window contents, so it is rebuilt
+   * from the ring buffer in O(period).
+   */
+  updateLast(value: number): void {
+    if (this.period === 0) {
+      return;
+    }
+    if (this.count === 0) {
+      this.push(value);
+      return;
+    }
+
+    const lastIndex = this.count - 1;
+    const slot = lastIndex % this.period;
+    if (Number.isNaN(this.window[slot])) {
+      this.nanCount -= 1;
+    }
+    if (Number.isNaN(value)) {
+      this.nanCount += 1;
+    }
+    this.window[slot] = value;
+
+    this.dequeHead = 0;
+    this.dequeSize = 0;
+    for (
+      let index = Math.max(0, this.count - this.period);
+      index <= lastIndex;
+      index += 1
+    ) {
+      const windowValue = this.window[index % this.period];
+      if (!Number.isNaN(windowValue)) {
+        this.pushBack(index, windowValue);
+      }
+    }
+  }
+
+  /**
+   * Independent copy of the current window state
+   */
+  clone(): SlidingExtremum {
+    const copy = new SlidingExtremum(this.period, this.kind);
+    copy.window.set(this.window);
+    copy.dequeIndex.set(this.dequeIndex);
+    copy.dequeValue.set(this.dequeValue);
+    copy.dequeHead = this.dequeHead;
+    copy.dequeSize = this.dequeSize;
+    copy.slot = this.slot;
+    copy.count = this.count;
+    copy.nanCount = this.nanCount;
+    return copy;
+  }
+
+  private pushBack(index: number, value: number): void {
+    const signed = this.sign * value;
+    // Ring position one past the back of the deque
+    let tail = this.dequeHead + this.dequeSize;
+    if (tail >= this.period) {
+      tail -= this.period;
+    }
+
+    // Drop values the new one dominates; they can never be the extremum again
+    while (this.dequeSize > 0) {
+      const back = tail === 0 ? this.period - 1 : tail - 1;
+      if (this.dequeValue[back] > signed) {
+        break;
+      }
+      tail = back;
+      this.dequeSize -= 1;
+    }
+
+    this.dequeIndex[tail] = index;
+    this.dequeValue[tail] = signed;
+    this.dequeSize += 1;
+  }
+}
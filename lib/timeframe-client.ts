@@ -0,0 +1,84 @@
+/**
+ * Client-side loading of timeframes and overlays not embedded in the page
+ *
+ * Each timeframe and overlay is requested at most once per page load and
+ * shared by every caller, so hovering a tab (prefetch) and then opening it
+ * costs a single request per resource. The promises are stable, so
+ * components can read them with `use` inside a Suspense boundary. A failed
+ * timeframe stays failed until it is retried; a failed overlay resolves to
+ * null and the chart is drawn without it.
+ */
+
+import { Timeframe } from "@/lib/constants";
+import {
+  CHART_OVERLAYS,
+  ChartOverlay,
+  ChartOverlays,
+  decodeChartOverlay,
+  decodeTimeframeChart,
+  TimeframeChart,
+} from "@/lib/timeframe-payload";
+
+const requests = new Map<Timeframe, Promise<TimeframeChart>>();
+const overlayRequests = new Map<string, Promise<unknown>>();
+
+async function fetchFrame(url: string): Promise<ArrayBuffer> {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(
+      `Failed to load ${url}: ${response.status} ${response.statusText}`
+    );
+  }
+  return response.arrayBuffer();
+}
+
+export function loadTimeframe(
+  timeframe: Timeframe
+): Promise<TimeframeChart> {
+  let request = requests.get(timeframe);
+  if (!request) {
+    request = fetchFrame(`/api/timeframes/${timeframe}`).then(
+      decodeTimeframeChart
+    );
+    requests.set(timeframe, request);
+  }
+  return request;
+}
+
+/**
+ * Forget a failed timeframe so the next load requests it again
+ */
+export function retryTimeframe(timeframe: Timeframe): void {
+  requests.delete(timeframe);
+}
+
+export function loadOverlay<K extends ChartOverlay>(
+  overlay: K,
+  timeframe: Timeframe
+): Promise<ChartOverlays[K] | null> {
+  const url = `/api/timeframes/${timeframe}/${overlay}`;
+  let request = overlayRequests.get(url);
+  if (!request) {
+    request = fetchFrame(url)
+      .then((bytes) => decodeChartOverlay(overlay, bytes))
+      .catch((error) => {
+        console.error(`Failed to load ${overlay} for ${timeframe}:`, error);
+        return null;
+      });
+    overlayRequests.set(url, request);
+  }
+  return request as Promise<ChartOverlays[K] | null>;
+}
+
+/**
+ * Start loading a timeframe and its overlays in the background (e.g. when
+ * its tab is hovered)
+ */
+export function prefetchTimeframe(timeframe: Timeframe): void {
+  loadTimeframe(timeframe).catch(() => {
+    // Reported when the tab is actually opened
+  });
+  for (const overlay of CHART_OVERLAYS) {
+    loadOverlay(overlay, timeframe);
+  }
+}
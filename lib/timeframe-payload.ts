@@ -0,0 +1,265 @@
+/**
+ * Per-timeframe chart data and its wire encoding
+ *
+ * The server turns each timeframe's candles and indicators into chart-ready
+ * series once per snapshot, and each overlay source (halving dates, Fear and
+ * Greed readings) into that timeframe's overlay once per pair of snapshots
+ * (see lib/market-data.ts). The page streams the default timeframe's chart
+ * and overlays as they become ready; the others are fetched from
+ * /api/timeframes/[timeframe] and /api/timeframes/[timeframe]/[overlay] as
+ * binary columnar frames (lib/columnar-codec.ts) with Float32 values, which
+ * are precise enough to draw and half the size.
+ *
+ * In the frame every line is a column aligned to the candle times, NaN where
+ * the line has no point, and lines with the same value at every candle
+ * (reference levels) travel as that single value. Decoding only rebuilds the
+ * point objects `setData` expects.
+ */
+
+import { ChartSeries } from "@/lib/chart-series";
+import { decodeColumnarFrame, encodeColumnarFrame } from "@/lib/columnar-codec";
+import { IndicatorSet, OrderBlockZone } from "@/lib/indicators";
+import { OHLCVSeries } from "@/lib/ohlcv";
+import { LineData, SeriesMarker, Time } from "lightweight-charts";
+
+export interface TimeframeSnapshot {
+  data: OHLCVSeries;
+  indicators: IndicatorSet | null;
+}
+
+/**
+ * What the chart for one timeframe draws
+ */
+export interface TimeframeChart {
+  series: ChartSeries;
+  orderBlocks: OrderBlockZone[];
+}
+
+/**
+ * What each overlay source adds to a timeframe's chart. Overlays are named
+ * after their market data sources.
+ */
+export interface ChartOverlays {
+  /**
+   * Halving and cycle signal markers, sorted by time
+   */
+  halvings: SeriesMarker<Time>[];
+  fearGreed: LineData<Time>[];
+}
+
+export type ChartOverlay = keyof ChartOverlays;
+
+export const CHART_OVERLAYS: ChartOverlay[] = ["halvings", "fearGreed"];
+
+/**
+ * One pending overlay per source, null once it turns out to be unavailable
+ */
+export type PendingChartOverlays = {
+  [K in ChartOverlay]: Promise<ChartOverlays[K] | null>;
+};
+
+type LineKey = Exclude<keyof ChartSeries, "candlestick" | "volume">;
+
+// Listed as an object so a line added to ChartSeries fails to compile here
+const LINE_KEYS = Object.keys({
+  ema13: true,
+  ema21: true,
+  ema50: true,
+  ema100: true,
+  bbUpper: true,
+  bbMiddle: true,
+  bbLower: true,
+  bbUpperLog: true,
+  bbMiddleLog: true,
+  bbLowerLog: true,
+  stochasticK: true,
+  stochasticD: true,
+  stochasticOverbought: true,
+  stochasticOversold: true,
+  fearGreedExtremeFear: true,
+  fearGreedFear: true,
+  fearGreedNeutral: true,
+  fearGreedGreed: true,
+  fearGreedExtremeGreed: true,
+} satisfies Record<LineKey, true>) as LineKey[];
+
+interface TimeframeChartMeta {
+  /**
+   * Lines with one value at every candle
+   */
+  constantLines: Partial<Record<LineKey, number>>;
+  /**
+   * Distinct volume bar colors, indexed by the volumeColor column
+   */
+  volumeColors: string[];
+  orderBlocks: OrderBlockZone[];
+}
+
+/**
+ * Line values aligned to the candle times (NaN where the line has no point),
+ * or the value itself when it is the same at every candle
+ */
+function alignLine(
+  points: LineData<Time>[],
+  time: Uint32Array
+): Float64Array | number {
+  if (
+    points.length === time.length &&
+    points.length > 0 &&
+    points.every((point) => point.value === points[0].value)
+  ) {
+    return points[0].value;
+  }
+
+  const values = new Float64Array(time.length).fill(NaN);
+  // Points are a time-ordered subset of the candles
+  let row = 0;
+  for (const point of points) {
+    while (row < time.length && time[row] < (point.time as number)) {
+      row++;
+    }
+    if (row < time.length) {
+      values[row] = point.value;
+    }
+  }
+  return values;
+}
+
+export function encodeTimeframeChart({
+  series,
+  orderBlocks,
+}: TimeframeChart): Uint8Array<ArrayBuffer> {
+  const meta: TimeframeChartMeta = {
+    constantLines: {},
+    volumeColors: [],
+    orderBlocks,
+  };
+  const { candlestick, volume } = series;
+  const rows = candlestick.length;
+  const time = new Uint32Array(rows);
+  const columns: Record<string, Float64Array> = {
+    open: new Float64Array(rows),
+    high: new Float64Array(rows),
+    low: new Float64Array(rows),
+    close: new Float64Array(rows),
+    volume: new Float64Array(rows),
+    volumeColor: new Float64Array(rows),
+  };
+  const colorIndex = new Map<string, number>();
+  for (let i = 0; i < rows; i++) {
+    const candle = candlestick[i];
+    time[i] = candle.time as number;
+    columns.open[i] = candle.open;
+    columns.high[i] = candle.high;
+    columns.low[i] = candle.low;
+    columns.close[i] = candle.close;
+    columns.volume[i] = volume[i].value;
+
+    const color = volume[i].color ?? "";
+    let index = colorIndex.get(color);
+    if (index === undefined) {
+      index = meta.volumeColors.length;
+      colorIndex.set(color, index);
+      meta.volumeColors.push(color);
+    }
+    columns.volumeColor[i] = index;
+  }
+
+  for (const key of LINE_KEYS) {
+    const aligned = alignLine(series[key], time);
+    if (typeof aligned === "number") {
+      meta.constantLines[key] = aligned;
+    } else {
+      columns[key] = aligned;
+    }
+  }
+
+  return encodeColumnarFrame({ time, columns, meta }, { precision: "float32" });
+}
+
+export function decodeTimeframeChart(
+  bytes: ArrayBuffer | Uint8Array
+): TimeframeChart {
+  const { time, columns, meta } = decodeColumnarFrame(bytes);
+  const { constantLines, volumeColors, orderBlocks } =
+    meta as TimeframeChartMeta;
+
+  const rows = time.length;
+  const candlestick: ChartSeries["candlestick"] = new Array(rows);
+  const volume: ChartSeries["volume"] = new Array(rows);
+  for (let i = 0; i < rows; i++) {
+    const t = time[i] as Time;
+    candlestick[i] = {
+      time: t,
+      open: columns.open[i],
+      high: columns.high[i],
+      low: columns.low[i],
+      close: columns.close[i],
+    };
+    const color = volumeColors[columns.volumeColor[i]];
+    volume[i] = color
+      ? { time: t, value: columns.volume[i], color }
+      : { time: t, value: columns.volume[i] };
+  }
+
+  const series = { candlestick, volume } as ChartSeries;
+  for (const key of LINE_KEYS) {
+    const constant = constantLines[key];
+    const values = columns[key];
+    const points: LineData<Time>[] = [];
+    for (let i = 0; i < rows; i++) {
+      const value = constant ?? values[i];
+      if (!Number.isNaN(value)) {
+        points.push({ time: time[i] as Time, value });
+      }
+    }
+    series[key] = points;
+  }
+
+  return { series, orderBlocks };
+}
+
+/**
+ * Markers travel as frame metadata, the Fear and Greed line as a value
+ * column with one row per point
+ */
+export function encodeChartOverlay<K extends ChartOverlay>(
+  overlay: K,
+  value: ChartOverlays[K]
+): Uint8Array<ArrayBuffer> {
+  if (overlay === "halvings") {
+    return encodeColumnarFrame({
+      time: new Uint32Array(0),
+      columns: {},
+      meta: value,
+    });
+  }
+
+  const points = value as ChartOverlays["fearGreed"];
+  const time = new Uint32Array(points.length);
+  const values = new Float64Array(points.length);
+  points.forEach((point, i) => {
+    time[i] = point.time as number;
+    values[i] = point.value;
+  });
+  return encodeColumnarFrame(
+    { time, columns: { value: values } },
+    { precision: "float32" }
+  );
+}
+
+export function decodeChartOverlay<K extends ChartOverlay>(
+  overlay: K,
+  bytes: ArrayBuffer | Uint8Array
+): ChartOverlays[K] {
+  const { time, columns, meta } = decodeColumnarFrame(bytes);
+  if (overlay === "halvings") {
+    return meta as ChartOverlays[K];
+  }
+
+  const points: LineData<Time>[] = new Array(time.length);
+  for (let i = 0; i < time.length; i++) {
+    points[i] = { time: time[i] as Time, value: columns.value[i] };
+  }
+  return points as ChartOverlays[K];
+}
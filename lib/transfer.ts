@@ -0,0 +1,30 @@
+/**
+ * Helpers for moving typed-array results between threads without copying
+ */
+
+/**
+ * Every distinct ArrayBuffer reachable from `values`, for use as a
+ * postMessage transfer list. Views that share a buffer list it once.
+ */
+export function transferListFor(...values: unknown[]): ArrayBuffer[] {
+  const buffers = new Set<ArrayBuffer>();
+
+  const visit = (current: unknown) => {
+    if (ArrayBuffer.isView(current)) {
+      if (current.buffer instanceof ArrayBuffer) {
+        buffers.add(current.buffer);
+      }
+      return;
+    }
+    if (Array.isArray(current)) {
+      current.forEach(visit);
+      return;
+    }
+    if (current !== null && typeof current === "object") {
+      Object.values(current).forEach(visit);
+    }
+  };
+
+  values.forEach(visit);
+  return [...buffers];
+}
@@ -0,0 +1,568 @@
+/**
+ * Shared HTTP client for upstream data sources (Yahoo Finance, Mempool.space,
+ * Alternative.me)
+ *
+ * - One keep-alive agent per host, so hourly regenerations reuse sockets
+ *   instead of paying a TLS handshake per request
+ * - A deadline per call that covers every attempt
+ * - Jittered exponential retry on network errors, timeouts, 408/425/429 and
+ *   5xx responses, never sooner than Retry-After (and not at all when it
+ *   asks for longer than the retry cap or the deadline allows)
+ * - Single-flight: identical GETs already in flight share one request
+ * - Per-host request, retry and latency metrics
+ *
+ * Responses are fully buffered and expose the small subset of the fetch
+ * Response API the fetchers use (`ok`, `status`, `statusText`, `text()`,
+ * `json()`). `stream()` instead feeds a successful body to a consumer (such as
+ * an incremental parser) chunk by chunk as it is decompressed.
+ *
+ * Upstream origins can be redirected (`origins`, or UPSTREAM_ORIGINS for the
+ * process-wide client), so the fetchers can run against a local stand-in.
+ */
+
+import http from "node:http";
+import https from "node:https";
+import { Readable, Transform } from "node:stream";
+import zlib from "node:zlib";
+
+const DEFAULT_USER_AGENT = "Mozilla/5.0";
+const DEFAULT_DEADLINE_MS = 15_000;
+const DEFAULT_RETRIES = 3;
+const DEFAULT_RETRY_BASE_MS = 250;
+const DEFAULT_RETRY_MAX_MS = 4_000;
+const DEFAULT_MAX_SOCKETS_PER_HOST = 8;
+// Latency samples kept per host for percentiles
+const LATENCY_WINDOW = 256;
+
+const RETRYABLE_STATUSES = new Set([408, 425, 429, 500, 502, 503, 504]);
+
+export interface UpstreamClientOptions {
+  userAgent?: string;
+  /**
+   * Default time budget for a call, including retries
+   */
+  deadlineMs?: number;
+  /**
+   * Default number of retries after the first attempt
+   */
+  retries?: number;
+  retryBaseMs?: number;
+  retryMaxMs?: number;
+  maxSocketsPerHost?: number;
+  /**
+   * Origins to send requests to instead of the ones in the URL, e.g.
+   * `{ "https://mempool.space": "http://127.0.0.1:8080" }`. Path and query
+   * are kept.
+   */
+  origins?: Record<string, string>;
+}
+
+export interface UpstreamRequestOptions {
+  headers?: Record<string, string>;
+  deadlineMs?: number;
+  retries?: number;
+}
+
+/**
+ * Receives a response body chunk by chunk, e.g. YahooChartParser
+ */
+export interface UpstreamBodyConsumer<T> {
+  write(chunk: Uint8Array): void;
+  end(): T;
+}
+
+export interface UpstreamHostMetrics {
+  requests: number;
+  attempts: number;
+  retries: number;
+  failures: number;
+  coalesced: number;
+  bytes: number;
+  latencyP50Ms: number;
+  latencyP95Ms: number;
+  latencyMaxMs: number;
+}
+
+/**
+ * Thrown when a call fails for good: network error, deadline exceeded, or a
+ * retryable status that persisted through every retry
+ */
+export class UpstreamError extends Error {
+  readonly url: string;
+  readonly status: number | null;
+
+  constructor(message: string, url: string, status: number | null = null) {
+    super(message);
+    this.name = "UpstreamError";
+    this.url = url;
+    this.status = status;
+  }
+}
+
+/**
+ * Upstream response, buffered or consumed as it streamed in
+ */
+export class UpstreamResponse<T = undefined> {
+  readonly url: string;
+  readonly status: number;
+  readonly statusText: string;
+  readonly headers: http.IncomingHttpHeaders;
+  /**
+   * Decoded body; empty when it went to a stream() consumer
+   */
+  readonly body: Buffer;
+  /**
+   * What the stream() consumer returned, for successful responses
+   */
+  readonly value: T | undefined;
+
+  constructor(
+    url: string,
+    status: number,
+    statusText: string,
+    headers: http.IncomingHttpHeaders,
+    body: Buffer,
+    value?: T
+  ) {
+    this.url = url;
+    this.status = status;
+    this.statusText = statusText;
+    this.headers = headers;
+    this.body = body;
+    this.value = value;
+  }
+
+  get ok(): boolean {
+    return this.status >= 200 && this.status < 300;
+  }
+
+  async text(): Promise<string> {
+    return this.body.toString("utf8");
+  }
+
+  async json<T = unknown>(): Promise<T> {
+    return JSON.parse(this.body.toString("utf8"));
+  }
+}
+
+/**
+ * An error thrown by a stream() consumer. The response arrived and its
+ * content is the problem, so the call fails without a retry.
+ */
+class ConsumerError {
+  readonly error: unknown;
+
+  constructor(error: unknown) {
+    this.error = error;
+  }
+}
+
+interface HostState {
+  agent: http.Agent;
+  requests: number;
+  attempts: number;
+  retries: number;
+  failures: number;
+  coalesced: number;
+  bytes: number;
+  latencies: Float64Array;
+  latencyCount: number;
+}
+
+function percentile(sorted: Float64Array, fraction: number): number {
+  if (sorted.length === 0) {
+    return 0;
+  }
+  const index = Math.min(
+    sorted.length - 1,
+    Math.max(0, Math.ceil(fraction * sorted.length) - 1)
+  );
+  return sorted[index];
+}
+
+/**
+ * Stream decompressing a body with the given Content-Encoding, or null when
+ * it is not compressed
+ */
+function createDecoder(encoding: string | undefined): Transform | null {
+  switch (encoding) {
+    case "gzip":
+      return zlib.createGunzip();
+    case "deflate":
+      return zlib.createInflate();
+    case "br":
+      return zlib.createBrotliDecompress();
+    default:
+      return null;
+  }
+}
+
+/**
+ * Retry-After in milliseconds, from delay-seconds or an HTTP date, or null
+ * when absent or malformed
+ */
+function parseRetryAfter(value: string | undefined): number | null {
+  if (!value) {
+    return null;
+  }
+  const seconds = Number(value);
+  if (Number.isFinite(seconds)) {
+    return Math.max(0, seconds * 1000);
+  }
+  const date = Date.parse(value);
+  return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
+}
+
+/**
+ * Delay before retry number `retry` (1-based): full jitter over an
+ * exponentially growing cap, but never less than the server's Retry-After.
+ * Infinity when Retry-After is longer than `maxMs`, so the call gives up
+ * rather than retrying before the server asked.
+ */
+function retryDelay(
+  retry: number,
+  baseMs: number,
+  maxMs: number,
+  retryAfter: string | undefined
+): number {
+  const jitter = Math.random() * Math.min(maxMs, baseMs * 2 ** (retry - 1));
+  const retryAfterMs = parseRetryAfter(retryAfter);
+  if (retryAfterMs === null) {
+    return jitter;
+  }
+  return retryAfterMs > maxMs ? Infinity : Math.max(jitter, retryAfterMs);
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+export class UpstreamClient {
+  private readonly userAgent: string;
+  private readonly deadlineMs: number;
+  private readonly retries: number;
+  private readonly retryBaseMs: number;
+  private readonly retryMaxMs: number;
+  private readonly maxSocketsPerHost: number;
+  private readonly origins: Record<string, string>;
+  private readonly hosts = new Map<string, HostState>();
+  private readonly inFlight = new Map<string, Promise<UpstreamResponse>>();
+
+  constructor(options: UpstreamClientOptions = {}) {
+    this.userAgent = options.userAgent ?? DEFAULT_USER_AGENT;
+    this.deadlineMs = options.deadlineMs ?? DEFAULT_DEADLINE_MS;
+    this.retries = options.retries ?? DEFAULT_RETRIES;
+    this.retryBaseMs = options.retryBaseMs ?? DEFAULT_RETRY_BASE_MS;
+    this.retryMaxMs = options.retryMaxMs ?? DEFAULT_RETRY_MAX_MS;
+    this.maxSocketsPerHost =
+      options.maxSocketsPerHost ?? DEFAULT_MAX_SOCKETS_PER_HOST;
+    this.origins = options.origins ?? {};
+  }
+
+  /**
+   * GET a URL. Concurrent calls for the same URL and headers share one
+   * request. Non-retryable error statuses (e.g. 404) resolve normally so
+   * callers can inspect them.
+   */
+  get(
+    url: string,
+    options: UpstreamRequestOptions = {}
+  ): Promise<UpstreamResponse> {
+    const parsed = this.resolve(url);
+    const host = this.hostState(parsed);
+    host.requests += 1;
+
+    const key = `${url}\u0000${JSON.stringify(options.headers ?? {})}`;
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      host.coalesced += 1;
+      return pending;
+    }
+
+    const request = this.requestWithRetry<undefined>(
+      parsed,
+      host,
+      options,
+      null
+    ).finally(() => {
+      this.inFlight.delete(key);
+    });
+    this.inFlight.set(key, request);
+    return request;
+  }
+
+  /**
+   * GET a URL and feed a successful (2xx) body to a consumer as each chunk
+   * is decompressed, without buffering it; the response's `value` is what
+   * the consumer's `end()` returned. Every attempt gets a fresh consumer from
+   * `createConsumer`, so a retry after a body broken off part way starts
+   * over. Other statuses are buffered as in get(). Errors thrown by the
+   * consumer fail the call without a retry. Not coalesced, since each
+   * caller's consumer has to see the body.
+   */
+  stream<T>(
+    url: string,
+    createConsumer: () => UpstreamBodyConsumer<T>,
+    options: UpstreamRequestOptions = {}
+  ): Promise<UpstreamResponse<T>> {
+    const parsed = this.resolve(url);
+    const host = this.hostState(parsed);
+    host.requests += 1;
+    return this.requestWithRetry(parsed, host, options, createConsumer);
+  }
+
+  /**
+   * Snapshot of the metrics for every host contacted so far
+   */
+  get metrics(): Record<string, UpstreamHostMetrics> {
+    const snapshot: Record<string, UpstreamHostMetrics> = {};
+    for (const [name, host] of this.hosts) {
+      const count = Math.min(host.latencyCount, LATENCY_WINDOW);
+      const sorted = host.latencies.slice(0, count).sort();
+      snapshot[name] = {
+        requests: host.requests,
+        attempts: host.attempts,
+        retries: host.retries,
+        failures: host.failures,
+        coalesced: host.coalesced,
+        bytes: host.bytes,
+        latencyP50Ms: percentile(sorted, 0.5),
+        latencyP95Ms: percentile(sorted, 0.95),
+        latencyMaxMs: count > 0 ? sorted[count - 1] : 0,
+      };
+    }
+    return snapshot;
+  }
+
+  /**
+   * Close every pooled socket
+   */
+  destroy(): void {
+    for (const host of this.hosts.values()) {
+      host.agent.destroy();
+    }
+    this.hosts.clear();
+  }
+
+  /**
+   * Parse a URL, applying the origin redirections
+   */
+  private resolve(url: string): URL {
+    const parsed = new URL(url);
+    const origin = this.origins[parsed.origin];
+    return origin
+      ? new URL(`${parsed.pathname}${parsed.search}`, origin)
+      : parsed;
+  }
+
+  private hostState(url: URL): HostState {
+    let host = this.hosts.get(url.host);
+    if (!host) {
+      const agentOptions = {
+        keepAlive: true,
+        maxSockets: this.maxSocketsPerHost,
+      };
+      host = {
+        agent:
+          url.protocol === "https:"
+            ? new https.Agent(agentOptions)
+            : new http.Agent(agentOptions),
+        requests: 0,
+        attempts: 0,
+        retries: 0,
+        failures: 0,
+        coalesced: 0,
+        bytes: 0,
+        latencies: new Float64Array(LATENCY_WINDOW),
+        latencyCount: 0,
+      };
+      this.hosts.set(url.host, host);
+    }
+    return host;
+  }
+
+  private async requestWithRetry<T>(
+    url: URL,
+    host: HostState,
+    options: UpstreamRequestOptions,
+    createConsumer: (() => UpstreamBodyConsumer<T>) | null
+  ): Promise<UpstreamResponse<T>> {
+    const deadline = Date.now() + (options.deadlineMs ?? this.deadlineMs);
+    const maxRetries = options.retries ?? this.retries;
+
+    for (let attempt = 0; ; attempt++) {
+      const remaining = deadline - Date.now();
+      let failure: UpstreamError;
+      let retryAfter: string | undefined;
+
+      try {
+        const response = await this.attempt(
+          url,
+          host,
+          options,
+          createConsumer,
+          remaining
+        );
+        if (!RETRYABLE_STATUSES.has(response.status)) {
+          return response;
+        }
+        retryAfter = response.headers["retry-after"] as string | undefined;
+        failure = new UpstreamError(
+          `${url.host} responded ${response.status} ${response.statusText}`,
+          url.href,
+          response.status
+        );
+      } catch (error) {
+        if (error instanceof ConsumerError) {
+          host.failures += 1;
+          throw error.error;
+        }
+        failure =
+          error instanceof UpstreamError
+            ? error
+            : new UpstreamError(
+                `${url.host} request failed: ${(error as Error).message}`,
+                url.href
+              );
+      }
+
+      const delay = retryDelay(
+        attempt + 1,
+        this.retryBaseMs,
+        this.retryMaxMs,
+        retryAfter
+      );
+      // Also gives up when Retry-After is beyond the cap (an infinite delay)
+      if (attempt >= maxRetries || Date.now() + delay >= deadline) {
+        host.failures += 1;
+        throw failure;
+      }
+
+      host.retries += 1;
+      console.warn(
+        `[${new Date().toISOString()}] 🔁 Retrying ${url.host}${url.pathname} in ${Math.round(delay)}ms (${failure.message})`
+      );
+      await sleep(delay);
+    }
+  }
+
+  private attempt<T>(
+    url: URL,
+    host: HostState,
+    options: UpstreamRequestOptions,
+    createConsumer: (() => UpstreamBodyConsumer<T>) | null,
+    timeoutMs: number
+  ): Promise<UpstreamResponse<T>> {
+    host.attempts += 1;
+    const started = performance.now();
+    const transport = url.protocol === "https:" ? https : http;
+
+    return new Promise((resolve, reject) => {
+      if (timeoutMs <= 0) {
+        reject(new UpstreamError(`${url.host} deadline exceeded`, url.href));
+        return;
+      }
+
+      const request = transport.get(
+        url,
+        {
+          agent: host.agent,
+          headers: {
+            "User-Agent": this.userAgent,
+            "Accept-Encoding": "gzip, deflate, br",
+            ...options.headers,
+          },
+        },
+        (response) => {
+          const status = response.statusCode ?? 0;
+          const consumer =
+            createConsumer && status >= 200 && status < 300
+              ? createConsumer()
+              : null;
+          const chunks: Buffer[] = [];
+          let settled = false;
+          const fail = (error: unknown) => {
+            if (!settled) {
+              settled = true;
+              clearTimeout(timer);
+              request.destroy();
+              reject(error);
+            }
+          };
+
+          const decoder = createDecoder(response.headers["content-encoding"]);
+          const body: Readable = decoder ? response.pipe(decoder) : response;
+          response.on("data", (chunk: Buffer) => {
+            host.bytes += chunk.length;
+          });
+          response.on("error", fail);
+          decoder?.on("error", fail);
+          body.on("data", (chunk: Buffer) => {
+            if (settled) {
+              return;
+            }
+            if (!consumer) {
+              chunks.push(chunk);
+              return;
+            }
+            try {
+              consumer.write(chunk);
+            } catch (error) {
+              fail(new ConsumerError(error));
+            }
+          });
+          body.on("end", () => {
+            if (settled) {
+              return;
+            }
+            let value: T | undefined;
+            try {
+              value = consumer?.end();
+            } catch (error) {
+              fail(new ConsumerError(error));
+              return;
+            }
+            settled = true;
+            clearTimeout(timer);
+            const latency = performance.now() - started;
+            host.latencies[host.latencyCount % LATENCY_WINDOW] = latency;
+            host.latencyCount += 1;
+            resolve(
+              new UpstreamResponse(
+                url.href,
+                status,
+                response.statusMessage ?? "",
+                response.headers,
+                Buffer.concat(chunks),
+                value
+              )
+            );
+          });
+        }
+      );
+
+      const timer = setTimeout(() => {
+        request.destroy(
+          new UpstreamError(
+            `${url.host} did not respond within ${Math.round(timeoutMs)}ms`,
+            url.href
+          )
+        );
+      }, timeoutMs);
+      request.on("error", (error) => {
+        clearTimeout(timer);
+        reject(error);
+      });
+    });
+  }
+}
+
+/**
+ * Process-wide client used by the fetchers. UPSTREAM_ORIGINS, a JSON object
+ * in the shape of the `origins` option, redirects upstream origins.
+ */
+export const upstreamClient = new UpstreamClient({
+  origins: process.env.UPSTREAM_ORIGINS
+    ? JSON.parse(process.env.UPSTREAM_ORIGINS)
+    : undefined,
+});
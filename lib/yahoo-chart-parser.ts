@@ -0,0 +1,628 @@
+/**
+ * Incremental parser for Yahoo Finance v8 chart responses
+ *
+ * Scans the raw JSON bytes once and writes `chart.result[0].timestamp` and
+ * `chart.result[0].indicators.quote[0].{open,high,low,close,volume}` straight
+ * into typed-array columns, without building the intermediate object tree,
+ * per-candle objects or filtered copies. Everything else in the document is
+ * skipped. Chunks can be fed as they arrive; tokens may span chunk
+ * boundaries. lib/fetch-bitcoin.ts streams the decompressed response into a
+ * parser through UpstreamClient.stream(), so the body is never buffered
+ * whole.
+ *
+ * Null gaps are handled explicitly when the series is assembled: candles
+ * without an open or close are dropped (their period is filled later by
+ * lib/clean-ohlcv.ts), a missing high or low falls back to the larger or
+ * smaller of open and close, and a missing volume counts as 0.
+ */
+
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+
+const QUOTE_FIELDS = ["open", "high", "low", "close", "volume"] as const;
+type QuoteField = (typeof QUOTE_FIELDS)[number];
+type ColumnName = "time" | QuoteField;
+
+const OPEN_BRACE = 0x7b;
+const CLOSE_BRACE = 0x7d;
+const OPEN_BRACKET = 0x5b;
+const CLOSE_BRACKET = 0x5d;
+const COLON = 0x3a;
+const COMMA = 0x2c;
+const QUOTE = 0x22;
+const BACKSLASH = 0x5c;
+
+// Tokenizer states
+const Mode = {
+  Value: 0,
+  AfterValue: 1,
+  Key: 2,
+  Colon: 3,
+  String: 4,
+  Number: 5,
+  Literal: 6,
+} as const;
+type Mode = (typeof Mode)[keyof typeof Mode];
+
+interface Frame {
+  isArray: boolean;
+  key: string | null;
+  index: number;
+}
+
+export interface YahooChartParseResult {
+  series: OHLCVSeries;
+  /**
+   * Timestamps in the response
+   */
+  rawCount: number;
+  /**
+   * Candles dropped for a missing open or close
+   */
+  droppedCount: number;
+  /**
+   * Candles kept with a missing high, low or volume filled in
+   */
+  filledCount: number;
+}
+
+/**
+ * Float64 column that grows by doubling
+ */
+class GrowableColumn {
+  values = new Float64Array(1024);
+  length = 0;
+
+  push(value: number): void {
+    if (this.length === this.values.length) {
+      const grown = new Float64Array(this.values.length * 2);
+      grown.set(this.values);
+      this.values = grown;
+    }
+    this.values[this.length++] = value;
+  }
+
+  ensureCapacity(capacity: number): void {
+    if (this.values.length < capacity) {
+      const grown = new Float64Array(capacity);
+      grown.set(this.values);
+      this.values = grown;
+    }
+  }
+}
+
+// Powers of ten that are exact doubles, for the fast number path
+const EXACT_POWERS_OF_TEN = Array.from({ length: 23 }, (_, i) => 10 ** i);
+// Mantissas up to this many digits are exact doubles
+const MAX_EXACT_DIGITS = 15;
+
+function isWhitespace(byte: number): boolean {
+  return byte === 0x20 || byte === 0x0a || byte === 0x0d || byte === 0x09;
+}
+
+function isNumberByte(byte: number): boolean {
+  return (
+    (byte >= 0x30 && byte <= 0x39) ||
+    byte === 0x2d ||
+    byte === 0x2b ||
+    byte === 0x2e ||
+    byte === 0x65 ||
+    byte === 0x45
+  );
+}
+
+function isLetter(byte: number): boolean {
+  return byte >= 0x61 && byte <= 0x7a;
+}
+
+export class YahooChartParser {
+  private readonly columns: Record<ColumnName, GrowableColumn> = {
+    time: new GrowableColumn(),
+    open: new GrowableColumn(),
+    high: new GrowableColumn(),
+    low: new GrowableColumn(),
+    close: new GrowableColumn(),
+    volume: new GrowableColumn(),
+  };
+  private readonly decoder = new TextDecoder();
+  private readonly frames: Frame[] = [];
+  private mode: Mode = Mode.Value;
+
+  // Column receiving the values of the array at depth `targetDepth`
+  private target: GrowableColumn | null = null;
+  private targetDepth = -1;
+
+  private stringIsKey = false;
+  private stringCapture = false;
+  private stringBytes: number[] = [];
+  private escaped = false;
+  private token = "";
+
+  private sawResult = false;
+  private errorDescription: string | null = null;
+  private done = false;
+
+  /**
+   * Feed the next chunk of the response body
+   */
+  write(chunk: Uint8Array): void {
+    let i = 0;
+    while (i < chunk.length) {
+      if (
+        this.target !== null &&
+        this.frames.length === this.targetDepth &&
+        (this.mode === Mode.Value || this.mode === Mode.AfterValue)
+      ) {
+        i = this.scanTarget(chunk, i);
+        if (i === chunk.length) {
+          break;
+        }
+      }
+      this.consume(chunk[i]);
+      i++;
+    }
+  }
+
+  /**
+   * Finish parsing and assemble the series. Throws when the document is
+   * truncated or Yahoo returned an error instead of a result.
+   */
+  end(): YahooChartParseResult {
+    if (this.mode === Mode.Number || this.mode === Mode.Literal) {
+      this.finishScalar();
+    }
+    if (this.frames.length > 0 || this.mode === Mode.String || !this.done) {
+      throw new SyntaxError("Truncated Yahoo Finance chart response");
+    }
+    if (this.errorDescription !== null) {
+      throw new Error(`Yahoo Finance error: ${this.errorDescription}`);
+    }
+    if (!this.sawResult) {
+      throw new Error("No data returned from Yahoo Finance");
+    }
+    return this.assemble();
+  }
+
+  /**
+   * Fast path inside a target column: consume complete numbers, nulls and
+   * commas directly from the chunk. Returns the index of the first byte it
+   * leaves to the general tokenizer (closing bracket, anything unusual, or a
+   * token cut off by the end of the chunk).
+   */
+  private scanTarget(chunk: Uint8Array, start: number): number {
+    const target = this.target!;
+    const frame = this.frames[this.frames.length - 1];
+    let i = start;
+    while (i < chunk.length) {
+      const byte = chunk[i];
+      if (isWhitespace(byte)) {
+        i++;
+        continue;
+      }
+      if (this.mode === Mode.AfterValue) {
+        if (byte !== COMMA) {
+          return i;
+        }
+        frame.index += 1;
+        this.mode = Mode.Value;
+        i++;
+        continue;
+      }
+      if (byte === 0x6e) {
+        // null
+        if (
+          i + 4 >= chunk.length ||
+          chunk[i + 1] !== 0x75 ||
+          chunk[i + 2] !== 0x6c ||
+          chunk[i + 3] !== 0x6c ||
+          isLetter(chunk[i + 4])
+        ) {
+          return i;
+        }
+        target.push(NaN);
+        this.mode = Mode.AfterValue;
+        i += 4;
+        continue;
+      }
+      const end = this.scanNumber(chunk, i, target);
+      if (end < 0) {
+        return i;
+      }
+      this.mode = Mode.AfterValue;
+      i = end;
+    }
+    return i;
+  }
+
+  /**
+   * Parse the number starting at `start` into `target` and return the index
+   * after it, or -1 when it is not a plain number terminated inside the
+   * chunk. Short decimals are assembled exactly from an integer mantissa and
+   * a power of ten (both exact doubles, so the result is correctly rounded);
+   * anything longer goes through Number().
+   */
+  private scanNumber(
+    chunk: Uint8Array,
+    start: number,
+    target: GrowableColumn
+  ): number {
+    let i = start;
+    const negative = chunk[i] === 0x2d;
+    if (negative) {
+      i++;
+    }
+    let mantissa = 0;
+    let digits = 0;
+    let fractionDigits = 0;
+    let sawDigit = false;
+    let inFraction = false;
+    let exact = true;
+
+    for (; i < chunk.length; i++) {
+      const byte = chunk[i];
+      if (byte >= 0x30 && byte <= 0x39) {
+        sawDigit = true;
+        if (mantissa !== 0 || byte !== 0x30) {
+          digits++;
+        }
+        mantissa = mantissa * 10 + (byte - 0x30);
+        if (inFraction) {
+          fractionDigits++;
+        }
+      } else if (byte === 0x2e && !inFraction) {
+        inFraction = true;
+      } else if (byte === 0x65 || byte === 0x45) {
+        // Exponents are rare here; leave them to Number()
+        exact = false;
+      } else if (byte === 0x2b || byte === 0x2d) {
+        if (exact) {
+          return -1;
+        }
+      } else {
+        break;
+      }
+    }
+
+    if (i === chunk.length || !sawDigit) {
+      return -1;
+    }
+    if (
+      exact &&
+      digits <= MAX_EXACT_DIGITS &&
+      fractionDigits < EXACT_POWERS_OF_TEN.length
+    ) {
+      const value = mantissa / EXACT_POWERS_OF_TEN[fractionDigits];
+      target.push(negative ? -value : value);
+      return i;
+    }
+
+    const value = Number(this.decoder.decode(chunk.subarray(start, i)));
+    if (Number.isNaN(value)) {
+      return -1;
+    }
+    target.push(value);
+    return i;
+  }
+
+  private consume(byte: number): void {
+    switch (this.mode) {
+      case Mode.String:
+        this.consumeString(byte);
+        return;
+      case Mode.Number:
+        if (isNumberByte(byte)) {
+          this.token += String.fromCharCode(byte);
+          return;
+        }
+        this.finishScalar();
+        break;
+      case Mode.Literal:
+        if (isLetter(byte)) {
+          this.token += String.fromCharCode(byte);
+          return;
+        }
+        this.finishScalar();
+        break;
+    }
+
+    if (isWhitespace(byte)) {
+      return;
+    }
+
+    switch (this.mode) {
+      case Mode.Value:
+        this.consumeValue(byte);
+        return;
+      case Mode.Key:
+        if (byte === QUOTE) {
+          this.startString(true);
+        } else if (byte === CLOSE_BRACE) {
+          this.closeContainer(false);
+        } else {
+          this.unexpected(byte);
+        }
+        return;
+      case Mode.Colon:
+        if (byte !== COLON) {
+          this.unexpected(byte);
+        }
+        this.mode = Mode.Value;
+        return;
+      case Mode.AfterValue:
+        this.consumeAfterValue(byte);
+        return;
+    }
+  }
+
+  private consumeValue(byte: number): void {
+    if (this.done) {
+      this.unexpected(byte);
+    }
+    if (byte === OPEN_BRACE || byte === OPEN_BRACKET) {
+      const isArray = byte === OPEN_BRACKET;
+      const path = this.path();
+      this.frames.push({ isArray, key: null, index: 0 });
+      if (isArray) {
+        const column = this.columnFor(path);
+        if (column) {
+          this.target = column;
+          this.targetDepth = this.frames.length;
+        }
+        this.mode = Mode.Value;
+      } else {
+        if (
+          path.length === 3 &&
+          path[0] === "chart" &&
+          path[1] === "result" &&
+          path[2] === 0
+        ) {
+          this.sawResult = true;
+        }
+        this.mode = Mode.Key;
+      }
+      return;
+    }
+    if (byte === CLOSE_BRACKET && this.top()?.isArray) {
+      // Empty array
+      this.closeContainer(true);
+      return;
+    }
+    if (byte === QUOTE) {
+      this.startString(false);
+      return;
+    }
+    if (isNumberByte(byte)) {
+      this.mode = Mode.Number;
+      this.token = String.fromCharCode(byte);
+      return;
+    }
+    if (isLetter(byte)) {
+      this.mode = Mode.Literal;
+      this.token = String.fromCharCode(byte);
+      return;
+    }
+    this.unexpected(byte);
+  }
+
+  private consumeAfterValue(byte: number): void {
+    const top = this.top();
+    if (!top) {
+      this.unexpected(byte);
+      return;
+    }
+    if (byte === COMMA) {
+      if (top.isArray) {
+        top.index += 1;
+        this.mode = Mode.Value;
+      } else {
+        this.mode = Mode.Key;
+      }
+    } else if (byte === CLOSE_BRACKET && top.isArray) {
+      this.closeContainer(true);
+    } else if (byte === CLOSE_BRACE && !top.isArray) {
+      this.closeContainer(false);
+    } else {
+      this.unexpected(byte);
+    }
+  }
+
+  private consumeString(byte: number): void {
+    if (this.escaped) {
+      this.escaped = false;
+    } else if (byte === BACKSLASH) {
+      this.escaped = true;
+    } else if (byte === QUOTE) {
+      this.finishString();
+      return;
+    }
+    if (this.stringCapture) {
+      this.stringBytes.push(byte);
+    }
+  }
+
+  private startString(isKey: boolean): void {
+    this.mode = Mode.String;
+    this.stringIsKey = isKey;
+    this.escaped = false;
+    this.stringBytes.length = 0;
+    if (isKey) {
+      this.stringCapture = true;
+    } else {
+      const path = this.path();
+      this.stringCapture =
+        path.length === 3 &&
+        path[0] === "chart" &&
+        path[1] === "error" &&
+        path[2] === "description";
+    }
+  }
+
+  private finishString(): void {
+    const text = this.stringCapture
+      ? this.decodeJsonString(new Uint8Array(this.stringBytes))
+      : "";
+    if (this.stringIsKey) {
+      this.top()!.key = text;
+      this.mode = Mode.Colon;
+      return;
+    }
+    if (this.stringCapture) {
+      this.errorDescription = text;
+    }
+    this.finishValue(NaN);
+  }
+
+  private finishScalar(): void {
+    const token = this.token;
+    this.token = "";
+    if (this.mode === Mode.Number) {
+      const value = Number(token);
+      if (Number.isNaN(value)) {
+        throw new SyntaxError("Invalid number in Yahoo Finance response");
+      }
+      this.finishValue(value);
+    } else if (token === "null") {
+      this.finishValue(NaN);
+    } else if (token === "true" || token === "false") {
+      this.finishValue(NaN);
+    } else {
+      throw new SyntaxError("Invalid literal in Yahoo Finance response");
+    }
+  }
+
+  /**
+   * Record a completed scalar; `value` is NaN for null and non-numbers
+   */
+  private finishValue(value: number): void {
+    if (this.target && this.frames.length === this.targetDepth) {
+      this.target.push(value);
+    }
+    this.afterValue();
+  }
+
+  private afterValue(): void {
+    if (this.frames.length === 0) {
+      this.done = true;
+    }
+    this.mode = Mode.AfterValue;
+  }
+
+  private closeContainer(isArray: boolean): void {
+    const frame = this.frames.pop();
+    if (!frame || frame.isArray !== isArray) {
+      throw new SyntaxError("Mismatched brackets in Yahoo Finance response");
+    }
+    if (this.target && this.frames.length + 1 === this.targetDepth) {
+      this.target = null;
+      this.targetDepth = -1;
+    }
+    this.afterValue();
+  }
+
+  private top(): Frame | undefined {
+    return this.frames[this.frames.length - 1];
+  }
+
+  /**
+   * Keys and indexes leading to the value currently being parsed
+   */
+  private path(): (string | number | null)[] {
+    return this.frames.map((frame) =>
+      frame.isArray ? frame.index : frame.key
+    );
+  }
+
+  private columnFor(path: (string | number | null)[]): GrowableColumn | null {
+    if (path[0] !== "chart" || path[1] !== "result" || path[2] !== 0) {
+      return null;
+    }
+    if (path.length === 4 && path[3] === "timestamp") {
+      return this.columns.time;
+    }
+    if (
+      path.length === 7 &&
+      path[3] === "indicators" &&
+      path[4] === "quote" &&
+      path[5] === 0 &&
+      QUOTE_FIELDS.includes(path[6] as QuoteField)
+    ) {
+      return this.columns[path[6] as QuoteField];
+    }
+    return null;
+  }
+
+  private decodeJsonString(bytes: Uint8Array): string {
+    const raw = this.decoder.decode(bytes);
+    return raw.includes("\\") ? JSON.parse(`"${raw}"`) : raw;
+  }
+
+  private unexpected(byte: number): never {
+    throw new SyntaxError(
+      `Unexpected ${JSON.stringify(String.fromCharCode(byte))} in Yahoo Finance response`
+    );
+  }
+
+  /**
+   * Compact the raw columns into a series in one pass
+   */
+  private assemble(): YahooChartParseResult {
+    const { time, open, high, low, close, volume } = this.columns;
+    const rawCount = time.length;
+    for (const field of QUOTE_FIELDS) {
+      this.columns[field].ensureCapacity(rawCount);
+    }
+    const valueAt = (column: GrowableColumn, index: number) =>
+      index < column.length ? column.values[index] : NaN;
+
+    // Compact in place: row <= i, so unread entries are never overwritten
+    let row = 0;
+    let filledCount = 0;
+    for (let i = 0; i < rawCount; i++) {
+      const o = valueAt(open, i);
+      const c = valueAt(close, i);
+      // Keep only candles with a real open and close
+      if (!(o > 0) || !(c > 0)) {
+        continue;
+      }
+      let h = valueAt(high, i);
+      let l = valueAt(low, i);
+      let v = valueAt(volume, i);
+      if (Number.isNaN(h) || Number.isNaN(l) || Number.isNaN(v)) {
+        filledCount++;
+        if (Number.isNaN(h)) h = Math.max(o, c);
+        if (Number.isNaN(l)) l = Math.min(o, c);
+        if (Number.isNaN(v)) v = 0;
+      }
+      time.values[row] = time.values[i];
+      open.values[row] = o;
+      high.values[row] = h;
+      low.values[row] = l;
+      close.values[row] = c;
+      volume.values[row] = v;
+      row++;
+    }
+
+    const series = createOHLCVSeries(row);
+    series.time.set(time.values.subarray(0, row));
+    series.open.set(open.values.subarray(0, row));
+    series.high.set(high.values.subarray(0, row));
+    series.low.set(low.values.subarray(0, row));
+    series.close.set(close.values.subarray(0, row));
+    series.volume.set(volume.values.subarray(0, row));
+
+    return {
+      series,
+      rawCount,
+      droppedCount: rawCount - row,
+      filledCount,
+    };
+  }
+}
+
+/**
+ * Parse a complete Yahoo Finance chart response body
+ */
+export function parseYahooChart(body: Uint8Array): YahooChartParseResult {
+  const parser = new YahooChartParser();
+  parser.write(body);
+  return parser.end();
+}
@@ -0,0 +1,66 @@
+/**
+ * Compare the chart EMAs and the EMA ribbon computed with one calculateEMA
+ * pass per period, the calculateEMAs batch kernel, and calculateEMAs without
+ * a buffer (which picks between the two by output size).
+ *
+ * Usage: bun scripts/bench-ema-ribbon.ts
+ */
+
+import {
+  calculateEMA,
+  calculateEMAs,
+  CHART_EMA_PERIODS,
+  EMA_RIBBON_PERIODS,
+} from "@/lib/indicators";
+import { generateRandomWalkSeries } from "./synthetic-ohlcv";
+
+const SIZES = [5_000, 50_000, 500_000];
+
+/**
+ * Median wall time in milliseconds over enough runs to fill ~1s
+ */
+function measure(run: () => unknown): number {
+  for (let i = 0; i < 3; i++) {
+    run();
+  }
+
+  const samples: number[] = [];
+  const deadline = performance.now() + 1000;
+  while (samples.length < 5 || performance.now() < deadline) {
+    const start = performance.now();
+    run();
+    samples.push(performance.now() - start);
+  }
+
+  samples.sort((a, b) => a - b);
+  return samples[Math.floor(samples.length / 2)];
+}
+
+const PERIOD_SETS = [
+  { name: "chart EMAs", periods: CHART_EMA_PERIODS },
+  { name: "ribbon", periods: EMA_RIBBON_PERIODS },
+];
+
+const rows = PERIOD_SETS.flatMap(({ name, periods }) =>
+  SIZES.map((size) => {
+    const { close } = generateRandomWalkSeries(size, { seed: size });
+    const perPeriodMs = measure(() =>
+      periods.map((period) => calculateEMA(close, period))
+    );
+    // A caller-supplied buffer always takes the batch kernel
+    const batchMs = measure(() =>
+      calculateEMAs(close, periods, new Float64Array(periods.length * size))
+    );
+    const calculateEMAsMs = measure(() => calculateEMAs(close, periods));
+    return {
+      periods: name,
+      bars: size,
+      "per period (ms)": Number(perPeriodMs.toFixed(2)),
+      "batch (ms)": Number(batchMs.toFixed(2)),
+      "calculateEMAs (ms)": Number(calculateEMAsMs.toFixed(2)),
+      speedup: `${(perPeriodMs / calculateEMAsMs).toFixed(2)}x`,
+    };
+  })
+);
+
+console.table(rows);
@@ -0,0 +1,279 @@
+/**
+ * Benchmark suite for lib/indicators on seeded synthetic histories
+ *
+ * Runs every indicator on random-walk series from 1k to 1M bars and reports
+ * ops/sec, p50/p99 latency and approximate allocated bytes per call. Results
+ * are written as JSON and, when a baseline exists, compared against it.
+ *
+ * Usage:
+ *   bun scripts/bench-indicators.ts [options]
+ *
+ * Options:
+ *   --out <path>        Results file (default .bench/indicators.json)
+ *   --baseline <path>   Baseline to compare against (default
+ *                       .bench/indicators-baseline.json)
+ *   --save-baseline     Also write the results to the baseline path
+ *   --sizes <list>      Comma-separated bar counts (default 1000,...,1000000)
+ *   --time <ms>         Sampling budget per case (default 1000)
+ *   --threshold <r>     p50 slowdown ratio reported as a regression
+ *                       (default 0.1, i.e. 10%)
+ *
+ * Exits with code 1 when any case regressed against the baseline.
+ */
+
+import {
+  calculateAllIndicators,
+  calculateBollingerBands,
+  calculateEMA,
+  calculateOrderBlocks,
+  calculateStochastic,
+} from "@/lib/indicators";
+import { OHLCVSeries } from "@/lib/ohlcv";
+import { existsSync, mkdirSync, readFileSync, writeFileSync } from "node:fs";
+import os from "node:os";
+import { dirname } from "node:path";
+import { parseArgs } from "node:util";
+import { generateRandomWalkSeries } from "./synthetic-ohlcv";
+
+const DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000];
+const MIN_SAMPLES = 5;
+const WARMUP_RUNS = 3;
+
+interface BenchCase {
+  name: string;
+  run: (series: OHLCVSeries) => unknown;
+}
+
+interface BenchResult {
+  name: string;
+  bars: number;
+  samples: number;
+  opsPerSec: number;
+  meanMs: number;
+  p50Ms: number;
+  p99Ms: number;
+  allocatedBytes: number;
+}
+
+interface BenchReport {
+  meta: {
+    date: string;
+    runtime: string;
+    platform: string;
+    arch: string;
+    cpu: string;
+  };
+  results: BenchResult[];
+}
+
+const CASES: BenchCase[] = [
+  { name: "calculateEMA(21)", run: ({ close }) => calculateEMA(close, 21) },
+  {
+    name: "calculateBollingerBands(20, 2)",
+    run: ({ close }) => calculateBollingerBands(close, 20, 2.0),
+  },
+  {
+    name: "calculateStochastic(5, 3, 3)",
+    run: ({ high, low, close }) =>
+      calculateStochastic(high, low, close, 5, 3, 3),
+  },
+  {
+    name: "calculateOrderBlocks",
+    run: (series) => calculateOrderBlocks(series),
+  },
+  {
+    name: "calculateAllIndicators",
+    run: (series) => calculateAllIndicators(series),
+  },
+];
+
+function collectGarbage(): void {
+  if (typeof Bun !== "undefined") {
+    Bun.gc(true);
+  } else {
+    (globalThis as { gc?: () => void }).gc?.();
+  }
+}
+
+/**
+ * Heap plus ArrayBuffer bytes currently allocated
+ */
+function allocatedBytes(): number {
+  const { heapUsed, arrayBuffers } = process.memoryUsage();
+  return heapUsed + arrayBuffers;
+}
+
+function percentile(sorted: number[], fraction: number): number {
+  const index = Math.min(
+    sorted.length - 1,
+    Math.ceil(fraction * sorted.length) - 1
+  );
+  return sorted[Math.max(0, index)];
+}
+
+function runCase(
+  benchCase: BenchCase,
+  series: OHLCVSeries,
+  timeBudgetMs: number
+): BenchResult {
+  for (let i = 0; i < WARMUP_RUNS; i++) {
+    benchCase.run(series);
+  }
+
+  // Allocation of a single call, measured right after a forced collection
+  // while the result is still referenced
+  collectGarbage();
+  const before = allocatedBytes();
+  const retained = [benchCase.run(series)];
+  const allocated = Math.max(0, allocatedBytes() - before);
+  retained.length = 0;
+
+  const samples: number[] = [];
+  const deadline = performance.now() + timeBudgetMs;
+  while (samples.length < MIN_SAMPLES || performance.now() < deadline) {
+    const start = performance.now();
+    benchCase.run(series);
+    samples.push(performance.now() - start);
+  }
+
+  samples.sort((a, b) => a - b);
+  const totalMs = samples.reduce((sum, value) => sum + value, 0);
+  const meanMs = totalMs / samples.length;
+
+  return {
+    name: benchCase.name,
+    bars: series.time.length,
+    samples: samples.length,
+    opsPerSec: 1000 / meanMs,
+    meanMs,
+    p50Ms: percentile(samples, 0.5),
+    p99Ms: percentile(samples, 0.99),
+    allocatedBytes: allocated,
+  };
+}
+
+function formatBytes(bytes: number): string {
+  if (bytes >= 1024 * 1024) {
+    return `${(bytes / 1024 / 1024).toFixed(1)} MB`;
+  }
+  return `${(bytes / 1024).toFixed(1)} KB`;
+}
+
+function writeJson(path: string, report: BenchReport): void {
+  mkdirSync(dirname(path), { recursive: true });
+  writeFileSync(path, `${JSON.stringify(report, null, 2)}\n`);
+}
+
+/**
+ * Print p50 changes against a baseline and return how many cases regressed
+ */
+function compareWithBaseline(
+  report: BenchReport,
+  baseline: BenchReport,
+  threshold: number
+): number {
+  const previous = new Map(
+    baseline.results.map((result) => [`${result.name}@${result.bars}`, result])
+  );
+
+  let regressions = 0;
+  const rows = report.results.flatMap((result) => {
+    const before = previous.get(`${result.name}@${result.bars}`);
+    if (!before) {
+      return [];
+    }
+    const change = result.p50Ms / before.p50Ms - 1;
+    const regressed = change > threshold;
+    if (regressed) {
+      regressions += 1;
+    }
+    return [
+      {
+        case: result.name,
+        bars: result.bars,
+        "baseline p50 (ms)": Number(before.p50Ms.toFixed(3)),
+        "p50 (ms)": Number(result.p50Ms.toFixed(3)),
+        change: `${change >= 0 ? "+" : ""}${(change * 100).toFixed(1)}%`,
+        status: regressed ? "REGRESSION" : change < -threshold ? "faster" : "",
+      },
+    ];
+  });
+
+  console.log(`\nCompared with baseline from ${baseline.meta.date}:`);
+  console.table(rows);
+  return regressions;
+}
+
+const { values: args } = parseArgs({
+  options: {
+    out: { type: "string", default: ".bench/indicators.json" },
+    baseline: { type: "string", default: ".bench/indicators-baseline.json" },
+    "save-baseline": { type: "boolean", default: false },
+    sizes: { type: "string" },
+    time: { type: "string", default: "1000" },
+    threshold: { type: "string", default: "0.1" },
+  },
+});
+
+const sizes = args.sizes
+  ? args.sizes.split(",").map((size) => Number(size.replace(/_/g, "")))
+  : DEFAULT_SIZES;
+const timeBudgetMs = Number(args.time);
+const threshold = Number(args.threshold);
+
+const results: BenchResult[] = [];
+for (const size of sizes) {
+  // Minute bars keep 1M candles inside the Uint32 epoch-seconds range
+  const series = generateRandomWalkSeries(size, { seed: size, interval: 60 });
+  for (const benchCase of CASES) {
+    results.push(runCase(benchCase, series, timeBudgetMs));
+  }
+}
+
+const report: BenchReport = {
+  meta: {
+    date: new Date().toISOString(),
+    runtime:
+      typeof Bun !== "undefined"
+        ? `bun ${Bun.version}`
+        : `node ${process.version}`,
+    platform: process.platform,
+    arch: process.arch,
+    cpu: os.cpus()[0]?.model ?? "unknown",
+  },
+  results,
+};
+
+console.table(
+  results.map((result) => ({
+    case: result.name,
+    bars: result.bars,
+    "ops/sec": Number(result.opsPerSec.toFixed(1)),
+    "p50 (ms)": Number(result.p50Ms.toFixed(3)),
+    "p99 (ms)": Number(result.p99Ms.toFixed(3)),
+    allocated: formatBytes(result.allocatedBytes),
+  }))
+);
+
+writeJson(args.out, report);
+console.log(`Results written to ${args.out}`);
+
+let regressions = 0;
+if (existsSync(args.baseline)) {
+  const baseline: BenchReport = JSON.parse(
+    readFileSync(args.baseline, "utf8")
+  );
+  regressions = compareWithBaseline(report, baseline, threshold);
+}
+
+if (args["save-baseline"]) {
+  writeJson(args.baseline, report);
+  console.log(`Baseline saved to ${args.baseline}`);
+}
+
+if (regressions > 0) {
+  console.error(
+    `${regressions} case(s) regressed by more than ${threshold * 100}%`
+  );
+  process.exit(1);
+}
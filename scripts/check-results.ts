@@ -0,0 +1,36 @@
+/**
+ * Result table shared by the check scripts
+ *
+ * A check script records each named check with check(), then calls report()
+ * once at the end, which prints the results (and any extra tables) and
+ * exits 1 when a check failed.
+ */
+
+export interface CheckResult {
+  check: string;
+  ok: boolean;
+  detail: string;
+}
+
+const results: CheckResult[] = [];
+
+/**
+ * Record the outcome of a check
+ */
+export function check(name: string, ok: boolean, detail: string): void {
+  results.push({ check: name, ok, detail });
+}
+
+/**
+ * Print the results followed by `tables`, and exit 1 when a check failed
+ */
+export function report(...tables: unknown[]): void {
+  console.table(results);
+  for (const table of tables) {
+    console.table(table);
+  }
+
+  if (results.some((result) => !result.ok)) {
+    process.exit(1);
+  }
+}
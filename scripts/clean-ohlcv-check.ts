@@ -0,0 +1,296 @@
+/**
+ * Check cleanOHLCV on hand-built and randomized candle series
+ *
+ * Covers duplicate and out-of-order candles, gaps of several periods (filled
+ * forward or only reported), weekly cadence and `firstChangedRow`, which the
+ * candle store relies on to rewrite only the changed tail. The randomized
+ * cases compare against a straightforward reimplementation and check that
+ * every row before `firstChangedRow` matches the input. Exits 1 when a check
+ * fails.
+ *
+ * Usage:
+ *   bun scripts/clean-ohlcv-check.ts [--iterations 500] [--seed 1]
+ */
+
+import { cleanOHLCV, GapFill, OHLCVCleanReport } from "@/lib/clean-ohlcv";
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+import { nextPeriodStart, periodStart, ResampleRule } from "@/lib/resample";
+import { parseArgs } from "node:util";
+import { check, report } from "./check-results";
+import { createRandom } from "./synthetic-ohlcv";
+
+const DAY = 86_400;
+const DAILY: ResampleRule = { unit: "day", size: 1 };
+const WEEKLY: ResampleRule = { unit: "week", weekStartsOn: 1 };
+// 2024-01-01, a Monday
+const START = Date.UTC(2024, 0, 1) / 1000;
+const COLUMNS = ["time", "open", "high", "low", "close", "volume"] as const;
+
+const { values } = parseArgs({
+  options: {
+    iterations: { type: "string", default: "500" },
+    seed: { type: "string", default: "1" },
+  },
+});
+const iterations = Number(values.iterations);
+const seed = Number(values.seed);
+
+/**
+ * A series from candle timestamps, with the close encoding the input row so
+ * the surviving candles can be identified
+ */
+function seriesAt(times: number[]): OHLCVSeries {
+  const series = createOHLCVSeries(times.length);
+  times.forEach((time, row) => {
+    series.time[row] = time;
+    series.open[row] = 100 + row;
+    series.high[row] = 110 + row;
+    series.low[row] = 90 + row;
+    series.close[row] = 105 + row;
+    series.volume[row] = 1 + row;
+  });
+  return series;
+}
+
+function sameRow(
+  a: OHLCVSeries,
+  aRow: number,
+  b: OHLCVSeries,
+  bRow: number
+): boolean {
+  return COLUMNS.every((column) => Object.is(a[column][aRow], b[column][bRow]));
+}
+
+function closes(series: OHLCVSeries): number[] {
+  return Array.from(series.close);
+}
+
+/**
+ * Reference cleaning: the same rules, written for clarity over speed
+ */
+function referenceClean(
+  data: OHLCVSeries,
+  rule: ResampleRule,
+  fill: GapFill
+): { rows: number[][]; report: Omit<OHLCVCleanReport, "firstChangedRow"> } {
+  const rows: { period: number; values: number[] }[] = [];
+  let duplicates = 0;
+  let outOfOrder = 0;
+  let filledBars = 0;
+  const gaps: OHLCVCleanReport["gaps"] = [];
+
+  for (let i = 0; i < data.time.length; i++) {
+    const values = COLUMNS.map((column) => data[column][i]);
+    const period = periodStart(data.time[i], rule);
+    const last = rows.at(-1);
+    if (last && period < last.period) {
+      outOfOrder++;
+    } else if (last && period === last.period) {
+      duplicates++;
+      last.values = values;
+    } else {
+      if (last) {
+        const missing: number[] = [];
+        for (
+          let p = nextPeriodStart(last.period, rule);
+          p < period;
+          p = nextPeriodStart(p, rule)
+        ) {
+          missing.push(p);
+        }
+        if (missing.length > 0) {
+          gaps.push({
+            from: missing[0],
+            to: period,
+            missingBars: missing.length,
+          });
+        }
+        if (fill === "forward") {
+          const close = last.values[4];
+          for (const p of missing) {
+            rows.push({
+              period: p,
+              values: [p, close, close, close, close, 0],
+            });
+          }
+          filledBars += missing.length;
+        }
+      }
+      rows.push({ period, values });
+    }
+  }
+
+  return {
+    rows: rows.map((row) => row.values),
+    report: {
+      inputRows: data.time.length,
+      outputRows: rows.length,
+      duplicates,
+      outOfOrder,
+      filledBars,
+      gaps,
+    },
+  };
+}
+
+// A clean series comes back as the same object
+{
+  const input = seriesAt([0, 1, 2, 3].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, DAILY);
+  check(
+    "unchanged",
+    series === input && report.firstChangedRow === 4,
+    `firstChangedRow ${report.firstChangedRow} of ${report.outputRows}`
+  );
+}
+
+// The later candle in a period wins
+{
+  const input = seriesAt([0, 1, 1.5, 2].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, DAILY);
+  check(
+    "duplicates",
+    report.duplicates === 1 &&
+      report.firstChangedRow === 1 &&
+      closes(series).join() === "105,107,108",
+    `${report.duplicates} duplicate(s), closes ${closes(series)}, firstChangedRow ${report.firstChangedRow}`
+  );
+}
+
+// A candle older than the previous period is dropped
+{
+  const input = seriesAt([0, 1, 2, 1.2, 3].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, DAILY);
+  check(
+    "out of order",
+    report.outOfOrder === 1 &&
+      report.firstChangedRow === 3 &&
+      closes(series).join() === "105,106,107,109",
+    `${report.outOfOrder} out of order, closes ${closes(series)}, firstChangedRow ${report.firstChangedRow}`
+  );
+}
+
+// Three missing days are filled flat at the previous close
+{
+  const input = seriesAt([0, 1, 5, 6].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, DAILY);
+  const [gap] = report.gaps;
+  const flat = [2, 3, 4].every(
+    (row) =>
+      series.time[row] === START + row * DAY &&
+      series.open[row] === 106 &&
+      series.high[row] === 106 &&
+      series.low[row] === 106 &&
+      series.close[row] === 106 &&
+      series.volume[row] === 0
+  );
+  check(
+    "multi-period gap (forward)",
+    flat &&
+      series.time.length === 7 &&
+      report.filledBars === 3 &&
+      report.gaps.length === 1 &&
+      gap.from === START + 2 * DAY &&
+      gap.to === START + 5 * DAY &&
+      gap.missingBars === 3 &&
+      report.firstChangedRow === 2,
+    `${series.time.length} rows, ${report.filledBars} filled, firstChangedRow ${report.firstChangedRow}`
+  );
+}
+
+// Without filling, the gap is only reported and the input kept as is
+{
+  const input = seriesAt([0, 1, 5, 6].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, DAILY, "none");
+  check(
+    "multi-period gap (none)",
+    series === input &&
+      report.filledBars === 0 &&
+      report.gaps[0]?.missingBars === 3 &&
+      report.firstChangedRow === 4,
+    `${report.gaps.length} gap(s), firstChangedRow ${report.firstChangedRow}`
+  );
+}
+
+// Weekly candles on Mondays, with two weeks missing
+{
+  const input = seriesAt([0, 7, 28].map((d) => START + d * DAY));
+  const { series, report } = cleanOHLCV(input, WEEKLY);
+  check(
+    "weekly gap",
+    report.filledBars === 2 &&
+      series.time[2] === START + 14 * DAY &&
+      series.time[3] === START + 21 * DAY &&
+      report.firstChangedRow === 2,
+    `${report.filledBars} filled, firstChangedRow ${report.firstChangedRow}`
+  );
+}
+
+// Randomized series with duplicates, stale candles and gaps
+const random = createRandom(seed);
+let mismatches = 0;
+let prefixViolations = 0;
+let firstMismatch = "";
+for (let iteration = 0; iteration < iterations; iteration++) {
+  const times: number[] = [];
+  let day = 0;
+  const length = 1 + Math.floor(random() * 60);
+  for (let i = 0; i < length; i++) {
+    // Same day (a duplicate), a few days back (stale), a gap or the next day
+    const roll = random();
+    if (roll < 0.1) {
+      day -= 1 + Math.floor(random() * 3);
+    } else if (roll < 0.2) {
+      day += 2 + Math.floor(random() * 4);
+    } else if (roll >= 0.3) {
+      day += 1;
+    }
+    times.push(START + day * DAY + Math.floor(random() * DAY));
+  }
+  const input = seriesAt(times);
+  const fill: GapFill = random() < 0.5 ? "forward" : "none";
+
+  const { series, report } = cleanOHLCV(input, DAILY, fill);
+  const expected = referenceClean(input, DAILY, fill);
+  const { firstChangedRow, ...counts } = report;
+  const rowsMatch =
+    series.time.length === expected.rows.length &&
+    expected.rows.every((values, row) =>
+      COLUMNS.every((column, c) => Object.is(series[column][row], values[c]))
+    );
+  if (
+    !rowsMatch ||
+    JSON.stringify(counts) !== JSON.stringify(expected.report)
+  ) {
+    mismatches++;
+    firstMismatch ||= `iteration ${iteration} (${fill})`;
+  }
+
+  // Rows before firstChangedRow match the input; the row at it does not
+  let prefixHolds = true;
+  for (let row = 0; row < firstChangedRow; row++) {
+    prefixHolds &&= sameRow(series, row, input, row);
+  }
+  if (firstChangedRow < report.outputRows && firstChangedRow < length) {
+    prefixHolds &&= !sameRow(series, firstChangedRow, input, firstChangedRow);
+  }
+  if (firstChangedRow === report.outputRows) {
+    prefixHolds &&= series === input || report.outputRows < length;
+  }
+  if (!prefixHolds) {
+    prefixViolations++;
+    firstMismatch ||= `iteration ${iteration} firstChangedRow (${fill})`;
+  }
+}
+check(
+  "randomized vs reference",
+  mismatches === 0,
+  `${mismatches} of ${iterations} differ ${firstMismatch}`.trim()
+);
+check(
+  "randomized firstChangedRow",
+  prefixViolations === 0,
+  `${prefixViolations} of ${iterations} violate the prefix`
+);
+
+report();
@@ -0,0 +1,513 @@
+/**
+ * Differential fuzz harness for the indicator kernels
+ *
+ * Runs the optimized implementations in lib/indicators against the reference
+ * oracles in lib/indicators-reference on thousands of seeded random series,
+ * including edge cases: flat highs/lows (the highestHigh === lowestLow
+ * branch), short series, zero volume and NaN gaps. Reports the max absolute
+ * and relative error per output and exits non-zero when any output drifts
+ * beyond tolerance or disagrees on NaN placement.
+ *
+ * Usage:
+ *   bun scripts/fuzz-indicators.ts [--iterations 2000] [--seed 1]
+ */
+
+import {
+  BollingerBandsState,
+  calculateAllIndicators,
+  calculateBollingerBands,
+  calculateEMA,
+  calculateEMAs,
+  calculateOrderBlocks,
+  calculateStochastic,
+  DEFAULT_ORDER_BLOCK_SETTINGS,
+  EMA_RIBBON_PERIODS,
+  EMAState,
+  IndicatorState,
+  OrderBlockSettings,
+  OrderBlockState,
+  OrderBlockZone,
+  StochasticState,
+} from "@/lib/indicators";
+import {
+  referenceAllIndicators,
+  referenceBollingerBands,
+  referenceEMA,
+  referenceOrderBlocks,
+  referenceStochastic,
+} from "@/lib/indicators-reference";
+import { getOHLCVBar, OHLCV, OHLCVSeries } from "@/lib/ohlcv";
+import { parseArgs } from "node:util";
+import { createRandom, generateRandomWalkSeries } from "./synthetic-ohlcv";
+
+// Values count as different when both errors exceed these bounds
+const MAX_RELATIVE_ERROR = 1e-9;
+const MAX_ABSOLUTE_ERROR = 1e-9;
+
+type Random = () => number;
+
+const CASE_KINDS = [
+  "random-walk",
+  "flat",
+  "short",
+  "zero-volume",
+  "nan-gaps",
+  "mixed",
+] as const;
+type CaseKind = (typeof CASE_KINDS)[number];
+
+interface FuzzCase {
+  kind: CaseKind;
+  seed: number;
+  series: OHLCVSeries;
+}
+
+/**
+ * Running error summary for one output of one variant
+ */
+class ErrorStats {
+  compared = 0;
+  maxAbsolute = 0;
+  maxRelative = 0;
+  nanMismatches = 0;
+  failures = 0;
+  firstFailure: string | null = null;
+
+  record(expected: number, actual: number, where: () => string): void {
+    this.compared += 1;
+    const expectedNaN = Number.isNaN(expected);
+    const actualNaN = Number.isNaN(actual);
+    if (expectedNaN || actualNaN) {
+      if (expectedNaN !== actualNaN) {
+        this.nanMismatches += 1;
+        this.fail(`${where()}: expected ${expected}, got ${actual}`);
+      }
+      return;
+    }
+    if (expected === actual) {
+      return;
+    }
+
+    const absolute = Math.abs(expected - actual);
+    const relative = absolute / Math.max(Math.abs(expected), Math.abs(actual));
+    this.maxAbsolute = Math.max(this.maxAbsolute, absolute);
+    this.maxRelative = Math.max(this.maxRelative, relative);
+    if (absolute > MAX_ABSOLUTE_ERROR && relative > MAX_RELATIVE_ERROR) {
+      this.fail(`${where()}: expected ${expected}, got ${actual}`);
+    }
+  }
+
+  fail(message: string): void {
+    this.failures += 1;
+    this.firstFailure ??= message;
+  }
+}
+
+const stats = new Map<string, ErrorStats>();
+
+function statsFor(variant: string, output: string): ErrorStats {
+  const key = `${variant}\u0000${output}`;
+  let entry = stats.get(key);
+  if (!entry) {
+    entry = new ErrorStats();
+    stats.set(key, entry);
+  }
+  return entry;
+}
+
+function describe(fuzzCase: FuzzCase): string {
+  const length = fuzzCase.series.time.length;
+  return `${fuzzCase.kind} seed=${fuzzCase.seed} bars=${length}`;
+}
+
+/**
+ * Compare two columns index by index. Missing entries count as NaN, so the
+ * reference EMA's over-long padding on short inputs is not a mismatch.
+ */
+function compareColumn(
+  variant: string,
+  output: string,
+  fuzzCase: FuzzCase,
+  expected: ArrayLike<number>,
+  actual: ArrayLike<number>
+): void {
+  const entry = statsFor(variant, output);
+  const length = Math.max(expected.length, actual.length);
+  for (let i = 0; i < length; i++) {
+    entry.record(
+      i < expected.length ? expected[i] : NaN,
+      i < actual.length ? actual[i] : NaN,
+      () => `${describe(fuzzCase)} index=${i}`
+    );
+  }
+}
+
+function compareZones(
+  variant: string,
+  fuzzCase: FuzzCase,
+  expected: OrderBlockZone[],
+  actual: OrderBlockZone[]
+): void {
+  const structure = statsFor(variant, "zones");
+  structure.compared += 1;
+  if (expected.length !== actual.length) {
+    structure.fail(
+      `${describe(fuzzCase)}: expected ${expected.length} zones, got ${actual.length}`
+    );
+    return;
+  }
+
+  const bounds = statsFor(variant, "zone bounds");
+  expected.forEach((zone, i) => {
+    const other = actual[i];
+    if (
+      zone.type !== other.type ||
+      zone.startIndex !== other.startIndex ||
+      zone.endIndex !== other.endIndex ||
+      zone.startTime !== other.startTime ||
+      zone.endTime !== other.endTime
+    ) {
+      structure.fail(
+        `${describe(fuzzCase)} zone=${i}: expected ${JSON.stringify(zone)}, got ${JSON.stringify(other)}`
+      );
+    }
+    const where = () => `${describe(fuzzCase)} zone=${i}`;
+    bounds.record(zone.low, other.low, where);
+    bounds.record(zone.high, other.high, where);
+  });
+}
+
+function randomInt(random: Random, min: number, max: number): number {
+  return min + Math.floor(random() * (max - min + 1));
+}
+
+/**
+ * Collapse random stretches of bars to a single price so the stochastic
+ * window sees highestHigh === lowestLow and Bollinger variance is zero
+ */
+function flattenStretches(series: OHLCVSeries, random: Random): void {
+  const length = series.time.length;
+  let i = 0;
+  while (i < length) {
+    const stretch = randomInt(random, 1, 12);
+    if (random() < 0.5) {
+      const price = series.close[Math.max(0, i - 1)];
+      for (let j = i; j < Math.min(length, i + stretch); j++) {
+        series.open[j] = price;
+        series.high[j] = price;
+        series.low[j] = price;
+        series.close[j] = price;
+      }
+    }
+    i += stretch;
+  }
+}
+
+/**
+ * Replace random OHLC values with NaN, as a missing Yahoo quote would be
+ */
+function punchNaNGaps(series: OHLCVSeries, random: Random): void {
+  const columns = [series.open, series.high, series.low, series.close];
+  const rate = 0.01 + random() * 0.1;
+  for (let i = 0; i < series.time.length; i++) {
+    if (random() < rate) {
+      if (random() < 0.5) {
+        // Whole candle missing
+        columns.forEach((column) => (column[i] = NaN));
+      } else {
+        columns[randomInt(random, 0, columns.length - 1)][i] = NaN;
+      }
+    }
+  }
+}
+
+function generateCase(seed: number): FuzzCase {
+  const random = createRandom(seed);
+  const kind = CASE_KINDS[seed % CASE_KINDS.length];
+  const length =
+    kind === "short" ? randomInt(random, 0, 25) : randomInt(random, 26, 600);
+
+  const series = generateRandomWalkSeries(length, {
+    seed,
+    startPrice: 10 ** randomInt(random, -2, 5),
+    volatility: 0.001 + random() * 0.08,
+  });
+
+  if (kind === "flat" || (kind === "mixed" && random() < 0.5)) {
+    flattenStretches(series, random);
+  }
+  if (kind === "zero-volume" || (kind === "mixed" && random() < 0.5)) {
+    series.volume.fill(0);
+  }
+  if (kind === "nan-gaps" || (kind === "mixed" && random() < 0.5)) {
+    punchNaNGaps(series, random);
+  }
+
+  return { kind, seed, series };
+}
+
+function randomOrderBlockSettings(random: Random): OrderBlockSettings {
+  return {
+    swingLookback: randomInt(random, 0, 6),
+    minimumBreakoutPercent: random() < 0.2 ? 0 : random() * 0.01,
+    maxSourceLookback: randomInt(random, 0, 20),
+  };
+}
+
+/**
+ * Feed a series bar by bar into a streaming state, revising some bars with
+ * updateLast after pushing a perturbed version first, and collect the value
+ * after every bar
+ */
+function streamValues<T>(
+  state: IndicatorState<T>,
+  bars: OHLCV[],
+  random: Random
+): T[] {
+  return bars.map((bar) => {
+    if (random() < 0.3) {
+      const scale = 1 + (random() - 0.5) * 0.2;
+      state.push({
+        ...bar,
+        high: bar.high * scale,
+        low: bar.low * scale,
+        close: bar.close * scale,
+      });
+      state.updateLast(bar);
+    } else {
+      state.push(bar);
+    }
+    return state.value;
+  });
+}
+
+function fuzzOnce(fuzzCase: FuzzCase): void {
+  const { series } = fuzzCase;
+  const random = createRandom(fuzzCase.seed ^ 0x9e3779b9);
+  const close = Array.from(series.close);
+  const high = Array.from(series.high);
+  const low = Array.from(series.low);
+  const bars = Array.from(series.time, (_, index) =>
+    getOHLCVBar(series, index)
+  );
+
+  // EMA, single period and batched
+  const periods = [1, 2, 13, 21, 50, 100, randomInt(random, 1, 80)];
+  for (const period of periods) {
+    compareColumn(
+      "calculateEMA",
+      "ema",
+      fuzzCase,
+      referenceEMA(close, period),
+      calculateEMA(series.close, period)
+    );
+  }
+  const batchPeriods = [...EMA_RIBBON_PERIODS, ...periods];
+  calculateEMAs(series.close, batchPeriods).forEach((row, p) => {
+    compareColumn(
+      "calculateEMAs",
+      "ema",
+      fuzzCase,
+      referenceEMA(close, batchPeriods[p]),
+      row
+    );
+  });
+
+  // Bollinger Bands
+  const bollingerPeriod = random() < 0.5 ? 20 : randomInt(random, 1, 40);
+  const bollingerStdDev = random() < 0.5 ? 2 : random() * 4;
+  const expectedBands = referenceBollingerBands(
+    close,
+    bollingerPeriod,
+    bollingerStdDev
+  );
+  const actualBands = calculateBollingerBands(
+    series.close,
+    bollingerPeriod,
+    bollingerStdDev
+  );
+  for (const band of ["upper", "middle", "lower"] as const) {
+    compareColumn(
+      "calculateBollingerBands",
+      band,
+      fuzzCase,
+      expectedBands[band],
+      actualBands[band]
+    );
+  }
+
+  // Stochastic
+  const kPeriod = random() < 0.5 ? 5 : randomInt(random, 1, 14);
+  const dPeriod = random() < 0.5 ? 3 : randomInt(random, 1, 5);
+  const smoothK = random() < 0.5 ? 3 : randomInt(random, 1, 5);
+  const expectedStochastic = referenceStochastic(
+    high,
+    low,
+    close,
+    kPeriod,
+    dPeriod,
+    smoothK
+  );
+  const actualStochastic = calculateStochastic(
+    series.high,
+    series.low,
+    series.close,
+    kPeriod,
+    dPeriod,
+    smoothK
+  );
+  compareColumn(
+    "calculateStochastic",
+    "k",
+    fuzzCase,
+    expectedStochastic.k,
+    actualStochastic.k
+  );
+  compareColumn(
+    "calculateStochastic",
+    "d",
+    fuzzCase,
+    expectedStochastic.d,
+    actualStochastic.d
+  );
+
+  // Order blocks, default and random settings
+  const settings = randomOrderBlockSettings(random);
+  compareZones(
+    "calculateOrderBlocks",
+    fuzzCase,
+    referenceOrderBlocks(bars),
+    calculateOrderBlocks(series)
+  );
+  compareZones(
+    "calculateOrderBlocks",
+    fuzzCase,
+    referenceOrderBlocks(bars, settings),
+    calculateOrderBlocks(series, settings)
+  );
+
+  // calculateAllIndicators
+  const expectedAll = referenceAllIndicators(series);
+  const actualAll = calculateAllIndicators(series);
+  for (const output of ["ema13", "ema21", "ema50", "ema100"] as const) {
+    compareColumn(
+      "calculateAllIndicators",
+      output,
+      fuzzCase,
+      expectedAll[output],
+      actualAll[output]
+    );
+  }
+  for (const band of ["upper", "middle", "lower"] as const) {
+    compareColumn(
+      "calculateAllIndicators",
+      `bollinger.${band}`,
+      fuzzCase,
+      expectedAll.bollinger[band],
+      actualAll.bollinger[band]
+    );
+  }
+  for (const line of ["k", "d"] as const) {
+    compareColumn(
+      "calculateAllIndicators",
+      `stochastic.${line}`,
+      fuzzCase,
+      expectedAll.stochastic[line],
+      actualAll.stochastic[line]
+    );
+  }
+  compareZones(
+    "calculateAllIndicators",
+    fuzzCase,
+    expectedAll.orderBlocks,
+    actualAll.orderBlocks
+  );
+
+  // Streaming states, bar by bar with revisions
+  compareColumn(
+    "EMAState",
+    "ema",
+    fuzzCase,
+    referenceEMA(close, 21),
+    streamValues(new EMAState(21), bars, random)
+  );
+  const streamedBands = streamValues(
+    new BollingerBandsState(bollingerPeriod, bollingerStdDev),
+    bars,
+    random
+  );
+  for (const band of ["upper", "middle", "lower"] as const) {
+    compareColumn(
+      "BollingerBandsState",
+      band,
+      fuzzCase,
+      expectedBands[band],
+      streamedBands.map((value) => value[band])
+    );
+  }
+  const streamedStochastic = streamValues(
+    new StochasticState(kPeriod, dPeriod, smoothK),
+    bars,
+    random
+  );
+  for (const line of ["k", "d"] as const) {
+    compareColumn(
+      "StochasticState",
+      line,
+      fuzzCase,
+      expectedStochastic[line],
+      streamedStochastic.map((value) => value[line])
+    );
+  }
+  const streamedZones = streamValues(
+    new OrderBlockState(DEFAULT_ORDER_BLOCK_SETTINGS),
+    bars,
+    random
+  );
+  compareZones(
+    "OrderBlockState",
+    fuzzCase,
+    referenceOrderBlocks(bars),
+    streamedZones[streamedZones.length - 1] ?? []
+  );
+}
+
+const { values: args } = parseArgs({
+  options: {
+    iterations: { type: "string", default: "2000" },
+    seed: { type: "string", default: "1" },
+  },
+});
+
+const iterations = Number(args.iterations);
+const firstSeed = Number(args.seed);
+const start = performance.now();
+for (let i = 0; i < iterations; i++) {
+  fuzzOnce(generateCase(firstSeed + i));
+}
+
+const rows = [...stats.entries()].map(([key, entry]) => {
+  const [variant, output] = key.split("\u0000");
+  return {
+    variant,
+    output,
+    compared: entry.compared,
+    "max abs error": entry.maxAbsolute,
+    "max rel error": entry.maxRelative,
+    "NaN mismatches": entry.nanMismatches,
+    status: entry.failures > 0 ? `FAIL (${entry.failures})` : "ok",
+  };
+});
+
+console.log(
+  `${iterations} cases (${CASE_KINDS.join(", ")}) in ${((performance.now() - start) / 1000).toFixed(1)}s`
+);
+console.table(rows);
+
+const failing = [...stats.entries()].filter(([, entry]) => entry.failures > 0);
+if (failing.length > 0) {
+  for (const [key, entry] of failing) {
+    console.error(`${key.replace("\u0000", " ")}: ${entry.firstFailure}`);
+  }
+  process.exit(1);
+}
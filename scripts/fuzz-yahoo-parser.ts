@@ -0,0 +1,374 @@
+/**
+ * Differential fuzz harness for the Yahoo Finance chart parser
+ *
+ * Generates seeded random chart documents and checks that YahooChartParser,
+ * fed in random chunk splits (down to single bytes), agrees with a
+ * JSON.parse-based conversion applying the same null rules. Documents mix
+ * nulls, zeros, negative, long and exponent numbers, quote arrays shorter
+ * than the timestamps, decoy "open"/"close" keys outside the quote, escaped
+ * and multi-byte strings, random whitespace and key order, and Yahoo error
+ * responses. Exits non-zero on the first disagreement, printing the seed.
+ *
+ * Usage:
+ *   bun scripts/fuzz-yahoo-parser.ts [--iterations 300] [--seed 1]
+ */
+
+import { OHLCVSeries } from "@/lib/ohlcv";
+import {
+  YahooChartParser,
+  YahooChartParseResult,
+} from "@/lib/yahoo-chart-parser";
+import { parseArgs } from "node:util";
+import { createRandom } from "./synthetic-ohlcv";
+
+type Random = () => number;
+
+const QUOTE_FIELDS = ["open", "high", "low", "close", "volume"] as const;
+const COLUMNS = ["time", ...QUOTE_FIELDS] as const;
+const STRINGS = [
+  "BTC-USD",
+  'quoted "value"',
+  "back\\slash",
+  "tab\tand\nnewline",
+  "café ₿ 🚀",
+  "\u0001control",
+  "open",
+  "",
+];
+
+const { values } = parseArgs({
+  options: {
+    iterations: { type: "string", default: "300" },
+    seed: { type: "string", default: "1" },
+  },
+});
+const iterations = Number(values.iterations);
+const seed = Number(values.seed);
+
+function pick<T>(random: Random, items: readonly T[]): T {
+  return items[Math.floor(random() * items.length)];
+}
+
+function shuffle<T>(random: Random, items: T[]): T[] {
+  for (let i = items.length - 1; i > 0; i--) {
+    const j = Math.floor(random() * (i + 1));
+    [items[i], items[j]] = [items[j], items[i]];
+  }
+  return items;
+}
+
+/**
+ * A JSON number as Yahoo or another encoder might spell it
+ */
+function numberText(random: Random, price: number): string {
+  const roll = random();
+  if (roll < 0.05) {
+    return pick(random, ["0", "0.0", "-0", "0e0"]);
+  }
+  if (roll < 0.1) {
+    return `${-price}`;
+  }
+  if (roll < 0.2) {
+    return price.toExponential(Math.floor(random() * 17));
+  }
+  if (roll < 0.3) {
+    return price.toFixed(Math.floor(random() * 20));
+  }
+  if (roll < 0.35) {
+    return `${Math.floor(price)}`;
+  }
+  if (roll < 0.4) {
+    // More digits than a double holds
+    return `${price.toFixed(8)}123456789012`;
+  }
+  return JSON.stringify(price);
+}
+
+/**
+ * Random whitespace between tokens
+ */
+function space(random: Random): string {
+  return random() < 0.7 ? "" : pick(random, [" ", "\n", "\r\n  ", "\t"]);
+}
+
+function arrayText(random: Random, items: string[]): string {
+  return `[${space(random)}${items.join(`${space(random)},${space(random)}`)}${space(random)}]`;
+}
+
+function objectText(random: Random, entries: [string, string][]): string {
+  const members = shuffle(random, entries).map(
+    ([key, value]) =>
+      `${JSON.stringify(key)}${space(random)}:${space(random)}${value}`
+  );
+  return `{${space(random)}${members.join(`,${space(random)}`)}${space(random)}}`;
+}
+
+/**
+ * Noise the parser has to skip: nested values including target-like keys
+ */
+function decoyText(random: Random, depth = 0): string {
+  const roll = random();
+  if (depth > 2 || roll < 0.3) {
+    return JSON.stringify(pick(random, STRINGS));
+  }
+  if (roll < 0.45) {
+    return pick(random, ["true", "false", "null", "-1.5e-7", "42"]);
+  }
+  if (roll < 0.7) {
+    const length = Math.floor(random() * 4);
+    return arrayText(
+      random,
+      Array.from({ length }, () => decoyText(random, depth + 1))
+    );
+  }
+  const keys = ["open", "close", "timestamp", "quote", "currency", "é"];
+  const length = Math.floor(random() * 4);
+  return objectText(
+    random,
+    Array.from({ length }, () => [
+      pick(random, keys),
+      decoyText(random, depth + 1),
+    ])
+  );
+}
+
+/**
+ * A random chart document as text
+ */
+function generateDocument(random: Random): string {
+  if (random() < 0.05) {
+    const error = objectText(random, [
+      ["code", JSON.stringify("Not Found")],
+      ["description", JSON.stringify(pick(random, STRINGS.slice(0, 5)))],
+    ]);
+    return objectText(random, [
+      [
+        "chart",
+        objectText(random, [
+          ["result", "null"],
+          ["error", error],
+        ]),
+      ],
+    ]);
+  }
+
+  const length = Math.floor(random() * 80);
+  let time = 1_600_000_000 + Math.floor(random() * 1e8);
+  let price = 1 + random() * 100_000;
+  const timestamps: string[] = [];
+  const quote: Record<string, string[]> = {};
+  for (const field of QUOTE_FIELDS) {
+    quote[field] = [];
+  }
+  for (let i = 0; i < length; i++) {
+    time += 86_400;
+    price = Math.max(0.01, price * (1 + (random() - 0.5) * 0.1));
+    timestamps.push(`${time}`);
+    for (const field of QUOTE_FIELDS) {
+      const value = field === "volume" ? random() * 1e11 : price;
+      const cents = Math.round(value * 100) / 100;
+      quote[field].push(random() < 0.1 ? "null" : numberText(random, cents));
+    }
+  }
+  // Occasionally a quote column stops short of the timestamps
+  for (const field of QUOTE_FIELDS) {
+    if (random() < 0.05) {
+      quote[field].length = Math.floor(random() * length);
+    }
+  }
+
+  const quoteText = objectText(
+    random,
+    QUOTE_FIELDS.map((field) => [field, arrayText(random, quote[field])])
+  );
+  const indicators = objectText(random, [
+    ["quote", arrayText(random, [quoteText, decoyText(random)])],
+    ["adjclose", arrayText(random, [decoyText(random)])],
+  ]);
+  const resultEntries: [string, string][] = [
+    ["meta", decoyText(random)],
+    ["indicators", indicators],
+  ];
+  // Yahoo omits the timestamps when the range holds no candles yet
+  if (length > 0 || random() < 0.5) {
+    resultEntries.push(["timestamp", arrayText(random, timestamps)]);
+  }
+  const result = objectText(random, resultEntries);
+  return objectText(random, [
+    [
+      "chart",
+      objectText(random, [
+        ["result", arrayText(random, [result, decoyText(random)])],
+        ["error", "null"],
+      ]),
+    ],
+  ]);
+}
+
+interface YahooDocument {
+  chart: {
+    result: Array<{
+      timestamp?: number[];
+      indicators: { quote: Array<Record<string, Array<number | null>>> };
+    }> | null;
+    error: { description: string } | null;
+  };
+}
+
+/**
+ * The conversion the parser replaces: JSON.parse, then the documented null
+ * rules (drop without a positive open and close, fill high and low from open
+ * and close, volume 0)
+ */
+function referenceParse(text: string): YahooChartParseResult {
+  const document: YahooDocument = JSON.parse(text);
+  if (document.chart.error) {
+    throw new Error(`Yahoo Finance error: ${document.chart.error.description}`);
+  }
+  const result = document.chart.result?.[0];
+  if (!result) {
+    throw new Error("No data returned from Yahoo Finance");
+  }
+  const timestamps = result.timestamp ?? [];
+  const quote = result.indicators.quote[0];
+  const valueAt = (field: string, i: number) => quote[field][i] ?? NaN;
+
+  const rows: number[][] = [];
+  let filledCount = 0;
+  for (let i = 0; i < timestamps.length; i++) {
+    const open = valueAt("open", i);
+    const close = valueAt("close", i);
+    if (!(open > 0) || !(close > 0)) {
+      continue;
+    }
+    let high = valueAt("high", i);
+    let low = valueAt("low", i);
+    let volume = valueAt("volume", i);
+    if (Number.isNaN(high) || Number.isNaN(low) || Number.isNaN(volume)) {
+      filledCount++;
+    }
+    if (Number.isNaN(high)) high = Math.max(open, close);
+    if (Number.isNaN(low)) low = Math.min(open, close);
+    if (Number.isNaN(volume)) volume = 0;
+    rows.push([timestamps[i], open, high, low, close, volume]);
+  }
+
+  const series = Object.fromEntries(
+    COLUMNS.map((column, c) => [
+      column,
+      Float64Array.from(rows, (row) => row[c]),
+    ])
+  ) as unknown as OHLCVSeries;
+  return {
+    series,
+    rawCount: timestamps.length,
+    droppedCount: timestamps.length - rows.length,
+    filledCount,
+  };
+}
+
+/**
+ * Feed the bytes in random chunks, sometimes one byte at a time
+ */
+function parseInChunks(
+  random: Random,
+  bytes: Uint8Array
+): { result: YahooChartParseResult; chunks: number } {
+  const parser = new YahooChartParser();
+  const maxChunk = random() < 0.2 ? 1 : 1 + Math.floor(random() * 64);
+  let chunks = 0;
+  for (let start = 0; start < bytes.length; chunks++) {
+    const end = Math.min(
+      bytes.length,
+      start + 1 + Math.floor(random() * maxChunk)
+    );
+    parser.write(bytes.subarray(start, end));
+    start = end;
+  }
+  return { result: parser.end(), chunks };
+}
+
+type Outcome = { result: YahooChartParseResult } | { error: string };
+
+function outcome(run: () => YahooChartParseResult): Outcome {
+  try {
+    return { result: run() };
+  } catch (error) {
+    return { error: (error as Error).message };
+  }
+}
+
+/**
+ * Why two outcomes differ, or null when they agree exactly
+ */
+function difference(actual: Outcome, expected: Outcome): string | null {
+  if ("error" in actual || "error" in expected) {
+    const a = "error" in actual ? actual.error : "a result";
+    const e = "error" in expected ? expected.error : "a result";
+    return a === e ? null : `got ${a}, expected ${e}`;
+  }
+  const a = actual.result;
+  const e = expected.result;
+  for (const count of ["rawCount", "droppedCount", "filledCount"] as const) {
+    if (a[count] !== e[count]) {
+      return `${count} ${a[count]}, expected ${e[count]}`;
+    }
+  }
+  for (const column of COLUMNS) {
+    const got = a.series[column];
+    const want = e.series[column];
+    if (got.length !== want.length) {
+      return `${column} has ${got.length} rows, expected ${want.length}`;
+    }
+    for (let row = 0; row < want.length; row++) {
+      if (!Object.is(got[row], want[row])) {
+        return `${column}[${row}] ${got[row]}, expected ${want[row]}`;
+      }
+    }
+  }
+  return null;
+}
+
+const random = createRandom(seed);
+const encoder = new TextEncoder();
+let candles = 0;
+let chunks = 0;
+let errors = 0;
+
+for (let iteration = 0; iteration < iterations; iteration++) {
+  const text = generateDocument(random);
+  const expected = outcome(() => referenceParse(text));
+  let chunkCount = 0;
+  const actual = outcome(() => {
+    const parsed = parseInChunks(random, encoder.encode(text));
+    chunkCount = parsed.chunks;
+    return parsed.result;
+  });
+
+  const problem = difference(actual, expected);
+  if (problem) {
+    console.error(
+      `❌ Document ${iteration} (seed ${seed}) split into ${chunkCount} chunks: ${problem}`
+    );
+    console.error(text.length > 2000 ? `${text.slice(0, 2000)}…` : text);
+    process.exit(1);
+  }
+
+  chunks += chunkCount;
+  if ("error" in expected) {
+    errors++;
+  } else {
+    candles += expected.result.series.time.length;
+  }
+}
+
+console.table([
+  {
+    documents: iterations,
+    "error responses": errors,
+    "candles kept": candles,
+    "chunks fed": chunks,
+    seed,
+  },
+]);
+console.log("✅ Parser matches JSON.parse on every document");
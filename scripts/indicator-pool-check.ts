@@ -0,0 +1,105 @@
+/**
+ * Check IndicatorWorkerPool against inline computation
+ *
+ * Runs a job on a real worker and compares it with calculateAllIndicators,
+ * then checks that the caller's series stays intact and the job still
+ * completes inline when its worker dies mid-job or the worker bundle is
+ * missing. Exits 1 when a check fails.
+ *
+ * Usage:
+ *   bun run build:worker && bun scripts/indicator-pool-check.ts
+ *   bun scripts/indicator-pool-check.ts lib/indicator-worker.ts
+ *
+ * The first form checks the bundle `next start` uses (pass its path to run
+ * this script under plain Node); bun can also run the TypeScript entry.
+ */
+
+import { writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import path from "node:path";
+import { DEFAULT_WORKER_PATH, IndicatorWorkerPool } from "@/lib/indicator-pool";
+import { calculateAllIndicators, IndicatorSet } from "@/lib/indicators";
+import { check, report } from "./check-results";
+import { generateRandomWalkSeries } from "./synthetic-ohlcv";
+
+const LENGTH = 5_000;
+
+/**
+ * Whether two indicator sets hold the same values (NaN equal to NaN)
+ */
+function sameIndicators(a: IndicatorSet, b: IndicatorSet): boolean {
+  const columns = (set: IndicatorSet) => [
+    set.ema13,
+    set.ema21,
+    set.ema50,
+    set.ema100,
+    set.bollinger.upper,
+    set.bollinger.middle,
+    set.bollinger.lower,
+    set.stochastic.k,
+    set.stochastic.d,
+  ];
+  const left = columns(a);
+  const right = columns(b);
+  return (
+    left.every((column, i) =>
+      column.every((value, j) => Object.is(value, right[i][j]))
+    ) && JSON.stringify(a.orderBlocks) === JSON.stringify(b.orderBlocks)
+  );
+}
+
+// Pool workers are unref'd, so keep the process alive while jobs run
+const keepAlive = setInterval(() => {}, 1000);
+
+const expected = calculateAllIndicators(generateRandomWalkSeries(LENGTH));
+
+async function runJob(workerPath: string) {
+  const pool = new IndicatorWorkerPool({ size: 1, workerPath });
+  const series = generateRandomWalkSeries(LENGTH);
+  try {
+    const indicators = await pool.run(series);
+    return { series, indicators };
+  } finally {
+    await pool.destroy();
+  }
+}
+
+const workerPath = path.resolve(process.argv[2] ?? DEFAULT_WORKER_PATH);
+const worker = await runJob(workerPath);
+check(
+  "worker result",
+  sameIndicators(worker.indicators, expected),
+  path.relative(process.cwd(), workerPath)
+);
+check(
+  "series kept",
+  worker.series.close.length === LENGTH,
+  `${worker.series.close.length} closes after the job`
+);
+
+// Loads, then dies on its first job
+const crashingWorker = path.join(tmpdir(), "indicator-worker-crash.mjs");
+writeFileSync(
+  crashingWorker,
+  `import { parentPort } from "node:worker_threads";
+parentPort.on("message", () => process.exit(1));
+parentPort.postMessage({ type: "ready" });
+`
+);
+const crashed = await runJob(crashingWorker);
+check(
+  "worker crash",
+  crashed.series.close.length === LENGTH &&
+    sameIndicators(crashed.indicators, expected),
+  "reran inline on the caller's columns"
+);
+
+const missing = await runJob(path.join(tmpdir(), "no-such-worker.mjs"));
+check(
+  "missing bundle",
+  sameIndicators(missing.indicators, expected),
+  "ran inline"
+);
+
+clearInterval(keepAlive);
+report();
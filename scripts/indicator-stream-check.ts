@@ -0,0 +1,163 @@
+/**
+ * Check IndicatorStream against full recomputation
+ *
+ * Feeds a random walk through a stream the way refreshes do: the forming
+ * candle is revised, new candles are appended, an older candle is revised (a
+ * filled gap) and an unchanged history is passed again. After each step the
+ * stream's indicators must equal calculateAllIndicators over the same
+ * candles, and only the older revision may trigger a full computation. Exits
+ * 1 when a check fails.
+ *
+ * Usage:
+ *   bun scripts/indicator-stream-check.ts [--steps 200] [--seed 1]
+ */
+
+import { calculateAllIndicators, IndicatorSet } from "@/lib/indicators";
+import { IndicatorStream } from "@/lib/indicator-stream";
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+import { parseArgs } from "node:util";
+import { check, report } from "./check-results";
+import { createRandom, generateRandomWalkSeries } from "./synthetic-ohlcv";
+
+const HISTORY = 3_000;
+const START = 2_000;
+
+const { values } = parseArgs({
+  options: {
+    steps: { type: "string", default: "200" },
+    seed: { type: "string", default: "1" },
+  },
+});
+const steps = Number(values.steps);
+const seed = Number(values.seed);
+
+const COLUMNS = ["time", "open", "high", "low", "close", "volume"] as const;
+
+/**
+ * The first `length` candles of `source`, in columns of their own
+ */
+function head(source: OHLCVSeries, length: number): OHLCVSeries {
+  const series = createOHLCVSeries(length);
+  for (const column of COLUMNS) {
+    series[column].set(source[column].subarray(0, length));
+  }
+  return series;
+}
+
+/**
+ * A copy of `series` with the candle at `row` moved by `factor`
+ */
+function revise(series: OHLCVSeries, row: number, factor: number) {
+  const revised = head(series, series.time.length);
+  revised.close[row] *= factor;
+  revised.high[row] = Math.max(revised.high[row], revised.close[row]);
+  revised.low[row] = Math.min(revised.low[row], revised.close[row]);
+  revised.volume[row] += 1;
+  return revised;
+}
+
+/**
+ * Where two indicator sets differ, or null when every value is identical
+ */
+function difference(a: IndicatorSet, b: IndicatorSet): string | null {
+  const columns = (set: IndicatorSet) => ({
+    ema13: set.ema13,
+    ema21: set.ema21,
+    ema50: set.ema50,
+    ema100: set.ema100,
+    "bollinger.upper": set.bollinger.upper,
+    "bollinger.middle": set.bollinger.middle,
+    "bollinger.lower": set.bollinger.lower,
+    "stochastic.k": set.stochastic.k,
+    "stochastic.d": set.stochastic.d,
+  });
+  const left = columns(a);
+  const right = columns(b);
+  for (const [name, column] of Object.entries(left)) {
+    const expected = right[name as keyof typeof right];
+    if (column.length !== expected.length) {
+      return `${name} has ${column.length} rows, expected ${expected.length}`;
+    }
+    for (let row = 0; row < column.length; row++) {
+      if (!Object.is(column[row], expected[row])) {
+        return `${name}[${row}] ${column[row]}, expected ${expected[row]}`;
+      }
+    }
+  }
+  if (JSON.stringify(a.orderBlocks) !== JSON.stringify(b.orderBlocks)) {
+    return "order blocks differ";
+  }
+  return null;
+}
+
+const random = createRandom(seed);
+const source = generateRandomWalkSeries(HISTORY, { seed });
+const stream = new IndicatorStream();
+let computations = 0;
+const compute = async (data: OHLCVSeries) => {
+  computations += 1;
+  return calculateAllIndicators(data);
+};
+
+let series = head(source, START);
+await stream.update(series, compute);
+
+// Revise the forming candle or append up to three candles
+let firstProblem: string | null = null;
+let revisions = 0;
+let appended = 0;
+for (let step = 0; step < steps && firstProblem === null; step++) {
+  const length = series.time.length;
+  if (random() < 0.5 || length === HISTORY) {
+    series = revise(series, length - 1, 0.98 + random() * 0.04);
+    revisions += 1;
+  } else {
+    const added = Math.min(HISTORY - length, 1 + Math.floor(random() * 3));
+    series = head(source, length + added);
+    appended += added;
+  }
+  const problem = difference(
+    await stream.update(series, compute),
+    calculateAllIndicators(series)
+  );
+  if (problem) {
+    firstProblem = `step ${step} (seed ${seed}): ${problem}`;
+  }
+}
+check(
+  "forming candle and appends",
+  firstProblem === null && computations === 1,
+  firstProblem ??
+    `${revisions} revisions, ${appended} appended, ` +
+      `${computations} full computation(s)`
+);
+
+const unchanged = await stream.update(series, compute);
+const again = await stream.update(head(series, series.time.length), compute);
+check(
+  "unchanged history",
+  unchanged === again && computations === 1,
+  "same indicator set, no computation"
+);
+
+// An older candle revised: the states cannot rewind, so compute in full
+series = revise(series, series.time.length - 30, 1.05);
+const gapProblem = difference(
+  await stream.update(series, compute),
+  calculateAllIndicators(series)
+);
+series = head(source, series.time.length);
+series = revise(series, series.time.length - 1, 1.01);
+const afterProblem = difference(
+  await stream.update(series, compute),
+  calculateAllIndicators(series)
+);
+check(
+  "older candle revised",
+  gapProblem === null && afterProblem === null && computations === 3,
+  gapProblem ??
+    afterProblem ??
+    `revised and restored: ${computations - 1} more full computation(s)`
+);
+
+report([stream.stats]);
@@ -0,0 +1,379 @@
+/**
+ * Drive lib/ingestion with a fake clock and scripted sources
+ *
+ * Advances virtual time instead of sleeping, then checks the first snapshot,
+ * refresh cadence, failure handling (previous snapshot kept, backoff,
+ * staleness), warm `whenReady`, single-flight refreshes and cold readers
+ * waiting out the retry backoff. Then registers the real market data sources
+ * (lib/market-data.ts) against the local upstream stand-in
+ * (scripts/standin-server.ts), with a temporary DATA_DIR, and checks their
+ * snapshots, the candle store across a late candle, and upstream outages.
+ * Exits 1 when a check fails.
+ *
+ * Usage:
+ *   bun scripts/ingestion-fake-clock.ts
+ */
+
+import { TIMEFRAMES } from "@/lib/constants";
+import { Clock, IngestionScheduler } from "@/lib/ingestion";
+// Type only: the module reads its configuration from the environment when it
+// is first loaded, which happens below once the environment is set
+import type { MarketDataSources } from "@/lib/market-data";
+import { mkdtempSync, rmSync } from "node:fs";
+import { tmpdir } from "node:os";
+import path from "node:path";
+import { check, report } from "./check-results";
+import { createStandinMarket, startStandin } from "./standin-server";
+
+class FakeClock implements Clock {
+  private time = 0;
+  private nextId = 1;
+  private readonly timers = new Map<number, { at: number; run: () => void }>();
+
+  now(): number {
+    return this.time;
+  }
+
+  setTimeout(callback: () => void, ms: number): unknown {
+    const id = this.nextId++;
+    this.timers.set(id, { at: this.time + ms, run: callback });
+    return id;
+  }
+
+  clearTimeout(handle: unknown): void {
+    this.timers.delete(handle as number);
+  }
+
+  /**
+   * Move time forward, firing due timers in order and letting the promise
+   * chains they start settle
+   */
+  async advance(ms: number): Promise<void> {
+    const target = this.time + ms;
+    for (;;) {
+      await settle();
+      let due: [number, { at: number; run: () => void }] | null = null;
+      for (const entry of this.timers) {
+        if (entry[1].at <= target && (!due || entry[1].at < due[1].at)) {
+          due = entry;
+        }
+      }
+      if (!due) {
+        break;
+      }
+      this.timers.delete(due[0]);
+      this.time = due[1].at;
+      due[1].run();
+    }
+    this.time = target;
+    await settle();
+  }
+}
+
+async function settle(): Promise<void> {
+  for (let i = 0; i < 20; i++) {
+    await Promise.resolve();
+  }
+}
+
+const clock = new FakeClock();
+const scheduler = new IngestionScheduler<{
+  prices: number;
+  slow: string;
+  cold: number;
+}>(clock);
+
+// prices: succeeds, unless told to fail
+let priceLoads = 0;
+let failPrices = false;
+scheduler.register("prices", {
+  intervalMs: 1000,
+  retryMs: 100,
+  load: async () => {
+    priceLoads += 1;
+    if (failPrices) {
+      throw new Error("upstream down");
+    }
+    return priceLoads;
+  },
+});
+
+// slow: resolves only when released, to observe in-flight behaviour
+let slowLoads = 0;
+let releaseSlow: (() => void) | null = null;
+scheduler.register("slow", {
+  intervalMs: 5000,
+  load: () => {
+    slowLoads += 1;
+    return new Promise<string>((resolve) => {
+      releaseSlow = () => resolve(`slow #${slowLoads}`);
+    });
+  },
+});
+
+scheduler.start();
+scheduler.start();
+await clock.advance(0);
+
+const first = scheduler.snapshot("prices");
+check(
+  "first snapshot",
+  first?.value === 1 && first.version === 1 && Object.isFrozen(first),
+  `value ${first?.value}, version ${first?.version}`
+);
+
+await clock.advance(999);
+const beforeInterval = priceLoads;
+await clock.advance(1);
+check(
+  "cadence",
+  beforeInterval === 1 && priceLoads === 2,
+  `${beforeInterval} load(s) before the interval, ${priceLoads} at it`
+);
+
+failPrices = true;
+await clock.advance(1000);
+let freshness = scheduler.freshness().prices;
+check(
+  "failure keeps snapshot",
+  scheduler.snapshot("prices")?.value === 2 &&
+    freshness.lastError === "upstream down" &&
+    freshness.consecutiveFailures === 1,
+  `value ${scheduler.snapshot("prices")?.value}, error ${freshness.lastError}`
+);
+
+// Retries at 100, 200 and 400ms after each failure
+const attemptsBefore = priceLoads;
+await clock.advance(100 + 200 + 400);
+freshness = scheduler.freshness().prices;
+check(
+  "backoff",
+  priceLoads - attemptsBefore === 3 && freshness.consecutiveFailures === 4,
+  `${priceLoads - attemptsBefore} retries in 700ms, next at +${(freshness.nextRefreshAt ?? 0) - clock.now()}ms`
+);
+
+await clock.advance(1000);
+check(
+  "stale",
+  scheduler.freshness().prices.stale &&
+    (scheduler.freshness().prices.ageMs ?? 0) > 2000,
+  `age ${scheduler.freshness().prices.ageMs}ms`
+);
+
+failPrices = false;
+await clock.advance(1000);
+freshness = scheduler.freshness().prices;
+check(
+  "recovery",
+  !freshness.stale &&
+    freshness.lastError === null &&
+    scheduler.snapshot("prices")!.version === 3,
+  `version ${scheduler.snapshot("prices")?.version}, age ${freshness.ageMs}ms`
+);
+
+const warm = scheduler.whenReady("prices");
+let warmResolved = false;
+void warm.then(() => {
+  warmResolved = true;
+});
+await settle();
+check(
+  "warm whenReady",
+  warmResolved && (await warm) === scheduler.snapshot("prices"),
+  "resolved without advancing time"
+);
+
+// The slow source is still on its first load: readers and manual refreshes
+// join it instead of starting new loads
+const joined = Promise.all([
+  scheduler.whenReady("slow"),
+  scheduler.refresh("slow"),
+  scheduler.refresh("slow"),
+]);
+const timedOut = await Promise.all([
+  scheduler.whenReady("slow", 50),
+  clock.advance(50),
+]);
+releaseSlow!();
+const joinedSnapshots = await joined;
+check(
+  "single-flight",
+  slowLoads === 1 &&
+    joinedSnapshots.every((snapshot) => snapshot?.value === "slow #1"),
+  `${slowLoads} load(s) for 3 concurrent callers`
+);
+check(
+  "whenReady timeout",
+  timedOut[0] === null,
+  "cold read gave up after 50ms"
+);
+
+// cold: never succeeds. Readers arriving between attempts wait for the
+// scheduled retry instead of starting loads of their own
+let coldLoads = 0;
+scheduler.register("cold", {
+  intervalMs: 1000,
+  retryMs: 100,
+  load: async () => {
+    coldLoads += 1;
+    throw new Error("cold upstream down");
+  },
+});
+await clock.advance(0);
+const coldRetryAt = scheduler.freshness().cold.nextRefreshAt;
+const coldReaders = Promise.all([
+  scheduler.whenReady("cold"),
+  scheduler.whenReady("cold", 5000),
+]);
+await settle();
+const coldLoadsBeforeRetry = coldLoads;
+await clock.advance(100);
+const coldSnapshots = await coldReaders;
+check(
+  "cold whenReady keeps backoff",
+  coldLoadsBeforeRetry === 1 &&
+    coldLoads === 2 &&
+    coldRetryAt === clock.now() &&
+    coldSnapshots.every((snapshot) => snapshot === null),
+  `${coldLoadsBeforeRetry} load(s) before the retry, readers settled with it`
+);
+
+scheduler.stop();
+const loadsAtStop = priceLoads;
+await clock.advance(10_000);
+check(
+  "stop",
+  priceLoads === loadsAtStop && !scheduler.isRunning,
+  `${priceLoads - loadsAtStop} load(s) after stop`
+);
+
+// The real sources, with blocks every 480s over the last 2016 and one daily
+// candle published late
+const standin = await startStandin(
+  createStandinMarket({ recentBlockSeconds: 480 })
+);
+const { market } = standin;
+const lateIndex = market.candles.length - 10;
+const [lateCandle] = market.candles.splice(lateIndex, 1);
+const dataDir = mkdtempSync(path.join(tmpdir(), "market-data-"));
+process.env.DATA_DIR = dataDir;
+process.env.INDICATOR_POOL_SIZE = "0";
+process.env.UPSTREAM_ORIGINS = JSON.stringify(standin.origins);
+const { registerMarketDataSources } = await import("@/lib/market-data");
+const { ohlcvStore } = await import("@/lib/ohlcv-store");
+const { readJsonFile } = await import("@/lib/json-store");
+const { upstreamClient } = await import("@/lib/upstream-client");
+
+const marketData = new IngestionScheduler<MarketDataSources>(new FakeClock());
+registerMarketDataSources(marketData);
+const [bitcoin, halvings, fearGreed] = await Promise.all([
+  marketData.refresh("bitcoin"),
+  marketData.refresh("halvings"),
+  marketData.refresh("fearGreed"),
+]);
+
+const daily = bitcoin?.value["1d"].data;
+const gapRow = daily ? daily.time.indexOf(lateCandle.time) : -1;
+check(
+  "market: candles",
+  daily?.time.length === market.candles.length + 1 &&
+    daily.volume[gapRow] === 0 &&
+    TIMEFRAMES.every((tf) => bitcoin?.value[tf].indicators),
+  `${daily?.time.length} daily rows (gap filled) from ${market.candles.length} candles`
+);
+
+let stored = await ohlcvStore.read("btc-usd-1d");
+check(
+  "market: store keeps real candles",
+  stored?.time.length === market.candles.length &&
+    !stored.time.includes(lateCandle.time),
+  `${stored?.time.length} stored rows`
+);
+
+// The missing candle appears and is picked up on the next refresh
+market.candles.splice(lateIndex, 0, lateCandle);
+const requestsBefore = standin.requests.length;
+const backfilled = await marketData.refresh("bitcoin");
+const chartRequest = standin.requests
+  .slice(requestsBefore)
+  .find((request) => request.startsWith("/v8/"));
+const period1 = Number(
+  new URLSearchParams(chartRequest?.split("?")[1]).get("period1")
+);
+stored = await ohlcvStore.read("btc-usd-1d");
+const refilled = backfilled?.value["1d"].data;
+const lateRow = refilled ? refilled.time.indexOf(lateCandle.time) : -1;
+check(
+  "market: late candle fills its gap",
+  period1 <= lateCandle.time &&
+    stored?.time.length === market.candles.length &&
+    refilled?.close[lateRow] === lateCandle.close,
+  `re-requested from ${new Date(period1 * 1000).toISOString().slice(0, 10)}`
+);
+
+const nextHalving = halvings?.value.nextHalving;
+check(
+  "market: halvings",
+  halvings?.value.halvingDates.length === 4 &&
+    nextHalving?.height === 1_050_000 &&
+    Math.round(nextHalving.averageBlockSeconds) === 480,
+  `${halvings?.value.halvingDates.length} halvings, next at ${nextHalving?.height} (${nextHalving?.averageBlockSeconds.toFixed(1)}s per block)`
+);
+
+// Halvings and the recent window start are cached, so the tip is all a
+// refresh asks for
+const requestsBeforeHalvings = standin.requests.length;
+const cachedHalvings = await marketData.refresh("halvings");
+const halvingRequests = standin.requests.slice(requestsBeforeHalvings);
+check(
+  "market: halvings from cache",
+  halvingRequests.join() === "/api/blocks/tip/height" &&
+    cachedHalvings?.value.nextHalving?.height === 1_050_000,
+  `requested ${halvingRequests.join(", ")}`
+);
+
+// A difficulty period later the window start moves and is looked up once
+market.tipHeight += 2016;
+const requestsBeforeMove = standin.requests.length;
+await marketData.refresh("halvings");
+const movedRequests = standin.requests.slice(requestsBeforeMove);
+const halvingCache = await readJsonFile<Record<string, number>>(
+  "halvings.json"
+);
+check(
+  "market: window start moves",
+  movedRequests.length === 3 &&
+    movedRequests[1] === "/api/block-height/899136" &&
+    Object.keys(halvingCache ?? {}).join() ===
+      "210000,420000,630000,840000,899136",
+  `requested ${movedRequests.join(", ")}`
+);
+market.tipHeight -= 2016;
+
+check(
+  "market: fear and greed",
+  fearGreed?.value.points.length === market.fearGreed.length &&
+    fearGreed.value.byDay.size === market.fearGreed.length,
+  `${fearGreed?.value.points.length} readings`
+);
+
+// Outages: candles fall back to the store, halvings keep the last snapshot
+const lastHalvings = marketData.snapshot("halvings");
+market.down.add("yahoo");
+market.down.add("mempool");
+const fromStore = await marketData.refresh("bitcoin");
+const halvingsDown = await marketData.refresh("halvings");
+check(
+  "market: outage",
+  fromStore?.value["1d"].data.time.length === refilled?.time.length &&
+    halvingsDown === null &&
+    marketData.snapshot("halvings") === lastHalvings &&
+    marketData.freshness().halvings.consecutiveFailures === 1,
+  `halvings: ${marketData.freshness().halvings.lastError}`
+);
+
+upstreamClient.destroy();
+standin.close();
+rmSync(dataDir, { recursive: true, force: true });
+
+report(scheduler.freshness());
@@ -0,0 +1,72 @@
+/**
+ * Check how /api/series queries are parsed
+ *
+ * Covers the `from`/`to` forms (epoch seconds, ISO dates and bare years, and
+ * the all-digit values that are rejected as ambiguous), range order and
+ * field normalization. Exits 1 when a check fails.
+ *
+ * Usage:
+ *   bun scripts/series-query-check.ts
+ */
+
+import {
+  parseSeriesQuery,
+  SeriesQuery,
+  SeriesQueryError,
+} from "@/lib/series-query";
+import { check, report } from "./check-results";
+
+// 2024-01-01T00:00:00Z
+const JAN_2024 = 1_704_067_200;
+
+/**
+ * The parsed query, or the message of the SeriesQueryError it was rejected
+ * with
+ */
+function parse(query: string): SeriesQuery | string {
+  try {
+    return parseSeriesQuery(new URLSearchParams(query));
+  } catch (error) {
+    if (error instanceof SeriesQueryError) {
+      return error.message;
+    }
+    throw error;
+  }
+}
+
+function checkFrom(name: string, query: string, expected: number | null) {
+  const parsed = parse(query);
+  const from = typeof parsed === "string" ? parsed : parsed.from;
+  check(name, from === expected, `${query} -> ${from}`);
+}
+
+function checkRejected(name: string, query: string) {
+  const parsed = parse(query);
+  check(
+    name,
+    typeof parsed === "string",
+    typeof parsed === "string" ? parsed : `${query} accepted`
+  );
+}
+
+checkFrom("epoch seconds", `from=${JAN_2024}`, JAN_2024);
+checkFrom("9-digit epoch seconds", "from=999999999", 999_999_999);
+checkFrom("ISO date", "from=2024-01-01", JAN_2024);
+checkFrom("ISO date/time", "from=2024-01-01T00:00:00Z", JAN_2024);
+checkFrom("bare year", "from=2024", JAN_2024);
+checkFrom("unbounded", "from=", null);
+checkRejected("8-digit basic date", "from=20240101");
+checkRejected("short number", "to=12345");
+checkRejected("not a date", "from=yesterday");
+checkRejected("reversed range", "from=2025&to=2024");
+
+const fields = parse("fields=close,ohlc, close ,stoch");
+check(
+  "fields normalized",
+  typeof fields !== "string" &&
+    fields.columns.join() === "open,high,low,close,stochK,stochD" &&
+    !fields.orderBlocks,
+  typeof fields === "string" ? fields : fields.columns.join()
+);
+
+report();
@@ -0,0 +1,314 @@
+/**
+ * Local stand-in for the upstream APIs, shared by the check scripts
+ *
+ * Serves a few fixed routes for exercising lib/upstream-client (normal, slow,
+ * transiently failing, throttled, gzip-encoded and cut off responses) and a
+ * scripted market behind the real upstream paths: Yahoo Finance daily
+ * candles, a Mempool.space chain and Alternative.me Fear and Greed readings.
+ * The fetchers reach the market through the `origins` map (UPSTREAM_ORIGINS
+ * for the process-wide client), and callers can edit it between refreshes.
+ */
+
+import http from "node:http";
+import { AddressInfo } from "node:net";
+import zlib from "node:zlib";
+
+const SECONDS_PER_DAY = 86400;
+
+export type StandinUpstream = "yahoo" | "mempool" | "fearGreed";
+
+export interface StandinCandle {
+  time: number;
+  open: number;
+  high: number;
+  low: number;
+  close: number;
+  volume: number;
+}
+
+export interface StandinMarket {
+  /**
+   * Daily candles served by the chart route, ascending by time
+   */
+  candles: StandinCandle[];
+  tipHeight: number;
+  /**
+   * Timestamp (epoch seconds) of the block at a height
+   */
+  blockTime: (height: number) => number;
+  /**
+   * Fear and Greed readings, ascending by UTC day number
+   */
+  fearGreed: { day: number; value: number; classification: string }[];
+  /**
+   * Upstreams answering 503 with a Retry-After too long to wait for
+   */
+  down: Set<StandinUpstream>;
+}
+
+export interface Standin {
+  base: string;
+  /**
+   * Upstream origins mapped to the stand-in, for UpstreamClient `origins`
+   */
+  origins: Record<string, string>;
+  market: StandinMarket;
+  /**
+   * Requests per path
+   */
+  hits: Map<string, number>;
+  /**
+   * Path and query of every request, in order
+   */
+  requests: string[];
+  connections(): number;
+  close(): void;
+}
+
+/**
+ * A market with `days` daily candles up to today, a chain at `tipHeight`
+ * whose blocks come every `recentBlockSeconds` over the last two difficulty
+ * periods (4032 blocks) and every 600s before, and one Fear and Greed reading
+ * per day
+ */
+export function createStandinMarket({
+  days = 400,
+  tipHeight = 900_000,
+  recentBlockSeconds = 600,
+}: {
+  days?: number;
+  tipHeight?: number;
+  recentBlockSeconds?: number;
+} = {}): StandinMarket {
+  const today = Math.floor(Date.now() / 1000 / SECONDS_PER_DAY);
+  const candles: StandinCandle[] = [];
+  const fearGreed: StandinMarket["fearGreed"] = [];
+  let close = 30_000;
+  for (let day = today - days + 1; day <= today; day++) {
+    const open = close;
+    close = open * (1 + Math.sin(day) * 0.02);
+    candles.push({
+      time: day * SECONDS_PER_DAY,
+      open,
+      high: Math.max(open, close) * 1.01,
+      low: Math.min(open, close) * 0.99,
+      close,
+      volume: 1e9 + (day % 7) * 1e8,
+    });
+    const value = 50 + Math.round(Math.sin(day / 5) * 40);
+    fearGreed.push({
+      day,
+      value,
+      classification: value < 50 ? "Fear" : "Greed",
+    });
+  }
+
+  const tipTime = Math.floor(Date.now() / 1000) - 60;
+  const windowStart = tipHeight - 2 * 2016;
+  const blockTime = (height: number) =>
+    height >= windowStart
+      ? tipTime - (tipHeight - height) * recentBlockSeconds
+      : tipTime -
+        2 * 2016 * recentBlockSeconds -
+        (windowStart - height) * 600;
+
+  return { candles, tipHeight, blockTime, fearGreed, down: new Set() };
+}
+
+function sendJson(response: http.ServerResponse, value: unknown): void {
+  response.writeHead(200, { "Content-Type": "application/json" });
+  response.end(JSON.stringify(value));
+}
+
+function yahooChart(market: StandinMarket, query: URLSearchParams): unknown {
+  const from = Number(query.get("period1"));
+  const to = Number(query.get("period2"));
+  const candles = market.candles.filter(
+    (candle) => candle.time >= from && candle.time <= to
+  );
+  const column = (field: keyof StandinCandle) =>
+    candles.map((candle) => candle[field]);
+  return {
+    chart: {
+      result: [
+        {
+          meta: { currency: "USD", symbol: "BTC-USD" },
+          timestamp: column("time"),
+          indicators: {
+            quote: [
+              {
+                open: column("open"),
+                high: column("high"),
+                low: column("low"),
+                close: column("close"),
+                volume: column("volume"),
+              },
+            ],
+          },
+        },
+      ],
+      error: null,
+    },
+  };
+}
+
+/**
+ * Answer a market route, or return false when the path is not one
+ */
+function serveMarket(
+  market: StandinMarket,
+  url: URL,
+  response: http.ServerResponse
+): boolean {
+  const upstream: StandinUpstream | null = url.pathname.startsWith("/v8/")
+    ? "yahoo"
+    : url.pathname.startsWith("/api/")
+      ? "mempool"
+      : url.pathname === "/fng/"
+        ? "fearGreed"
+        : null;
+  if (upstream === null) {
+    return false;
+  }
+  if (market.down.has(upstream)) {
+    response.writeHead(503, { "Retry-After": "3600" });
+    response.end();
+    return true;
+  }
+
+  const blockHeight = url.pathname.match(/^\/api\/block-height\/(\d+)$/);
+  const block = url.pathname.match(/^\/api\/block\/hash-(\d+)$/);
+  if (url.pathname === "/v8/finance/chart/BTC-USD") {
+    sendJson(response, yahooChart(market, url.searchParams));
+  } else if (url.pathname === "/api/blocks/tip/height") {
+    response.end(`${market.tipHeight}`);
+  } else if (blockHeight && Number(blockHeight[1]) <= market.tipHeight) {
+    response.end(`hash-${blockHeight[1]}`);
+  } else if (block && Number(block[1]) <= market.tipHeight) {
+    const height = Number(block[1]);
+    sendJson(response, {
+      id: `hash-${height}`,
+      height,
+      timestamp: market.blockTime(height),
+    });
+  } else if (url.pathname === "/fng/") {
+    // limit=0 is the whole history; readings are listed newest first
+    const limit = Number(url.searchParams.get("limit"));
+    const readings =
+      limit > 0 ? market.fearGreed.slice(-limit) : market.fearGreed;
+    sendJson(response, {
+      name: "Fear and Greed Index",
+      data: readings
+        .map((reading) => ({
+          value: `${reading.value}`,
+          value_classification: reading.classification,
+          timestamp: `${reading.day * SECONDS_PER_DAY}`,
+        }))
+        .reverse(),
+      metadata: { error: null },
+    });
+  } else {
+    response.writeHead(404);
+    response.end("Block not found");
+  }
+  return true;
+}
+
+/**
+ * Start the stand-in on a random local port
+ */
+export async function startStandin(
+  market: StandinMarket = createStandinMarket()
+): Promise<Standin> {
+  let connections = 0;
+  const hits = new Map<string, number>();
+  const requests: string[] = [];
+
+  const server = http.createServer((request, response) => {
+    const url = new URL(request.url ?? "/", "http://localhost");
+    const count = (hits.get(url.pathname) ?? 0) + 1;
+    hits.set(url.pathname, count);
+    requests.push(`${url.pathname}${url.search}`);
+
+    if (serveMarket(market, url, response)) {
+      return;
+    }
+    switch (url.pathname) {
+      case "/ok":
+        response.end(JSON.stringify({ hit: count }));
+        break;
+      case "/slow":
+        setTimeout(
+          () => response.end("slow"),
+          Number(url.searchParams.get("ms"))
+        );
+        break;
+      case "/flaky":
+        // Fails twice, then succeeds
+        if (count <= 2) {
+          response.writeHead(503, { "Retry-After": "0" });
+          response.end();
+        } else {
+          response.end("recovered");
+        }
+        break;
+      case "/throttled":
+        // Asks for a one second pause once, then succeeds
+        if (count === 1) {
+          response.writeHead(429, { "Retry-After": "1" });
+          response.end();
+        } else {
+          response.end("resumed");
+        }
+        break;
+      case "/busy":
+        response.writeHead(503, { "Retry-After": "60" });
+        response.end();
+        break;
+      case "/gzip":
+        response.writeHead(200, { "Content-Encoding": "gzip" });
+        response.end(zlib.gzipSync("x".repeat(10_000)));
+        break;
+      case "/cut": {
+        // Breaks the gzip body off half way once, then sends all of it
+        const body = zlib.gzipSync("x".repeat(100_000));
+        response.writeHead(200, { "Content-Encoding": "gzip" });
+        if (count === 1) {
+          response.write(body.subarray(0, body.length >> 1), () =>
+            response.destroy()
+          );
+        } else {
+          response.end(body);
+        }
+        break;
+      }
+      default:
+        response.writeHead(404);
+        response.end();
+    }
+  });
+  server.on("connection", () => {
+    connections += 1;
+  });
+
+  await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+  const { port } = server.address() as AddressInfo;
+  const base = `http://127.0.0.1:${port}`;
+
+  return {
+    base,
+    origins: {
+      "https://query1.finance.yahoo.com": base,
+      "https://mempool.space": base,
+      "https://api.alternative.me": base,
+    },
+    market,
+    hits,
+    requests,
+    connections: () => connections,
+    close: () => {
+      server.close();
+      server.closeAllConnections();
+    },
+  };
+}
@@ -0,0 +1,74 @@
+/**
+ * Seeded synthetic OHLCV histories for benchmarks
+ */
+
+import { createOHLCVSeries, OHLCVSeries } from "@/lib/ohlcv";
+
+/**
+ * Deterministic PRNG (mulberry32) returning floats in [0, 1)
+ */
+export function createRandom(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+interface RandomWalkOptions {
+  seed?: number;
+  startPrice?: number;
+  /**
+   * Standard deviation of the per-bar log return.
+   */
+  volatility?: number;
+  /**
+   * Epoch seconds of the first candle.
+   */
+  startTime?: number;
+  /**
+   * Seconds between candles.
+   */
+  interval?: number;
+}
+
+/**
+ * Generate a geometric random walk with consistent OHLC relationships
+ * (low <= open, close <= high) and positive volume
+ */
+export function generateRandomWalkSeries(
+  length: number,
+  {
+    seed = 1,
+    startPrice = 30000,
+    volatility = 0.03,
+    startTime = Date.UTC(2010, 6, 17) / 1000,
+    interval = 86400,
+  }: RandomWalkOptions = {}
+): OHLCVSeries {
+  const random = createRandom(seed);
+  const series = createOHLCVSeries(length);
+
+  // Approximately normal increments from the sum of uniforms
+  const gaussian = () => random() + random() + random() + random() - 2;
+
+  let price = startPrice;
+  for (let i = 0; i < length; i++) {
+    const open = price;
+    const close = open * Math.exp(volatility * gaussian());
+    const wick = Math.abs(volatility * gaussian()) * 0.5;
+
+    series.time[i] = startTime + i * interval;
+    series.open[i] = open;
+    series.close[i] = close;
+    series.high[i] = Math.max(open, close) * (1 + wick);
+    series.low[i] = Math.min(open, close) * (1 - wick);
+    series.volume[i] = 1e9 * (0.5 + random());
+    price = close;
+  }
+
+  return series;
+}
@@ -0,0 +1,185 @@
+/**
+ * Exercise lib/upstream-client against a local stand-in HTTP server
+ *
+ * Starts the stand-in (scripts/standin-server.ts) on a random local port,
+ * with routes that answer normally, slowly, with transient 503s or 429s,
+ * gzip-encoded or cut off part way, then checks keep-alive socket reuse,
+ * single-flight coalescing, retry (with Retry-After as a floor), deadline,
+ * decoding, streaming into a consumer and origin redirection. Prints the
+ * per-host metrics and exits 1 when a check fails.
+ *
+ * Usage:
+ *   bun scripts/upstream-standin.ts
+ */
+
+import {
+  UpstreamBodyConsumer,
+  UpstreamClient,
+  UpstreamError,
+} from "@/lib/upstream-client";
+import { check, report } from "./check-results";
+import { startStandin } from "./standin-server";
+
+const standin = await startStandin();
+const { base, hits } = standin;
+const client = new UpstreamClient({ retryBaseMs: 20, retryMaxMs: 100 });
+
+// Sequential requests reuse one keep-alive socket
+for (let i = 0; i < 10; i++) {
+  await client.get(`${base}/ok?i=${i}`);
+}
+check(
+  "keep-alive",
+  standin.connections() === 1,
+  `${standin.connections()} connection(s) for 10 requests`
+);
+
+// Identical concurrent requests are coalesced
+const concurrent = await Promise.all(
+  Array.from({ length: 20 }, () => client.get(`${base}/slow?ms=50`))
+);
+check(
+  "single-flight",
+  hits.get("/slow") === 1 &&
+    concurrent.every((response) => response.body.toString() === "slow"),
+  `${hits.get("/slow")} upstream hit(s) for 20 concurrent calls`
+);
+
+// Transient 503s are retried
+const flaky = await client.get(`${base}/flaky`);
+check(
+  "retry",
+  flaky.ok && (await flaky.text()) === "recovered",
+  `status ${flaky.status} after ${hits.get("/flaky")} attempts`
+);
+
+// Retry-After is a floor on the retry delay
+const patient = new UpstreamClient({ retryBaseMs: 1, retryMaxMs: 2_000 });
+const throttleStarted = performance.now();
+const throttled = await patient.get(`${base}/throttled`);
+const throttleElapsed = performance.now() - throttleStarted;
+check(
+  "retry-after floor",
+  (await throttled.text()) === "resumed" && throttleElapsed >= 1000,
+  `retried after ${throttleElapsed.toFixed(0)}ms`
+);
+patient.destroy();
+
+// A Retry-After beyond the cap gives up instead of retrying early
+let busyError: unknown = null;
+try {
+  await client.get(`${base}/busy`);
+} catch (error) {
+  busyError = error;
+}
+const busyStatus = busyError instanceof UpstreamError ? busyError.status : null;
+check(
+  "retry-after beyond cap",
+  busyStatus === 503 && hits.get("/busy") === 1,
+  `${hits.get("/busy")} attempt(s), status ${busyStatus}`
+);
+
+// The deadline bounds the whole call
+const started = performance.now();
+let deadlineError: unknown = null;
+try {
+  await client.get(`${base}/slow?ms=2000`, { deadlineMs: 200 });
+} catch (error) {
+  deadlineError = error;
+}
+const elapsed = performance.now() - started;
+check(
+  "deadline",
+  deadlineError instanceof UpstreamError && elapsed < 1000,
+  `${deadlineError instanceof Error ? deadlineError.message : "no error"} after ${elapsed.toFixed(0)}ms`
+);
+
+// Non-retryable statuses resolve for the caller to inspect
+const missing = await client.get(`${base}/missing`);
+check(
+  "404 passthrough",
+  missing.status === 404 && hits.get("/missing") === 1,
+  `status ${missing.status}`
+);
+
+// Compressed bodies are decoded
+const gzip = await client.get(`${base}/gzip`);
+check(
+  "gzip",
+  (await gzip.text()).length === 10_000,
+  `${gzip.body.length} decoded bytes`
+);
+
+// Streamed bodies reach the consumer decoded, chunk by chunk
+function createCounter(): UpstreamBodyConsumer<number> & { chunks: number } {
+  let bytes = 0;
+  return {
+    chunks: 0,
+    write(chunk) {
+      this.chunks += 1;
+      bytes += chunk.length;
+    },
+    end: () => bytes,
+  };
+}
+const counters: ReturnType<typeof createCounter>[] = [];
+const streamed = await client.stream(`${base}/gzip`, () => {
+  counters.push(createCounter());
+  return counters.at(-1)!;
+});
+check(
+  "stream",
+  streamed.value === 10_000 && streamed.body.length === 0,
+  `${streamed.value} bytes in ${counters[0].chunks} chunk(s)`
+);
+
+// A body cut off part way is retried with a fresh consumer
+counters.length = 0;
+const cut = await client.stream(`${base}/cut`, () => {
+  counters.push(createCounter());
+  return counters.at(-1)!;
+});
+check(
+  "stream retry",
+  cut.value === 100_000 && counters.length === 2 && hits.get("/cut") === 2,
+  `${counters.length} consumer(s), ${cut.value} bytes`
+);
+
+// Consumer errors fail the call without a retry
+const okHitsBeforeReject = hits.get("/ok") ?? 0;
+let consumerError: unknown = null;
+try {
+  await client.stream(`${base}/ok`, () => ({
+    write() {},
+    end() {
+      throw new SyntaxError("rejected by the consumer");
+    },
+  }));
+} catch (error) {
+  consumerError = error;
+}
+check(
+  "stream consumer error",
+  consumerError instanceof SyntaxError &&
+    hits.get("/ok") === okHitsBeforeReject + 1,
+  consumerError instanceof Error ? consumerError.message : "no error"
+);
+
+// Redirected origins keep the path and query
+const redirected = new UpstreamClient({
+  origins: { "https://upstream.example": base },
+});
+const okHitsBefore = hits.get("/ok") ?? 0;
+const redirect = await redirected.get("https://upstream.example/ok?from=test");
+check(
+  "origin redirect",
+  redirect.ok && hits.get("/ok") === okHitsBefore + 1,
+  standin.requests.at(-1) ?? "no request"
+);
+redirected.destroy();
+
+const metrics = client.metrics;
+client.destroy();
+standin.close();
+
+report(metrics);